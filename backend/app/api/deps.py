@@ -1,31 +1,224 @@
 """FastAPI dependencies (auth, db)."""
 from __future__ import annotations
 
-from typing import Annotated
+from dataclasses import dataclass
+from typing import Annotated, Any, Dict
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import ORMExecuteState, Session, make_transient_to_detached
 
+from app.core.cache import TTLCache
+from app.core.config import get_settings
 from app.core.security import decode_token
-from app.db.session import get_db
+from app.db.session import get_async_db, get_db
 from app.db.models import User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
+_settings = get_settings()
 
-def get_current_user(db: Session = Depends(get_db), token: Annotated[str, Depends(oauth2_scheme)] = None) -> User:
-    """Get current user from JWT token"""
+"""Column snapshots of active users keyed by the JWT `sub` claim"""
+user_cache: TTLCache[Dict[str, Any]] = TTLCache(
+    maxsize=_settings.USER_CACHE_SIZE, ttl=_settings.USER_CACHE_TTL_SECONDS
+)
+
+
+"""Current `token_version` (or REVOKED for inactive users) per user id, for stateless authentication"""
+token_versions: TTLCache[int] = TTLCache(
+    maxsize=_settings.TOKEN_VERSION_CACHE_SIZE, ttl=_settings.TOKEN_VERSION_TTL_SECONDS
+)
+REVOKED = -1
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Caller identity from token claims, enough for routes that never need the `User` row"""
+
+    id: int
+    email: str
+
+
+def _snapshot(user: User) -> Dict[str, Any]:
+    return {attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs}
+
+
+def _from_snapshot(data: Dict[str, Any]) -> User:
+    """Rebuild a detached `User` that can be merged into a session without a SELECT"""
+    user = User(**data)
+    make_transient_to_detached(user)
+    return user
+
+
+def invalidate_user(user: User) -> None:
+    """Drop cached row of the user, call after committing changes to it"""
+    user_cache.invalidate(user.email)
+
+
+"""Session.info key of the (email, id) pairs of users changed in the transaction, `_ALL_USERS` after bulk statements"""
+_CHANGED_USERS = "changed_users"
+_ALL_USERS = None
+
+
+def _changed_users(session: Session) -> set:
+    return session.info.setdefault(_CHANGED_USERS, set())
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_users(session: Session, _flush_context) -> None:
+    # Catches changes made outside of the auth routes, e.g. flipping `is_active`; the entries are
+    # only dropped once the transaction commits, a concurrent request would re-cache the old row
+    changed = _changed_users(session)
+    for user in (*session.dirty, *session.deleted):
+        if isinstance(user, User):
+            changed.add((user.email, user.id))
+            changed.update((old_email, user.id) for old_email in inspect(user).attrs.email.history.deleted or ())
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk_user_changes(state: ORMExecuteState) -> None:
+    # update(User) / delete(User) statements skip mapper events and may match any user
+    if (state.is_update or state.is_delete) and state.bind_mapper is inspect(User):
+        _changed_users(state.session).add(_ALL_USERS)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session: Session) -> None:
+    changed = session.info.pop(_CHANGED_USERS, ())
+    if _ALL_USERS in changed:
+        user_cache.clear()
+        token_versions.clear()
+        return
+    for email, user_id in changed:
+        user_cache.invalidate(email)
+        token_versions.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _forget_changed_users(session: Session, transaction) -> None:
+    if transaction.parent is None:  # rolled back, or already handled by after_commit
+        session.info.pop(_CHANGED_USERS, None)
+
+
+def _token_payload(token: str | None) -> Dict[str, Any]:
+    """Return claims of a valid token carrying `sub` or raise 401"""
     try:
         payload = decode_token(token)
     except Exception as exc:  # noqa: BLE001
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token") from exc
 
-    sub = payload.get("sub")
-    if sub is None:
+    if payload.get("sub") is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token payload")
+    return payload
+
 
-    user = db.query(User).filter(User.email == sub).first()
+def _issued_after(version: int, payload: Dict[str, Any]) -> bool:
+    """The token carries a newer `ver` than the cached one: another worker revoked, reload it"""
+    return payload.get("ver", version) > version
+
+
+def _ensure_active(user: User | None, payload: Dict[str, Any]) -> User:
     if not user or not user.is_active:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found or inactive")
+    # tokens issued before `ver` was embedded stay valid until they expire
+    if payload.get("ver", user.token_version) != user.token_version:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token revoked")
     return user
+
+
+def _stateless_claims(payload: Dict[str, Any]) -> tuple[int, int] | None:
+    """(uid, ver) when stateless mode is on and the token carries them"""
+    if not _settings.JWT_STATELESS or "uid" not in payload or "ver" not in payload:
+        return None
+    return int(payload["uid"]), int(payload["ver"])
+
+
+def _check_token_version(payload: Dict[str, Any], version: int) -> Principal:
+    if payload["ver"] != version:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token revoked")
+    return Principal(id=int(payload["uid"]), email=payload["sub"])
+
+
+def _token_version_stmt(user_id: int):
+    return select(User.token_version, User.is_active).where(User.id == user_id)
+
+
+def _current_token_version(row) -> int:
+    return row.token_version if row is not None and row.is_active else REVOKED
+
+
+def get_current_user(db: Session = Depends(get_db), token: Annotated[str, Depends(oauth2_scheme)] = None) -> User:
+    """Get current user from JWT token"""
+    return user_from_token(db, token)
+
+
+def user_from_token(db: Session, token: str | None) -> User:
+    """Resolve the active user of a token, for callers outside of regular HTTP dependencies"""
+    payload = _token_payload(token)
+    sub = payload["sub"]
+    cached = user_cache.get(sub)
+    if cached is not None and not _issued_after(cached["token_version"], payload):
+        return db.merge(_ensure_active(_from_snapshot(cached), payload), load=False)
+
+    generation = user_cache.generation
+    user = _ensure_active(db.query(User).filter(User.email == sub).first(), payload)
+    user_cache.set(sub, _snapshot(user), generation)
+    return user
+
+
+def get_current_principal(db: Session = Depends(get_db), token: Annotated[str, Depends(oauth2_scheme)] = None) -> Principal:
+    """
+    Identify the caller for routes that only need the user id
+
+    With `JWT_STATELESS` the token claims are trusted once `ver` matches the user's current
+    `token_version` from the in-memory map, so most requests do not touch the users table.
+    """
+    payload = _token_payload(token)
+    claims = _stateless_claims(payload)
+    if claims is None:
+        user = user_from_token(db, token)
+        return Principal(id=user.id, email=user.email)
+
+    version = token_versions.get(claims[0])
+    if version is None or _issued_after(version, payload):
+        generation = token_versions.generation
+        version = _current_token_version(db.execute(_token_version_stmt(claims[0])).first())
+        token_versions.set(claims[0], version, generation)
+    return _check_token_version(payload, version)
+
+
+async def get_current_user_async(
+    db: AsyncSession = Depends(get_async_db), token: Annotated[str, Depends(oauth2_scheme)] = None
+) -> User:
+    """Get current user from JWT token using the async session"""
+    payload = _token_payload(token)
+    sub = payload["sub"]
+    cached = user_cache.get(sub)
+    if cached is not None and not _issued_after(cached["token_version"], payload):
+        return await db.merge(_ensure_active(_from_snapshot(cached), payload), load=False)
+
+    generation = user_cache.generation
+    user = (await db.execute(select(User).where(User.email == sub))).scalars().first()
+    user = _ensure_active(user, payload)
+    user_cache.set(sub, _snapshot(user), generation)
+    return user
+
+
+async def get_current_principal_async(
+    db: AsyncSession = Depends(get_async_db), token: Annotated[str, Depends(oauth2_scheme)] = None
+) -> Principal:
+    """`get_current_principal` using the async session"""
+    payload = _token_payload(token)
+    claims = _stateless_claims(payload)
+    if claims is None:
+        user = await get_current_user_async(db, token)
+        return Principal(id=user.id, email=user.email)
+
+    version = token_versions.get(claims[0])
+    if version is None or _issued_after(version, payload):
+        generation = token_versions.generation
+        version = _current_token_version((await db.execute(_token_version_stmt(claims[0]))).first())
+        token_versions.set(claims[0], version, generation)
+    return _check_token_version(payload, version)
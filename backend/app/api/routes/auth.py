@@ -3,11 +3,11 @@ from __future__ import annotations
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
-from app.core.security import create_access_token, hash_password, verify_password
+from app.core.security import create_access_token, hash_password_pooled, verify_password_pooled
 from app.db.session import get_db
 from app.db.models import User
 from app.schemas.user import *
-from app.api.deps import get_current_user
+from app.api.deps import get_current_user, invalidate_user
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 
@@ -21,7 +21,7 @@ def register(user_in: UserCreate, db: Session = Depends(get_db)) -> UserOut:
         email=user_in.email,
         first_name=user_in.first_name,
         last_name=user_in.last_name,
-        password_hash=hash_password(user_in.password),
+        password_hash=hash_password_pooled(user_in.password),
     )
     db.add(user)
     db.commit()
@@ -33,10 +33,10 @@ def register(user_in: UserCreate, db: Session = Depends(get_db)) -> UserOut:
 def login(credentials: UserLogin, db: Session = Depends(get_db)) -> TokenOut:
     """Login that return an access token"""
     user = db.query(User).filter(User.email == credentials.email).first()
-    if not user or not verify_password(credentials.password, user.password_hash):
+    if not user or not verify_password_pooled(credentials.password, user.password_hash):
         raise HTTPException(status_code=400, detail="Incorrect email or password")
 
-    token = create_access_token(subject=user.email, extra={"uid": user.id})
+    token = create_access_token(subject=user.email, extra={"uid": user.id, "ver": user.token_version})
     return TokenOut(access_token=token)
 
 
@@ -47,11 +47,12 @@ def change_password(
     db: Session = Depends(get_db),
 ) -> None:
     """Change current user password"""
-    if not verify_password(payload.old_password, current.password_hash):
+    if not verify_password_pooled(payload.old_password, current.password_hash):
         raise HTTPException(status_code=400, detail="Old password is incorrect")
-    current.password_hash = hash_password(payload.new_password)
+    current.password_hash = hash_password_pooled(payload.new_password)
     db.add(current)
     db.commit()
+    invalidate_user(current)
 
 
 @router.get("/me", response_model=UserOut)
@@ -73,5 +74,6 @@ def update_me(
         current.last_name = update.last_name
     db.add(current)
     db.commit()
+    invalidate_user(current)
     db.refresh(current)
     return current
\ No newline at end of file
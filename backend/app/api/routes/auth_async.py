@@ -0,0 +1,85 @@
+"""Async variants of the auth routes, mounted instead of `auth` when `DB_ASYNC` is enabled"""
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.security import create_access_token, hash_password_async, verify_password_async
+from app.db.session import get_async_db
+from app.db.models import User
+from app.schemas.user import *
+from app.api.deps import get_current_user_async, invalidate_user
+
+router = APIRouter(prefix="/api/auth", tags=["auth"])
+
+
+async def _user_by_email(db: AsyncSession, email: str) -> User | None:
+    return (await db.execute(select(User).where(User.email == email))).scalars().first()
+
+
+@router.post("/register", response_model=UserOut, status_code=status.HTTP_201_CREATED)
+async def register(user_in: UserCreate, db: AsyncSession = Depends(get_async_db)) -> UserOut:
+    """Register new user"""
+    if await _user_by_email(db, user_in.email):
+        raise HTTPException(status_code=400, detail="Email already registered")
+    user = User(
+        email=user_in.email,
+        first_name=user_in.first_name,
+        last_name=user_in.last_name,
+        password_hash=await hash_password_async(user_in.password),
+    )
+    db.add(user)
+    await db.commit()
+    await db.refresh(user)
+    return user
+
+
+@router.post("/login", response_model=TokenOut)
+async def login(credentials: UserLogin, db: AsyncSession = Depends(get_async_db)) -> TokenOut:
+    """Login that return an access token"""
+    user = await _user_by_email(db, credentials.email)
+    if not user or not await verify_password_async(credentials.password, user.password_hash):
+        raise HTTPException(status_code=400, detail="Incorrect email or password")
+
+    token = create_access_token(subject=user.email, extra={"uid": user.id, "ver": user.token_version})
+    return TokenOut(access_token=token)
+
+
+@router.post("/change-password", status_code=204)
+async def change_password(
+    payload: PasswordChangeIn,
+    current: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+) -> None:
+    """Change current user password"""
+    if not await verify_password_async(payload.old_password, current.password_hash):
+        raise HTTPException(status_code=400, detail="Old password is incorrect")
+    current.password_hash = await hash_password_async(payload.new_password)
+    db.add(current)
+    await db.commit()
+    invalidate_user(current)
+
+
+@router.get("/me", response_model=UserOut)
+async def me(current: User = Depends(get_current_user_async)) -> UserOut:
+    """Return current user profile."""
+    return current
+
+
+@router.put("/me", response_model=UserOut)
+async def update_me(
+    update: UserUpdate,
+    current: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+) -> UserOut:
+    """Update current user profile properties"""
+    if update.first_name is not None:
+        current.first_name = update.first_name
+    if update.last_name is not None:
+        current.last_name = update.last_name
+    db.add(current)
+    await db.commit()
+    invalidate_user(current)
+    await db.refresh(current)
+    return current
@@ -1,12 +1,23 @@
 from __future__ import annotations
-import asyncio
 from datetime import datetime, timezone
 import platform
 import time
 
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, WebSocket, status
+
+from app.api.deps import user_cache
+from app.api.websockets import forward_queue
+from app.core.admission import cheap_limiter, expensive_limiter
+from app.core.broadcast import Ticker
+from app.core.metrics import pool_stats, request_stats
+from app.core.pubsub import task_events
+from app.core.reminders import reminder_scheduler
+from app.core.response_cache import response_cache
+from app.db.session import async_engine, engine
 
 START_TIME = time.time()
+PYTHON_VERSION = platform.python_version()
+PLATFORM = platform.platform()
 
 router = APIRouter(tags=["status"])
 
@@ -16,22 +27,40 @@ def health() -> dict[str, str]:
     return {"status": "ok"}
 
 
+def status_payload() -> dict:
+    """Status snapshot built once per tick for all /ws/status subscribers"""
+    now = time.time()
+    return {
+        "status": "ok",
+        "datetime_utc": datetime.fromtimestamp(now, tz=timezone.utc).isoformat(),
+        "uptime_seconds": round(now - START_TIME, 2),
+        "python": PYTHON_VERSION,
+        "platform": PLATFORM,
+        "requests": request_stats.snapshot(),
+        "db_pool": {"sync": pool_stats(engine), "async": pool_stats(async_engine)},
+        "websockets": {
+            "status": status_ticker.subscriber_count(),
+            "status_dropped": status_ticker.dropped,
+            "tasks": task_events.subscriber_count(),
+        },
+        "admission": {"expensive": expensive_limiter.stats(), "cheap": cheap_limiter.stats()},
+        "user_cache": user_cache.stats(),
+        "response_cache": response_cache.stats(),
+        "reminders": reminder_scheduler.stats(),
+    }
+
+
+status_ticker = Ticker(status_payload, interval=1.0)
+
+
 @router.websocket("/ws/status")
 async def status_ws(ws: WebSocket) -> None:
-    """Service status websocket"""
+    """Service status websocket, every connection receives the same shared tick"""
     await ws.accept()
+    queue = status_ticker.subscribe()
     try:
-        while True:
-            now = datetime.now(tz=timezone.utc).isoformat()
-            uptime = round(time.time() - START_TIME, 2)
-            payload = {
-                "status": "ok",
-                "datetime_utc": now,
-                "uptime_seconds": uptime,
-                "python": platform.python_version(),
-                "platform": platform.platform(),
-            }
-            await ws.send_json(payload)
-            await asyncio.sleep(1.0)
-    except WebSocketDisconnect:
-        return
+        if await forward_queue(ws, queue, ws.send_text):
+            # dropped for falling behind
+            await ws.close(code=status.WS_1013_TRY_AGAIN_LATER)
+    finally:
+        status_ticker.unsubscribe(queue)
@@ -0,0 +1,46 @@
+"""Request profiles written by `ProfilingMiddleware`"""
+from __future__ import annotations
+
+from typing import Any, Dict
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import FileResponse
+
+from app.core.config import get_settings
+from app.core.profiling import ProfileStore, profile_store, secret_matches
+
+router = APIRouter(prefix="/api/profiles", tags=["status"], include_in_schema=False)
+
+
+def get_profile_store() -> ProfileStore:
+    return profile_store
+
+
+def require_profiling_secret(x_profile: str | None = Header(None)) -> None:
+    """Profiles expose SQL and code paths: the `X-Profile` secret is needed to read them"""
+    if not secret_matches(get_settings().PROFILING_SECRET, x_profile):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Profiling secret required")
+
+
+@router.get("", dependencies=[Depends(require_profiling_secret)])
+def list_profiles(store: ProfileStore = Depends(get_profile_store)) -> Dict[str, Any]:
+    """Summaries of the kept profiles, newest first"""
+    return {"profiles": store.index()}
+
+
+@router.get("/{profile_id}.prof", dependencies=[Depends(require_profiling_secret)])
+def download_profile(profile_id: str, store: ProfileStore = Depends(get_profile_store)) -> FileResponse:
+    """pstats dump, e.g. for `python -m pstats` or snakeviz"""
+    path = store.dump_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    return FileResponse(path, media_type="application/octet-stream", filename=path.name)
+
+
+@router.get("/{profile_id}", dependencies=[Depends(require_profiling_secret)])
+def get_profile(profile_id: str, store: ProfileStore = Depends(get_profile_store)) -> Dict[str, Any]:
+    """Summary with the request's SQL statements and the functions with the highest cumulative time"""
+    summary = store.summary(profile_id)
+    if summary is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    return summary
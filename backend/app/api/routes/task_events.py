@@ -0,0 +1,52 @@
+"""Push of task changes to connected clients"""
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from app.api.deps import user_from_token
+from app.api.routes.tasks import tasks_version_stmt
+from app.api.websockets import forward_queue
+from app.core.pubsub import task_events
+from app.db.models import User
+from app.db.session import get_db
+
+router = APIRouter(tags=["tasks"])
+
+
+def _authenticate(db: Session, token: str | None) -> tuple[User, int]:
+    try:
+        user = user_from_token(db, token)
+        return user, db.scalar(tasks_version_stmt(user.id))
+    finally:
+        db.close()  # do not hold a connection for the lifetime of the socket
+
+
+@router.websocket("/ws/tasks")
+async def task_events_ws(
+    ws: WebSocket,
+    token: str | None = Query(None, description="Access token, browsers cannot set headers on websockets"),
+    db: Session = Depends(get_db),
+) -> None:
+    """
+    Stream changes of the current user's tasks
+
+    The first message carries the current `version` with no changes. Every task write then
+    sends `{"version": n, "changes": [{"op": "upsert", "task": {...}} | {"op": "delete", "id": ...}]}`.
+    A version gap or a `{"resync": true}` message means changes were missed and lists must be reloaded.
+    Due reminders of tasks with `at_time` arrive as `{"reminder": {"task_id", "title", "day", "at_time"}}`.
+    """
+    try:
+        user, version = await run_in_threadpool(_authenticate, db, token)
+    except HTTPException:
+        await ws.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await ws.accept()
+    queue = task_events.subscribe(user.id)
+    try:
+        await ws.send_json({"version": version, "changes": []})
+        await forward_queue(ws, queue, ws.send_json)
+    finally:
+        task_events.unsubscribe(user.id, queue)
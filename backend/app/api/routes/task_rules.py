@@ -0,0 +1,324 @@
+"""Recurring task rules: stored once, occurrences expanded for the requested window only"""
+from __future__ import annotations
+
+from bisect import bisect_left
+from datetime import date, time
+from itertools import accumulate, chain, repeat
+from typing import Iterable, List, Optional, Sequence
+
+import msgpack
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from pydantic import TypeAdapter
+from sqlalchemy import Select, or_, select
+from sqlalchemy.orm import Session
+
+from app.api.deps import Principal, get_current_principal
+from app.api.routes.tasks import (
+    COLUMNS_MEDIA_TYPE,
+    JSON_MEDIA_TYPE,
+    MSGPACK_MEDIA_TYPE,
+    NDJSON_MEDIA_TYPE,
+    SUMMARY_MAX_DAYS,
+    list_media_type,
+    month_bounds,
+)
+from app.core.recurrence import occurrence_ordinals, occurrence_ranges, weekday_mask
+from app.db.models import TaskRule, TaskRuleOverride
+from app.db.session import get_read_db, get_write_db
+from app.schemas.task_rule import (
+    TaskOccurrence,
+    TaskOccurrenceColumns,
+    TaskOccurrenceUpdate,
+    TaskRuleCreate,
+    TaskRuleOut,
+)
+
+router = APIRouter(prefix="/api/task-rules", tags=["task rules"])
+
+"""Columns needed to expand a rule, in listing order (at_time NULLS LAST, id) of occurrences on one day"""
+RULE_EXPANSION_COLUMNS = (
+    TaskRule.id,
+    TaskRule.title,
+    TaskRule.description,
+    TaskRule.at_time,
+    TaskRule.color,
+    TaskRule.freq,
+    TaskRule.interval,
+    TaskRule.weekdays,
+    TaskRule.start_day,
+    TaskRule.end_day,
+)
+
+_occurrences_adapter = TypeAdapter(List[TaskOccurrence])
+_occurrence_adapter = TypeAdapter(TaskOccurrence)
+_occurrence_columns_adapter = TypeAdapter(TaskOccurrenceColumns)
+
+"""Occurrence fields an override can change, NULL in the override keeps the rule's value"""
+OVERRIDABLE_FIELDS = ("title", "description", "at_time", "color")
+
+
+def window_bounds(
+    day: Optional[date], month: Optional[str], start: Optional[date], end: Optional[date]
+) -> tuple[date, date]:
+    """[first, last] days of the requested window or raise 400"""
+    if day is not None:
+        return day, day
+    if month is not None:
+        return month_bounds(month)
+    if start is None or end is None:
+        raise HTTPException(status_code=400, detail="Pass `day`, `month` or both `start` and `end`")
+    if end < start:
+        raise HTTPException(status_code=400, detail="`end` must not be before `start`")
+    if (end - start).days >= SUMMARY_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"Range is limited to {SUMMARY_MAX_DAYS} days")
+    return start, end
+
+
+def rules_in_window_stmt(user_id: int, first: date, last: date) -> Select:
+    """Rules of the user that can have occurrences in [first, last]"""
+    return (
+        select(*RULE_EXPANSION_COLUMNS)
+        .where(
+            TaskRule.user_id == user_id,
+            TaskRule.start_day <= last,
+            or_(TaskRule.end_day.is_(None), TaskRule.end_day >= first),
+        )
+        .order_by(TaskRule.at_time.asc().nulls_last(), TaskRule.id.asc())
+    )
+
+
+def overrides_in_window_stmt(user_id: int, first: date, last: date) -> Select:
+    return (
+        select(TaskRuleOverride)
+        .join(TaskRule, TaskRule.id == TaskRuleOverride.rule_id)
+        .where(TaskRule.user_id == user_id, TaskRuleOverride.day.between(first, last))
+    )
+
+
+def owned_rule_stmt(user_id: int, rule_id: int) -> Select:
+    return select(TaskRule).where(TaskRule.user_id == user_id, TaskRule.id == rule_id)
+
+
+def user_rules_stmt(user_id: int) -> Select:
+    return select(TaskRule).where(TaskRule.user_id == user_id).order_by(TaskRule.id)
+
+
+def new_rule(user_id: int, rule_in: TaskRuleCreate) -> TaskRule:
+    data = rule_in.model_dump()
+    data["weekdays"] = weekday_mask(data["weekdays"])
+    return TaskRule(user_id=user_id, **data)
+
+
+def occurrence_row(rule, day: date, override: Optional[TaskRuleOverride]) -> TaskOccurrence:
+    """Single occurrence of `rule` on `day` with its override applied"""
+    occurrence: TaskOccurrence = {"rule_id": rule.id, "day": day, "title": rule.title, "description": rule.description,
+                                  "at_time": rule.at_time, "color": rule.color, "completed": False}
+    if override is not None:
+        for key in OVERRIDABLE_FIELDS:
+            if getattr(override, key) is not None:
+                occurrence[key] = getattr(override, key)
+        occurrence["completed"] = override.completed
+    return occurrence
+
+
+def expand_occurrences(
+    rules: Sequence, overrides: Iterable[TaskRuleOverride], first: date, last: date
+) -> TaskOccurrenceColumns:
+    """
+    Occurrences of `rules` (rows from `rules_in_window_stmt`) in [first, last], column-wise
+
+    Ordered like task listings: by day, then at_time NULLS LAST and rule id. The rules come in
+    that order, so appending each rule's position to a bucket per day of the window leaves every
+    bucket sorted without comparing anything; one `date` is built per day with occurrences and
+    the columns are filled by C-level indexing of per-rule values. Overrides are patched in by
+    bisecting the bucket of their day.
+    """
+    lo = first.toordinal()
+    buckets: List[List[int]] = [[] for _ in range(last.toordinal() - lo + 1)]
+    appenders = [bucket.append for bucket in buckets]
+    for position, rule in enumerate(rules):
+        for ordinals in occurrence_ranges(
+            rule.freq, rule.interval, rule.weekdays, rule.start_day, rule.end_day, first, last
+        ):
+            if isinstance(ordinals, range):
+                ordinals = range(ordinals.start - lo, ordinals.stop - lo, ordinals.step)
+            else:
+                ordinals = [ordinal - lo for ordinal in ordinals]
+            for offset in ordinals:
+                appenders[offset](position)
+
+    positions = list(chain.from_iterable(buckets))
+    sizes = [len(bucket) for bucket in buckets]
+    starts = [0, *accumulate(sizes)]  # index of the first occurrence of each day
+    days: List[date] = []
+    for offset, size in enumerate(sizes):
+        if size:
+            days.extend(repeat(date.fromordinal(lo + offset), size))
+    columns: TaskOccurrenceColumns = {
+        "rule_id": [],
+        "day": days,
+        "title": [],
+        "description": [],
+        "at_time": [],
+        "color": [],
+        "completed": [False] * len(positions),
+    }
+    for name, attr in (("rule_id", "id"), ("title", "title"), ("description", "description"),
+                       ("at_time", "at_time"), ("color", "color")):
+        values = [getattr(rule, attr) for rule in rules]
+        columns[name] = list(map(values.__getitem__, positions))
+
+    rule_positions = {rule.id: position for position, rule in enumerate(rules)}
+    cancelled, moved = set(), False
+    for override in overrides:
+        position = rule_positions.get(override.rule_id)
+        if position is None:
+            continue  # rule not in the window
+        offset = override.day.toordinal() - lo
+        bucket = buckets[offset] if 0 <= offset < len(buckets) else ()
+        found = bisect_left(bucket, position)
+        if found == len(bucket) or bucket[found] != position:
+            continue  # no longer an occurrence, e.g. the rule's days changed
+        index = starts[offset] + found
+        if override.cancelled:
+            cancelled.add(index)
+            continue
+        for name in OVERRIDABLE_FIELDS:
+            value = getattr(override, name)
+            if value is not None:
+                columns[name][index] = value
+        columns["completed"][index] = override.completed
+        moved = moved or override.at_time is not None
+
+    if cancelled or moved:
+        order = [i for i in range(len(positions)) if i not in cancelled]
+        if moved:
+            # a moved occurrence may change its place within the day
+            at_time, day, rule_id = columns["at_time"], columns["day"], columns["rule_id"]
+            order.sort(key=lambda i: (day[i], at_time[i] is None, at_time[i] or time.min, rule_id[i]))
+        for name, values in columns.items():
+            columns[name] = [values[i] for i in order]
+    return columns
+
+
+def encode_occurrences(columns: TaskOccurrenceColumns, media_type: str = JSON_MEDIA_TYPE) -> bytes:
+    """Serialize expanded occurrences to the negotiated task list representation"""
+    if media_type == COLUMNS_MEDIA_TYPE:
+        return _occurrence_columns_adapter.dump_json(columns)
+    if media_type == MSGPACK_MEDIA_TYPE:
+        return msgpack.packb(_occurrence_columns_adapter.dump_python(columns, mode="json"))
+    fields = tuple(columns)
+    return _occurrences_adapter.dump_json([dict(zip(fields, values)) for values in zip(*columns.values())])
+
+
+def occurrences_media_type(accept: Optional[str]) -> str:
+    media_type = list_media_type(accept)
+    return JSON_MEDIA_TYPE if media_type == NDJSON_MEDIA_TYPE else media_type
+
+
+def encode_occurrence(occurrence: TaskOccurrence) -> bytes:
+    return _occurrence_adapter.dump_json(occurrence)
+
+
+def is_occurrence(rule: TaskRule, day: date) -> bool:
+    return bool(occurrence_ordinals(rule.freq, rule.interval, rule.weekdays, rule.start_day, rule.end_day, day, day))
+
+
+def ensure_occurrence(rule: Optional[TaskRule], day: date) -> TaskRule:
+    if rule is None:
+        raise HTTPException(status_code=404, detail="Rule not found")
+    if not is_occurrence(rule, day):
+        raise HTTPException(status_code=404, detail="Rule has no occurrence on this day")
+    return rule
+
+
+def apply_override(
+    rule: TaskRule, day: date, override: Optional[TaskRuleOverride], **changes: object
+) -> TaskRuleOverride:
+    """Update the occurrence's override row, creating it on first change; a null field falls back to the rule"""
+    if override is None:
+        override = TaskRuleOverride(rule_id=rule.id, day=day, completed=False, cancelled=False)
+    for key, value in changes.items():
+        if value is not None or key not in ("completed", "cancelled"):
+            setattr(override, key, value)
+    return override
+
+
+@router.post("", response_model=TaskRuleOut, status_code=status.HTTP_201_CREATED)
+def create_rule(
+    rule_in: TaskRuleCreate, db: Session = Depends(get_write_db), current: Principal = Depends(get_current_principal)
+) -> TaskRuleOut:
+    """Create a recurring task"""
+    rule = new_rule(current.id, rule_in)
+    db.add(rule)
+    db.commit()
+    db.refresh(rule)
+    return rule
+
+
+@router.get("", response_model=List[TaskRuleOut])
+def list_rules(db: Session = Depends(get_read_db), current: Principal = Depends(get_current_principal)) -> list[TaskRuleOut]:
+    """Recurring tasks of the current user"""
+    return db.scalars(user_rules_stmt(current.id)).all()
+
+
+@router.get("/occurrences", response_model=List[TaskOccurrence])
+def list_occurrences(
+    day: Optional[date] = Query(None, description="Single day (YYYY-MM-DD)"),
+    month: Optional[str] = Query(None, description="Month (YYYY-MM)"),
+    start: Optional[date] = Query(None, description="First day of a range of up to a year"),
+    end: Optional[date] = Query(None, description="Last day of the range, inclusive"),
+    accept: Optional[str] = Header(None),
+    db: Session = Depends(get_read_db),
+    current: Principal = Depends(get_current_principal),
+) -> list[TaskOccurrence]:
+    """
+    Occurrences of all rules in the window, with per-occurrence changes and completions applied
+
+    Same `Accept` formats as task lists: JSON, `application/vnd.tasks.columns+json` and
+    `application/msgpack` (both column-wise, the cheapest for year views).
+    """
+    first, last = window_bounds(day, month, start, end)
+    rules = db.execute(rules_in_window_stmt(current.id, first, last)).all()
+    overrides = db.scalars(overrides_in_window_stmt(current.id, first, last)).all() if rules else []
+    media_type = occurrences_media_type(accept)
+    columns = expand_occurrences(rules, overrides, first, last)
+    return Response(content=encode_occurrences(columns, media_type), media_type=media_type, headers={"Vary": "Accept"})
+
+
+@router.delete("/{rule_id}", status_code=204)
+def delete_rule(rule_id: int, db: Session = Depends(get_write_db), current: Principal = Depends(get_current_principal)) -> None:
+    """Delete a recurring task with all its occurrences"""
+    rule = db.scalars(owned_rule_stmt(current.id, rule_id)).first()
+    if not rule:
+        raise HTTPException(status_code=404, detail="Rule not found")
+    db.delete(rule)
+    db.commit()
+    return None
+
+
+@router.put("/{rule_id}/occurrences/{day}", response_model=TaskOccurrence)
+def update_occurrence(
+    rule_id: int,
+    day: date,
+    update: TaskOccurrenceUpdate,
+    db: Session = Depends(get_write_db),
+    current: Principal = Depends(get_current_principal),
+) -> TaskOccurrence:
+    """Change or complete one occurrence, the rest of the series is untouched"""
+    rule = ensure_occurrence(db.scalars(owned_rule_stmt(current.id, rule_id)).first(), day)
+    override = apply_override(rule, day, db.get(TaskRuleOverride, (rule_id, day)), **update.model_dump(exclude_unset=True))
+    db.add(override)
+    db.commit()
+    return Response(content=encode_occurrence(occurrence_row(rule, day, override)), media_type="application/json")
+
+
+@router.delete("/{rule_id}/occurrences/{day}", status_code=204)
+def cancel_occurrence(
+    rule_id: int, day: date, db: Session = Depends(get_write_db), current: Principal = Depends(get_current_principal)
+) -> None:
+    """Skip one occurrence of the series"""
+    rule = ensure_occurrence(db.scalars(owned_rule_stmt(current.id, rule_id)).first(), day)
+    db.add(apply_override(rule, day, db.get(TaskRuleOverride, (rule_id, day)), cancelled=True))
+    db.commit()
+    return None
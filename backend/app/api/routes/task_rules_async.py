@@ -0,0 +1,115 @@
+"""Async variants of the recurring task routes, mounted instead of `task_rules` when `DB_ASYNC` is enabled"""
+from __future__ import annotations
+
+from datetime import date
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import Principal, get_current_principal_async
+from app.api.routes.task_rules import (
+    apply_override,
+    encode_occurrence,
+    encode_occurrences,
+    ensure_occurrence,
+    expand_occurrences,
+    new_rule,
+    occurrence_row,
+    occurrences_media_type,
+    overrides_in_window_stmt,
+    owned_rule_stmt,
+    rules_in_window_stmt,
+    user_rules_stmt,
+    window_bounds,
+)
+from app.db.models import TaskRuleOverride
+from app.db.session import get_async_read_db, get_async_write_db
+from app.schemas.task_rule import TaskOccurrence, TaskOccurrenceUpdate, TaskRuleCreate, TaskRuleOut
+
+router = APIRouter(prefix="/api/task-rules", tags=["task rules"])
+
+
+@router.post("", response_model=TaskRuleOut, status_code=status.HTTP_201_CREATED)
+async def create_rule(
+    rule_in: TaskRuleCreate,
+    db: AsyncSession = Depends(get_async_write_db),
+    current: Principal = Depends(get_current_principal_async),
+) -> TaskRuleOut:
+    """Create a recurring task"""
+    rule = new_rule(current.id, rule_in)
+    db.add(rule)
+    await db.commit()
+    await db.refresh(rule)
+    return rule
+
+
+@router.get("", response_model=List[TaskRuleOut])
+async def list_rules(
+    db: AsyncSession = Depends(get_async_read_db), current: Principal = Depends(get_current_principal_async)
+) -> list[TaskRuleOut]:
+    """Recurring tasks of the current user"""
+    return (await db.scalars(user_rules_stmt(current.id))).all()
+
+
+@router.get("/occurrences", response_model=List[TaskOccurrence])
+async def list_occurrences(
+    day: Optional[date] = Query(None, description="Single day (YYYY-MM-DD)"),
+    month: Optional[str] = Query(None, description="Month (YYYY-MM)"),
+    start: Optional[date] = Query(None, description="First day of a range of up to a year"),
+    end: Optional[date] = Query(None, description="Last day of the range, inclusive"),
+    accept: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_read_db),
+    current: Principal = Depends(get_current_principal_async),
+) -> list[TaskOccurrence]:
+    """Occurrences of all rules in the window (same formats as the sync route)"""
+    first, last = window_bounds(day, month, start, end)
+    rules = (await db.execute(rules_in_window_stmt(current.id, first, last))).all()
+    overrides = (await db.scalars(overrides_in_window_stmt(current.id, first, last))).all() if rules else []
+    media_type = occurrences_media_type(accept)
+    columns = expand_occurrences(rules, overrides, first, last)
+    return Response(content=encode_occurrences(columns, media_type), media_type=media_type, headers={"Vary": "Accept"})
+
+
+@router.delete("/{rule_id}", status_code=204)
+async def delete_rule(
+    rule_id: int, db: AsyncSession = Depends(get_async_write_db), current: Principal = Depends(get_current_principal_async)
+) -> None:
+    """Delete a recurring task with all its occurrences"""
+    rule = (await db.scalars(owned_rule_stmt(current.id, rule_id))).first()
+    if not rule:
+        raise HTTPException(status_code=404, detail="Rule not found")
+    await db.delete(rule)
+    await db.commit()
+    return None
+
+
+@router.put("/{rule_id}/occurrences/{day}", response_model=TaskOccurrence)
+async def update_occurrence(
+    rule_id: int,
+    day: date,
+    update: TaskOccurrenceUpdate,
+    db: AsyncSession = Depends(get_async_write_db),
+    current: Principal = Depends(get_current_principal_async),
+) -> TaskOccurrence:
+    """Change or complete one occurrence, the rest of the series is untouched"""
+    rule = ensure_occurrence((await db.scalars(owned_rule_stmt(current.id, rule_id))).first(), day)
+    existing = await db.get(TaskRuleOverride, (rule_id, day))
+    override = apply_override(rule, day, existing, **update.model_dump(exclude_unset=True))
+    db.add(override)
+    await db.commit()
+    return Response(content=encode_occurrence(occurrence_row(rule, day, override)), media_type="application/json")
+
+
+@router.delete("/{rule_id}/occurrences/{day}", status_code=204)
+async def cancel_occurrence(
+    rule_id: int,
+    day: date,
+    db: AsyncSession = Depends(get_async_write_db),
+    current: Principal = Depends(get_current_principal_async),
+) -> None:
+    """Skip one occurrence of the series"""
+    rule = ensure_occurrence((await db.scalars(owned_rule_stmt(current.id, rule_id))).first(), day)
+    db.add(apply_override(rule, day, await db.get(TaskRuleOverride, (rule_id, day)), cancelled=True))
+    await db.commit()
+    return None
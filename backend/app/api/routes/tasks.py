@@ -1,37 +1,494 @@
 from __future__ import annotations
 
-from datetime import date
+import base64
+from datetime import date, time
 import calendar
-from typing import List, Optional
+import hashlib
+import json
+from typing import Iterable, Iterator, List, Optional, Sequence
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+import msgpack
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+from sqlalchemy import Select, and_, case, delete, func, insert, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_current_user
-from app.db.models import Task, User
-from app.db.session import get_db
-from app.schemas.task import TaskCreate, TaskOut, TaskUpdate
+from app.api.deps import Principal, get_current_principal
+from app.core.pubsub import task_events
+from app.core.response_cache import CacheKey, day_scopes, response_cache
+from app.db.models import Task, TaskTombstone, TaskVersion
+from app.db.search import search_terms, search_tsquery, search_vector, tasks_fts, user_fts5_query
+from app.db.session import get_read_db, get_write_db
+from app.schemas.task import (
+    TaskBulkIn,
+    TaskBulkOut,
+    TaskBulkResult,
+    TaskChanges,
+    TaskColumns,
+    TaskCreate,
+    TaskDaySummary,
+    TaskOut,
+    TaskRow,
+    TaskUpdate,
+)
 
 router = APIRouter(prefix="/api/tasks", tags=["tasks"])
 
+JSON_MEDIA_TYPE = "application/json"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+# task lists as `TaskColumns`: field names once, one array of values per field
+COLUMNS_MEDIA_TYPE = "application/vnd.tasks.columns+json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+STREAM_BATCH_SIZE = 500
+SUMMARY_MAX_DAYS = 366
+SEARCH_DEFAULT_LIMIT = 50
+# let clients store responses but always revalidate them with If-None-Match
+ETAG_CACHE_CONTROL = "private, no-cache"
+
+
+"""Columns behind every `TaskOut` field, in field order"""
+TASK_OUT_COLUMNS = tuple(getattr(Task, name) for name in TaskOut.model_fields)
+
+_task_rows_adapter = TypeAdapter(List[TaskRow])
+_task_row_adapter = TypeAdapter(TaskRow)
+_task_columns_adapter = TypeAdapter(TaskColumns)
+_task_changes_adapter = TypeAdapter(TaskChanges)
+
+
+def bump_tasks_version_stmt(dialect: str, user_id: int):
+    """Increment and return the user's task list version; execute in the transaction of every task write"""
+    upsert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    return (
+        upsert(TaskVersion)
+        .values(user_id=user_id, version=1)
+        .on_conflict_do_update(index_elements=[TaskVersion.user_id], set_={"version": TaskVersion.version + 1})
+        .returning(TaskVersion.version)
+    )
+
+
+def _task_version(column, user_id: int):
+    return func.coalesce(select(column).where(TaskVersion.user_id == user_id).scalar_subquery(), 0)
+
+
+def tasks_version_stmt(user_id: int) -> Select:
+    return select(_task_version(TaskVersion.version, user_id))
+
+
+def sync_state_stmt(user_id: int) -> Select:
+    """(version, compacted_version): the newest delta-sync cursor and the oldest one still served"""
+    return select(_task_version(TaskVersion.version, user_id), _task_version(TaskVersion.compacted_version, user_id))
+
+
+def make_etag(version: int, *parts: object) -> str:
+    """Strong ETag of a representation derived from the user's task version"""
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()[:16]
+    return f'"{version}-{digest}"'
+
+
+def list_etag(version: int, request: Request) -> str:
+    return make_etag(version, "list", sorted(request.query_params.multi_items()), request.headers.get("accept"))
+
+
+def matches_any(if_none_match: Optional[str]) -> bool:
+    """`If-None-Match: *`, which matches any current representation of an existing resource"""
+    return bool(if_none_match) and if_none_match.strip() == "*"
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if matches_any(if_none_match):
+        return True
+    return etag in {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag, "Cache-Control": ETAG_CACHE_CONTROL})
+
+
+def set_etag(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = ETAG_CACHE_CONTROL
+
+
+def task_rows_stmt(stmt: Select) -> Select:
+    """Narrow a task listing query to plain `TASK_OUT_COLUMNS` rows, no ORM objects are built"""
+    return stmt.with_only_columns(*TASK_OUT_COLUMNS)
+
+
+def encode_task_rows(rows) -> bytes:
+    """Serialize `TASK_OUT_COLUMNS` rows to the same JSON `response_model=List[TaskOut]` produces"""
+    return _task_rows_adapter.dump_json([row._asdict() for row in rows])
+
+
+def encode_task_row(row) -> bytes:
+    return _task_row_adapter.dump_json(row._asdict())
+
+
+def _task_columns(rows) -> dict:
+    if not rows:
+        return {name: [] for name in TaskOut.model_fields}
+    return dict(zip(TaskOut.model_fields, map(list, zip(*rows))))
+
+
+def encode_tasks(rows, media_type: str) -> bytes:
+    """Serialize `TASK_OUT_COLUMNS` rows to the negotiated task list representation"""
+    if media_type == COLUMNS_MEDIA_TYPE:
+        return _task_columns_adapter.dump_json(_task_columns(rows))
+    if media_type == MSGPACK_MEDIA_TYPE:
+        # same layout and value formats (ISO dates and times) as the columnar JSON
+        return msgpack.packb(_task_columns_adapter.dump_python(_task_columns(rows), mode="json"))
+    return encode_task_rows(rows)
+
+
+def task_changes(version: int, upserted: Iterable[Task] = (), deleted: Iterable[int] = ()) -> dict:
+    """Delta message published to `/ws/tasks` subscribers after a write moved the tasks to `version`"""
+    changes = [{"op": "upsert", "task": TaskOut.model_validate(task).model_dump(mode="json")} for task in upserted]
+    changes += [{"op": "delete", "id": task_id} for task_id in deleted]
+    return {"version": version, "changes": changes}
+
+
+def list_response(body: bytes, etag: str, media_type: str = JSON_MEDIA_TYPE) -> Response:
+    return Response(
+        content=body,
+        media_type=media_type,
+        headers={"ETag": etag, "Cache-Control": ETAG_CACHE_CONTROL, "Vary": "Accept"},
+    )
+
+
+def list_cache_key(
+    day: Optional[date],
+    month: Optional[str],
+    completed: Optional[bool],
+    limit: Optional[int],
+    cursor: Optional[str],
+    media_type: str = JSON_MEDIA_TYPE,
+) -> Optional[CacheKey]:
+    """Response cache key of plain day and month views, None for requests that are not cached"""
+    if limit is not None or cursor is not None or media_type == NDJSON_MEDIA_TYPE:
+        return None
+    if day is not None:
+        return ("day", day.isoformat()), (completed, media_type)
+    if month is not None:
+        return ("month", month_bounds(month)[0].strftime("%Y-%m")), (completed, media_type)
+    return None
+
+
+def month_bounds(month: str) -> tuple[date, date]:
+    """Return first and last day of `YYYY-MM` month or raise 400"""
+    try:
+        year_str, month_str = month.split("-", 1)
+        year_i = int(year_str)
+        month_i = int(month_str)
+        if not (1 <= month_i <= 12):
+            raise ValueError
+    except Exception as exc:  # noqa: BLE001
+        raise HTTPException(status_code=400, detail="Invalid month format. Use YYYY-MM.") from exc
+
+    last_day = calendar.monthrange(year_i, month_i)[1]
+    return date(year_i, month_i, 1), date(year_i, month_i, last_day)
+
+
+def encode_cursor(task: Task) -> str:
+    """Opaque keyset cursor pointing right after `task` in listing order"""
+    key = [task.day.isoformat(), task.at_time.isoformat() if task.at_time else None, task.id]
+    return base64.urlsafe_b64encode(json.dumps(key, separators=(",", ":")).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[date, Optional[time], int]:
+    """Return (day, at_time, id) stored in cursor or raise 400"""
+    try:
+        day_s, time_s, task_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return date.fromisoformat(day_s), time.fromisoformat(time_s) if time_s else None, int(task_id)
+    except Exception as exc:  # noqa: BLE001
+        raise HTTPException(status_code=400, detail="Invalid cursor") from exc
+
+
+def _after_key(day: date, at_time: Optional[time], task_id: int):
+    """Keyset predicate for rows ordered by (day, at_time NULLS LAST, id) after the given key"""
+    if at_time is None:
+        same_day = and_(Task.at_time.is_(None), Task.id > task_id)
+    else:
+        same_day = or_(
+            Task.at_time > at_time,
+            Task.at_time.is_(None),
+            and_(Task.at_time == at_time, Task.id > task_id),
+        )
+    # the redundant `day >= :day` bound keeps the predicate usable as an index range
+    return and_(Task.day >= day, or_(Task.day > day, and_(Task.day == day, same_day)))
+
+
+def list_tasks_stmt(
+    user_id: int,
+    day: Optional[date] = None,
+    completed: Optional[bool] = None,
+    month: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> Select:
+    """Build the filtered and ordered task listing query shared by sync and async routes"""
+    stmt = (
+        select(Task)
+        .where(Task.user_id == user_id)
+        .order_by(Task.day.asc(), Task.at_time.asc().nulls_last(), Task.id.asc())
+    )
+
+    if cursor is not None:
+        stmt = stmt.where(_after_key(*decode_cursor(cursor)))
+    if limit is not None:
+        stmt = stmt.limit(limit)
+
+    if completed is not None:
+        stmt = stmt.where(Task.completed == completed)
+
+    if day is not None:
+        stmt = stmt.where(Task.day == day)
+    elif month is not None:
+        month_start, month_end = month_bounds(month)
+        stmt = stmt.where(Task.day.between(month_start, month_end))
+
+    return stmt
+
+
+def paginate(rows: list, limit: Optional[int]) -> tuple[list, Optional[str]]:
+    """Trim the look-ahead row, return the page and cursor of the next one"""
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1])
+    return rows, None
+
+
+def page_response(rows: list, next_cursor: Optional[str], etag: str, media_type: str = JSON_MEDIA_TYPE) -> Response:
+    response = list_response(encode_tasks(rows, media_type), etag, media_type)
+    if next_cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return response
+
+
+def list_media_type(accept: Optional[str]) -> str:
+    """Task list representation asked for in `Accept`, plain JSON unless a compact or streamed one is listed"""
+    if accept:
+        for media_type in (NDJSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE, COLUMNS_MEDIA_TYPE):
+            if media_type in accept:
+                return media_type
+    return JSON_MEDIA_TYPE
+
+
+def _ndjson_lines(db: Session, stmt: Select) -> Iterator[bytes]:
+    for row in db.execute(task_rows_stmt(stmt).execution_options(yield_per=STREAM_BATCH_SIZE)):
+        yield encode_task_row(row) + b"\n"
+
+
+def summary_stmt(user_id: int, start: date, end: date) -> Select:
+    """Per-day total and completed counts in [start, end], aggregated in the database"""
+    if end < start:
+        raise HTTPException(status_code=400, detail="`end` must not be before `start`")
+    if (end - start).days >= SUMMARY_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"Range is limited to {SUMMARY_MAX_DAYS} days")
+    return (
+        select(
+            Task.day,
+            func.count(Task.id).label("total"),
+            func.coalesce(func.sum(case((Task.completed, 1), else_=0)), 0).label("completed"),
+        )
+        .where(Task.user_id == user_id, Task.day.between(start, end))
+        .group_by(Task.day)
+        .order_by(Task.day)
+    )
+
+
+def search_tasks_stmt(
+    dialect: str,
+    user_id: int,
+    terms: Sequence[str],
+    completed: Optional[bool] = None,
+    limit: int = SEARCH_DEFAULT_LIMIT,
+) -> Select:
+    """
+    `TASK_OUT_COLUMNS` rows matching all terms as prefixes, best match first
+
+    The full-text index yields the ids of the user's matching tasks, so the cost follows the
+    number of the user's matches and not the number of tasks. Title matches rank above description matches; ties go to later days.
+    """
+    stmt = select(*TASK_OUT_COLUMNS).where(Task.user_id == user_id)
+    if dialect == "sqlite":
+        stmt = (
+            stmt.join(tasks_fts, tasks_fts.c.rowid == Task.id)
+            .where(tasks_fts.c.tasks_fts.op("MATCH")(user_fts5_query(user_id, terms)))
+            .order_by(tasks_fts.c.rank)
+        )
+    else:
+        vector, query = search_vector(Task.title, Task.description), search_tsquery(terms)
+        stmt = stmt.where(vector.op("@@")(query)).order_by(func.ts_rank(vector, query).desc())
+    if completed is not None:
+        stmt = stmt.where(Task.completed == completed)
+    return stmt.order_by(Task.day.desc(), Task.id.desc()).limit(limit)
+
+
+def parse_since(since: Optional[str], version: int, compacted: int) -> int:
+    """
+    Version a delta-sync cursor stands for, -1 without one (full sync, tasks never written since
+    the delta-sync migration have version 0)
+
+    Raises 400 for malformed cursors and 410 for cursors older than the compacted tombstones or
+    newer than the user's tasks (restored database); the client then reloads its tasks.
+    """
+    if since is None:
+        return -1
+    try:
+        since_version = int(since)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from exc
+    if since_version < compacted or since_version > version:
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail="Sync cursor expired, reload tasks")
+    return since_version
+
+
+def changed_tasks_stmt(user_id: int, since_version: int) -> Select:
+    """`TASK_OUT_COLUMNS` rows of tasks created or updated after the cursor, a range on ix_tasks_user_version"""
+    return (
+        select(*TASK_OUT_COLUMNS)
+        .where(Task.user_id == user_id, Task.version > since_version)
+        .order_by(Task.version, Task.id)
+    )
+
+
+def deleted_tasks_stmt(user_id: int, since_version: int) -> Select:
+    """Ids of tasks deleted after the cursor, a range on the tombstone primary key"""
+    return (
+        select(TaskTombstone.task_id)
+        .where(TaskTombstone.user_id == user_id, TaskTombstone.version > since_version)
+        .order_by(TaskTombstone.version, TaskTombstone.task_id)
+    )
+
+
+def encode_changes(version: int, upserted, deleted) -> bytes:
+    """Serialize a `TaskChanges` page from `TASK_OUT_COLUMNS` rows and deleted ids"""
+    return _task_changes_adapter.dump_json(
+        {"cursor": str(version), "upserted": [row._asdict() for row in upserted], "deleted": list(deleted)}
+    )
+
+
+def tombstone_rows(user_id: int, version: int, task_ids: Iterable[int]) -> list[dict]:
+    return [{"user_id": user_id, "version": version, "task_id": task_id} for task_id in task_ids]
+
+
+def owned_task_stmt(user_id: int, task_id: int) -> Select:
+    """Select a single task that belongs to the user"""
+    return select(Task).where(Task.user_id == user_id, Task.id == task_id)
+
+
+def bulk_owned_stmt(user_id: int, payload: TaskBulkIn) -> Select:
+    """(id, day) of tasks referenced by the batch that belong to the user, checked in one query"""
+    ids = {item.id for item in payload.update} | set(payload.delete)
+    return select(Task.id, Task.day).where(Task.user_id == user_id, Task.id.in_(ids))
+
+
+def bulk_scopes(payload: TaskBulkIn, owned: dict[int, date]):
+    """Response cache scopes touched by the owned part of the batch"""
+    days = [task_in.day for task_in in payload.create] + list(owned.values())
+    days += [item.day for item in payload.update if item.id in owned]
+    return day_scopes(*days)
+
+
+def bulk_statements(user_id: int, payload: TaskBulkIn, owned: dict[int, date], version: Optional[int]):
+    """Executemany-style statements with their parameter lists for the owned part of the batch"""
+    insert_stmt = insert(Task).returning(Task, sort_by_parameter_order=True)
+    insert_rows = [{"user_id": user_id, "version": version, **task_in.model_dump()} for task_in in payload.create]
+    # bulk UPDATE by primary key, rows with different column sets are grouped by the ORM
+    update_stmt = update(Task).where(Task.user_id == user_id).execution_options(synchronize_session=None)
+    update_rows = [
+        {"id": item.id, "version": version, **item.model_dump(exclude_unset=True, exclude={"id"})}
+        for item in payload.update
+        if item.id in owned and item.model_fields_set - {"id"}
+    ]
+    updated_ids = {item.id for item in payload.update if item.id in owned}
+    reload_stmt = select(Task).where(Task.id.in_(updated_ids)).execution_options(populate_existing=True)
+    deleted_ids = [task_id for task_id in payload.delete if task_id in owned]
+    delete_stmt = delete(Task).where(Task.user_id == user_id, Task.id.in_(deleted_ids))
+    tombstones = (insert(TaskTombstone), tombstone_rows(user_id, version, dict.fromkeys(deleted_ids)))
+    return (insert_stmt, insert_rows), (update_stmt, update_rows), reload_stmt, delete_stmt, tombstones
+
+
+def bulk_results(payload: TaskBulkIn, owned: dict[int, date], created: list[Task], updated: list[Task]) -> TaskBulkOut:
+    """Per-item outcome of a batch, in request order grouped by operation"""
+    results = [
+        TaskBulkResult(op="create", index=i, id=task.id, status=201, task=TaskOut.model_validate(task))
+        for i, task in enumerate(created)
+    ]
+    updated_by_id = {task.id: TaskOut.model_validate(task) for task in updated}
+    for i, item in enumerate(payload.update):
+        if item.id in owned:
+            results.append(TaskBulkResult(op="update", index=i, id=item.id, status=200, task=updated_by_id[item.id]))
+        else:
+            results.append(TaskBulkResult(op="update", index=i, id=item.id, status=404, detail="Task not found"))
+    for i, task_id in enumerate(payload.delete):
+        if task_id in owned:
+            results.append(TaskBulkResult(op="delete", index=i, id=task_id, status=204))
+        else:
+            results.append(TaskBulkResult(op="delete", index=i, id=task_id, status=404, detail="Task not found"))
+    return TaskBulkOut(results=results)
+
 
 @router.post("", response_model=TaskOut, status_code=status.HTTP_201_CREATED)
-def create_task(task_in: TaskCreate, db: Session = Depends(get_db), current: User = Depends(get_current_user)) -> TaskOut:
+def create_task(task_in: TaskCreate, db: Session = Depends(get_write_db), current: Principal = Depends(get_current_principal)) -> TaskOut:
     """Create task for the current user"""
     task = Task(user_id=current.id, **task_in.model_dump())
     db.add(task)
+    version = task.version = db.scalar(bump_tasks_version_stmt(db.get_bind().dialect.name, current.id))
     db.commit()
+    response_cache.invalidate(current.id, version, day_scopes(task_in.day))
     db.refresh(task)
+    task_events.publish(current.id, task_changes(version, [task]))
     return task
 
 
+@router.post("/bulk", response_model=TaskBulkOut)
+def bulk_tasks(payload: TaskBulkIn, db: Session = Depends(get_write_db), current: Principal = Depends(get_current_principal)) -> TaskBulkOut:
+    """
+    Apply a batch of create/update/delete operations in a single transaction
+
+    Items pointing at missing tasks or tasks of other users are reported with status 404,
+    the rest of the batch is still applied.
+    """
+    owned = dict(db.execute(bulk_owned_stmt(current.id, payload)).all())
+    dialect = db.get_bind().dialect.name
+    version = db.scalar(bump_tasks_version_stmt(dialect, current.id)) if payload.create or owned else None
+    (insert_stmt, insert_rows), (update_stmt, update_rows), reload_stmt, delete_stmt, tombstones = bulk_statements(
+        current.id, payload, owned, version
+    )
+    created = db.scalars(insert_stmt, insert_rows).all() if insert_rows else []
+    if update_rows:
+        db.execute(update_stmt, update_rows)
+    updated = db.scalars(reload_stmt).all() if payload.update else []
+    if payload.delete:
+        db.execute(delete_stmt)
+    if tombstones[1]:
+        db.execute(*tombstones)
+    result = bulk_results(payload, owned, created, updated)
+    message = task_changes(version, [*created, *updated], [i for i in payload.delete if i in owned])
+    db.commit()
+    if version is not None:
+        response_cache.invalidate(current.id, version, bulk_scopes(payload, owned))
+        task_events.publish(current.id, message)
+    return result
+
+
 @router.get("", response_model=List[TaskOut])
 def list_tasks(
-    db: Session = Depends(get_db),
-    current: User = Depends(get_current_user),
+    request: Request,
+    db: Session = Depends(get_read_db),
+    current: Principal = Depends(get_current_principal),
     day: Optional[date] = Query(None, description="Filter by specific day (YYYY-MM-DD)"),
     completed: Optional[bool] = Query(None, description="Filter by completion status"),
     month: Optional[str] = Query(None,description="Filter by month (YYYY-MM), e.g. 2025-11",),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Page size, enables keyset pagination"),
+    cursor: Optional[str] = Query(None, description=f"Cursor from the {NEXT_CURSOR_HEADER} header of previous page"),
+    accept: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
 ) -> list[TaskOut]:
     """
     List tasks for the current user
@@ -40,64 +497,158 @@ def list_tasks(
       - day: exact day (YYYY-MM-DD)
       - completed: true/false
       - month: month window (YYYY-MM)
+
+    Pagination: pass `limit` and follow the `X-Next-Cursor` response header.
+    Streaming: send `Accept: application/x-ndjson` to get one task per line as rows are read.
+    Compact formats: `Accept: application/vnd.tasks.columns+json` returns `TaskColumns` (field
+    names once, one array per field), `application/msgpack` the same layout as MessagePack.
+    Responses carry an ETag, a matching `If-None-Match` gets 304 without loading the tasks.
+    Serialized day and month views are kept in the per-user response cache.
+    Rows are read as plain columns and encoded straight to JSON, skipping per-task model validation.
     """
-    q = (
-        db.query(Task)
-        .filter(Task.user_id == current.id)
-        .order_by(Task.day.asc(), Task.at_time.asc().nulls_last())
-    )
+    version = db.scalar(tasks_version_stmt(current.id))
+    etag = list_etag(version, request)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
 
-    if completed is not None:
-        q = q.filter(Task.completed == completed)
+    media_type = list_media_type(accept)
+    filters = dict(day=day, completed=completed, month=month, cursor=cursor)
+    cache_key = list_cache_key(day, month, completed, limit, cursor, media_type)
+    if cache_key is not None:
+        body = response_cache.get(current.id, version, cache_key)
+        if body is None:
+            body = encode_tasks(db.execute(task_rows_stmt(list_tasks_stmt(current.id, **filters))).all(), media_type)
+            response_cache.set(current.id, version, cache_key, body)
+        return list_response(body, etag, media_type)
 
-    if day is not None:
-        q = q.filter(Task.day == day)
-    elif month is not None:
-        try:
-            year_str, month_str = month.split("-", 1)
-            year_i = int(year_str)
-            month_i = int(month_str)
-            if not (1 <= month_i <= 12):
-                raise ValueError
-        except Exception as exc:  # noqa: BLE001
-            raise HTTPException(status_code=400, detail="Invalid month format. Use YYYY-MM.") from exc
+    if media_type == NDJSON_MEDIA_TYPE:
+        stmt = list_tasks_stmt(current.id, limit=limit, **filters)
+        return StreamingResponse(
+            _ndjson_lines(db, stmt),
+            media_type=NDJSON_MEDIA_TYPE,
+            headers={"ETag": etag, "Cache-Control": ETAG_CACHE_CONTROL},
+        )
+
+    # one look-ahead row tells whether there is a next page
+    stmt = task_rows_stmt(list_tasks_stmt(current.id, limit=limit + 1 if limit else None, **filters))
+    return page_response(*paginate(db.execute(stmt).all(), limit), etag, media_type)
 
-        last_day = calendar.monthrange(year_i, month_i)[1]
-        month_start = date(year_i, month_i, 1)
-        month_end = date(year_i, month_i, last_day)
-        q = q.filter(Task.day.between(month_start, month_end))
 
-    return q.all()
+@router.get("/summary", response_model=List[TaskDaySummary])
+def task_summary(
+    start: date = Query(..., description="First day of the range (YYYY-MM-DD)"),
+    end: date = Query(..., description="Last day of the range, inclusive (YYYY-MM-DD)"),
+    db: Session = Depends(get_read_db),
+    current: Principal = Depends(get_current_principal),
+) -> list[TaskDaySummary]:
+    """Per-day task counts for calendar grids; days without tasks are omitted"""
+    return db.execute(summary_stmt(current.id, start, end)).mappings().all()
+
+
+@router.get("/changes", response_model=TaskChanges)
+def task_changes_since(
+    request: Request,
+    since: Optional[str] = Query(None, description="`cursor` of the previous sync, omit for a full sync"),
+    db: Session = Depends(get_read_db),
+    current: Principal = Depends(get_current_principal),
+    if_none_match: Optional[str] = Header(None),
+) -> TaskChanges:
+    """
+    Delta sync: tasks created or updated after `since` and ids of tasks deleted after it
+
+    Apply `upserted`, then `deleted`, and keep `cursor` for the next call. A cursor older than
+    the tombstone retention gets 410: drop local tasks and sync again without `since`.
+    Unchanged tasks answer 304 to `If-None-Match` with the previous ETag.
+    """
+    version, compacted = db.execute(sync_state_stmt(current.id)).one()
+    since_version = parse_since(since, version, compacted)
+    etag = list_etag(version, request)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    upserted = db.execute(changed_tasks_stmt(current.id, since_version)).all()
+    deleted = db.scalars(deleted_tasks_stmt(current.id, since_version)).all() if since is not None else []
+    return list_response(encode_changes(version, upserted, deleted), etag)
+
+
+@router.get("/search", response_model=List[TaskOut])
+def search_tasks(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200, description="Words to look up in title and description"),
+    completed: Optional[bool] = Query(None, description="Filter by completion status"),
+    limit: int = Query(SEARCH_DEFAULT_LIMIT, ge=1, le=200),
+    db: Session = Depends(get_read_db),
+    current: Principal = Depends(get_current_principal),
+    if_none_match: Optional[str] = Header(None),
+) -> list[TaskOut]:
+    """
+    Full-text search over the current user's tasks
+
+    Every word of `q` must match the beginning of a word in the title or description
+    ("zak mle" finds "Zakupy: mleko"). Results are ranked, title matches first.
+    """
+    version = db.scalar(tasks_version_stmt(current.id))
+    etag = list_etag(version, request)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    terms = search_terms(q)
+    if not terms:
+        return list_response(encode_task_rows([]), etag)
+    stmt = search_tasks_stmt(db.get_bind().dialect.name, current.id, terms, completed, limit)
+    return list_response(encode_task_rows(db.execute(stmt).all()), etag)
 
 
 @router.get("/{task_id}", response_model=TaskOut)
-def get_task(task_id: int, db: Session = Depends(get_db), current: User = Depends(get_current_user)) -> TaskOut:
+def get_task(
+    task_id: int,
+    response: Response,
+    db: Session = Depends(get_read_db),
+    current: Principal = Depends(get_current_principal),
+    if_none_match: Optional[str] = Header(None),
+) -> TaskOut:
     """Get task by id"""
-    task = db.query(Task).filter(Task.user_id == current.id, Task.id == task_id).first()
+    etag = make_etag(db.scalar(tasks_version_stmt(current.id)), "task", task_id)
+    if matches_any(if_none_match) and not db.scalars(owned_task_stmt(current.id, task_id)).first():
+        raise HTTPException(status_code=404, detail="Task not found")
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    task = db.scalars(owned_task_stmt(current.id, task_id)).first()
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
+    set_etag(response, etag)
     return task
 
 
 @router.put("/{task_id}", response_model=TaskOut)
-def update_task(task_id: int, update: TaskUpdate, db: Session = Depends(get_db), current: User = Depends(get_current_user)) -> TaskOut:
+def update_task(task_id: int, update: TaskUpdate, db: Session = Depends(get_write_db), current: Principal = Depends(get_current_principal)) -> TaskOut:
     """Update task by id"""
-    task = db.query(Task).filter(Task.user_id == current.id, Task.id == task_id).first()
+    task = db.scalars(owned_task_stmt(current.id, task_id)).first()
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
+    old_day = task.day
     for k, v in update.model_dump(exclude_unset=True).items():
         setattr(task, k, v)
     db.add(task)
+    version = task.version = db.scalar(bump_tasks_version_stmt(db.get_bind().dialect.name, current.id))
     db.commit()
+    response_cache.invalidate(current.id, version, day_scopes(old_day, update.day))
     db.refresh(task)
+    task_events.publish(current.id, task_changes(version, [task]))
     return task
 
 
 @router.delete("/{task_id}", status_code=204)
-def delete_task(task_id: int, db: Session = Depends(get_db), current: User = Depends(get_current_user)) -> None:
+def delete_task(task_id: int, db: Session = Depends(get_write_db), current: Principal = Depends(get_current_principal)) -> None:
     """Delete task by id"""
-    task = db.query(Task).filter(Task.user_id == current.id, Task.id == task_id).first()
+    task = db.scalars(owned_task_stmt(current.id, task_id)).first()
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
+    day = task.day
     db.delete(task)
+    version = db.scalar(bump_tasks_version_stmt(db.get_bind().dialect.name, current.id))
+    db.add(TaskTombstone(user_id=current.id, version=version, task_id=task_id))
     db.commit()
+    response_cache.invalidate(current.id, version, day_scopes(day))
+    task_events.publish(current.id, task_changes(version, deleted=[task_id]))
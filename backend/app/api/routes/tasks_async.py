@@ -0,0 +1,264 @@
+"""Async variants of the task routes, mounted instead of `tasks` when `DB_ASYNC` is enabled"""
+from __future__ import annotations
+
+from datetime import date
+from typing import AsyncIterator, List, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import Principal, get_current_principal_async
+from app.core.pubsub import task_events
+from app.core.response_cache import day_scopes, response_cache
+from app.api.routes.tasks import (
+    ETAG_CACHE_CONTROL,
+    NDJSON_MEDIA_TYPE,
+    NEXT_CURSOR_HEADER,
+    SEARCH_DEFAULT_LIMIT,
+    STREAM_BATCH_SIZE,
+    bulk_owned_stmt,
+    bulk_results,
+    bulk_scopes,
+    bulk_statements,
+    bump_tasks_version_stmt,
+    changed_tasks_stmt,
+    deleted_tasks_stmt,
+    encode_changes,
+    encode_task_row,
+    encode_task_rows,
+    encode_tasks,
+    etag_matches,
+    list_cache_key,
+    list_etag,
+    list_media_type,
+    list_response,
+    list_tasks_stmt,
+    make_etag,
+    matches_any,
+    not_modified,
+    owned_task_stmt,
+    page_response,
+    paginate,
+    parse_since,
+    search_tasks_stmt,
+    set_etag,
+    summary_stmt,
+    sync_state_stmt,
+    task_changes,
+    task_rows_stmt,
+    tasks_version_stmt,
+)
+from app.db.models import Task, TaskTombstone
+from app.db.search import search_terms
+from app.db.session import get_async_read_db, get_async_write_db
+from app.schemas.task import TaskBulkIn, TaskBulkOut, TaskChanges, TaskCreate, TaskDaySummary, TaskOut, TaskUpdate
+
+router = APIRouter(prefix="/api/tasks", tags=["tasks"])
+
+
+@router.post("", response_model=TaskOut, status_code=status.HTTP_201_CREATED)
+async def create_task(
+    task_in: TaskCreate, db: AsyncSession = Depends(get_async_write_db), current: Principal = Depends(get_current_principal_async)
+) -> TaskOut:
+    """Create task for the current user"""
+    task = Task(user_id=current.id, **task_in.model_dump())
+    db.add(task)
+    version = task.version = await db.scalar(bump_tasks_version_stmt(db.get_bind().dialect.name, current.id))
+    await db.commit()
+    response_cache.invalidate(current.id, version, day_scopes(task_in.day))
+    await db.refresh(task)
+    task_events.publish(current.id, task_changes(version, [task]))
+    return task
+
+
+@router.post("/bulk", response_model=TaskBulkOut)
+async def bulk_tasks(
+    payload: TaskBulkIn, db: AsyncSession = Depends(get_async_write_db), current: Principal = Depends(get_current_principal_async)
+) -> TaskBulkOut:
+    """Apply a batch of create/update/delete operations in a single transaction"""
+    owned = dict((await db.execute(bulk_owned_stmt(current.id, payload))).all())
+    dialect = db.get_bind().dialect.name
+    version = await db.scalar(bump_tasks_version_stmt(dialect, current.id)) if payload.create or owned else None
+    (insert_stmt, insert_rows), (update_stmt, update_rows), reload_stmt, delete_stmt, tombstones = bulk_statements(
+        current.id, payload, owned, version
+    )
+    created = (await db.scalars(insert_stmt, insert_rows)).all() if insert_rows else []
+    if update_rows:
+        await db.execute(update_stmt, update_rows)
+    updated = (await db.scalars(reload_stmt)).all() if payload.update else []
+    if payload.delete:
+        await db.execute(delete_stmt)
+    if tombstones[1]:
+        await db.execute(*tombstones)
+    result = bulk_results(payload, owned, created, updated)
+    message = task_changes(version, [*created, *updated], [i for i in payload.delete if i in owned])
+    await db.commit()
+    if version is not None:
+        response_cache.invalidate(current.id, version, bulk_scopes(payload, owned))
+        task_events.publish(current.id, message)
+    return result
+
+
+async def _ndjson_lines(db: AsyncSession, stmt: Select) -> AsyncIterator[bytes]:
+    result = await db.stream(task_rows_stmt(stmt).execution_options(yield_per=STREAM_BATCH_SIZE))
+    async for row in result:
+        yield encode_task_row(row) + b"\n"
+
+
+@router.get("", response_model=List[TaskOut])
+async def list_tasks(
+    request: Request,
+    db: AsyncSession = Depends(get_async_read_db),
+    current: Principal = Depends(get_current_principal_async),
+    day: Optional[date] = Query(None, description="Filter by specific day (YYYY-MM-DD)"),
+    completed: Optional[bool] = Query(None, description="Filter by completion status"),
+    month: Optional[str] = Query(None, description="Filter by month (YYYY-MM), e.g. 2025-11"),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Page size, enables keyset pagination"),
+    cursor: Optional[str] = Query(None, description=f"Cursor from the {NEXT_CURSOR_HEADER} header of previous page"),
+    accept: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+) -> list[TaskOut]:
+    """List tasks for the current user (same filters, pagination, streaming, ETags and caching as the sync route)"""
+    version = await db.scalar(tasks_version_stmt(current.id))
+    etag = list_etag(version, request)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    media_type = list_media_type(accept)
+    filters = dict(day=day, completed=completed, month=month, cursor=cursor)
+    cache_key = list_cache_key(day, month, completed, limit, cursor, media_type)
+    if cache_key is not None:
+        body = response_cache.get(current.id, version, cache_key)
+        if body is None:
+            body = encode_tasks((await db.execute(task_rows_stmt(list_tasks_stmt(current.id, **filters)))).all(), media_type)
+            response_cache.set(current.id, version, cache_key, body)
+        return list_response(body, etag, media_type)
+
+    if media_type == NDJSON_MEDIA_TYPE:
+        stmt = list_tasks_stmt(current.id, limit=limit, **filters)
+        return StreamingResponse(
+            _ndjson_lines(db, stmt),
+            media_type=NDJSON_MEDIA_TYPE,
+            headers={"ETag": etag, "Cache-Control": ETAG_CACHE_CONTROL},
+        )
+
+    stmt = task_rows_stmt(list_tasks_stmt(current.id, limit=limit + 1 if limit else None, **filters))
+    return page_response(*paginate((await db.execute(stmt)).all(), limit), etag, media_type)
+
+
+async def _get_owned(db: AsyncSession, user_id: int, task_id: int) -> Task:
+    task = (await db.scalars(owned_task_stmt(user_id, task_id))).first()
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return task
+
+
+@router.get("/summary", response_model=List[TaskDaySummary])
+async def task_summary(
+    start: date = Query(..., description="First day of the range (YYYY-MM-DD)"),
+    end: date = Query(..., description="Last day of the range, inclusive (YYYY-MM-DD)"),
+    db: AsyncSession = Depends(get_async_read_db),
+    current: Principal = Depends(get_current_principal_async),
+) -> list[TaskDaySummary]:
+    """Per-day task counts for calendar grids; days without tasks are omitted"""
+    return (await db.execute(summary_stmt(current.id, start, end))).mappings().all()
+
+
+@router.get("/changes", response_model=TaskChanges)
+async def task_changes_since(
+    request: Request,
+    since: Optional[str] = Query(None, description="`cursor` of the previous sync, omit for a full sync"),
+    db: AsyncSession = Depends(get_async_read_db),
+    current: Principal = Depends(get_current_principal_async),
+    if_none_match: Optional[str] = Header(None),
+) -> TaskChanges:
+    """Delta sync: tasks created or updated after `since` and ids of tasks deleted after it (as the sync route)"""
+    version, compacted = (await db.execute(sync_state_stmt(current.id))).one()
+    since_version = parse_since(since, version, compacted)
+    etag = list_etag(version, request)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    upserted = (await db.execute(changed_tasks_stmt(current.id, since_version))).all()
+    deleted = (await db.scalars(deleted_tasks_stmt(current.id, since_version))).all() if since is not None else []
+    return list_response(encode_changes(version, upserted, deleted), etag)
+
+
+@router.get("/search", response_model=List[TaskOut])
+async def search_tasks(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200, description="Words to look up in title and description"),
+    completed: Optional[bool] = Query(None, description="Filter by completion status"),
+    limit: int = Query(SEARCH_DEFAULT_LIMIT, ge=1, le=200),
+    db: AsyncSession = Depends(get_async_read_db),
+    current: Principal = Depends(get_current_principal_async),
+    if_none_match: Optional[str] = Header(None),
+) -> list[TaskOut]:
+    """Full-text search over the current user's tasks (same matching and ranking as the sync route)"""
+    version = await db.scalar(tasks_version_stmt(current.id))
+    etag = list_etag(version, request)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    terms = search_terms(q)
+    if not terms:
+        return list_response(encode_task_rows([]), etag)
+    stmt = search_tasks_stmt(db.get_bind().dialect.name, current.id, terms, completed, limit)
+    return list_response(encode_task_rows((await db.execute(stmt)).all()), etag)
+
+
+@router.get("/{task_id}", response_model=TaskOut)
+async def get_task(
+    task_id: int,
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db),
+    current: Principal = Depends(get_current_principal_async),
+    if_none_match: Optional[str] = Header(None),
+) -> TaskOut:
+    """Get task by id"""
+    etag = make_etag(await db.scalar(tasks_version_stmt(current.id)), "task", task_id)
+    if matches_any(if_none_match):
+        await _get_owned(db, current.id, task_id)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    task = await _get_owned(db, current.id, task_id)
+    set_etag(response, etag)
+    return task
+
+
+@router.put("/{task_id}", response_model=TaskOut)
+async def update_task(
+    task_id: int,
+    update: TaskUpdate,
+    db: AsyncSession = Depends(get_async_write_db),
+    current: Principal = Depends(get_current_principal_async),
+) -> TaskOut:
+    """Update task by id"""
+    task = await _get_owned(db, current.id, task_id)
+    old_day = task.day
+    for k, v in update.model_dump(exclude_unset=True).items():
+        setattr(task, k, v)
+    version = task.version = await db.scalar(bump_tasks_version_stmt(db.get_bind().dialect.name, current.id))
+    await db.commit()
+    response_cache.invalidate(current.id, version, day_scopes(old_day, update.day))
+    await db.refresh(task)
+    task_events.publish(current.id, task_changes(version, [task]))
+    return task
+
+
+@router.delete("/{task_id}", status_code=204)
+async def delete_task(
+    task_id: int, db: AsyncSession = Depends(get_async_write_db), current: Principal = Depends(get_current_principal_async)
+) -> None:
+    """Delete task by id"""
+    task = await _get_owned(db, current.id, task_id)
+    day = task.day
+    await db.delete(task)
+    version = await db.scalar(bump_tasks_version_stmt(db.get_bind().dialect.name, current.id))
+    db.add(TaskTombstone(user_id=current.id, version=version, task_id=task_id))
+    await db.commit()
+    response_cache.invalidate(current.id, version, day_scopes(day))
+    task_events.publish(current.id, task_changes(version, deleted=[task_id]))
@@ -0,0 +1,34 @@
+"""Helpers shared by websocket routes"""
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable
+
+from fastapi import WebSocket, WebSocketDisconnect
+
+
+async def wait_disconnect(ws: WebSocket) -> None:
+    while True:
+        message = await ws.receive()
+        if message["type"] == "websocket.disconnect":
+            return
+
+
+async def forward_queue(ws: WebSocket, queue: asyncio.Queue, send: Callable[[Any], Awaitable[None]]) -> bool:
+    """Send queued messages until the client disconnects (returns False) or `None` is queued (returns True)"""
+    disconnected = asyncio.create_task(wait_disconnect(ws))
+    try:
+        while True:
+            next_message = asyncio.create_task(queue.get())
+            done, _ = await asyncio.wait({next_message, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+            if disconnected in done:
+                next_message.cancel()
+                return False
+            message = next_message.result()
+            if message is None:
+                return True
+            await send(message)
+    except WebSocketDisconnect:
+        return False
+    finally:
+        disconnected.cancel()
@@ -0,0 +1,163 @@
+"""Admission control: per-class concurrency limits with bounded wait queues"""
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import get_settings
+from app.core.metrics import Counter, Histogram, registry
+
+settings = get_settings()
+
+"""Routes doing bcrypt work or reading many rows"""
+EXPENSIVE_ROUTES = frozenset({
+    ("POST", "/api/auth/login"),
+    ("POST", "/api/auth/register"),
+    ("POST", "/api/tasks/bulk"),
+    ("GET", "/api/tasks"),
+    ("GET", "/api/tasks/summary"),
+    ("GET", "/api/tasks/search"),
+    ("GET", "/api/tasks/changes"),
+    ("GET", "/api/task-rules/occurrences"),
+})
+"""Probes that must answer during overload"""
+UNLIMITED_PATHS = frozenset({"/api/health", "/metrics"})
+
+BUSY_BODY = b'{"detail":"Server busy, try again shortly"}'
+
+admission_rejected = registry.register(
+    Counter("http_requests_shed_total", "HTTP requests rejected by admission control", ("class",))
+)
+admission_wait = registry.register(
+    Histogram("admission_queue_wait_seconds", "Time admitted requests spent in the wait queue", ("class",))
+)
+
+
+class ConcurrencyLimiter:
+    """
+    At most `limit` requests run at once, up to `max_queue` more wait in FIFO order
+
+    A request that finds the queue full, or waits longer than `timeout`, is rejected right away
+    instead of piling up in the threadpool. `limit=0` disables the limiter.
+    """
+
+    def __init__(self, name: str, limit: int, max_queue: int, timeout: float) -> None:
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.active = 0
+        self.rejected = 0
+        self._waiters: Deque[asyncio.Future[None]] = deque()
+
+    @property
+    def enabled(self) -> bool:
+        return self.limit > 0
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> bool:
+        """Take a slot, False when the request has to be shed"""
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return True
+        if len(self._waiters) >= self.max_queue:
+            return self._reject()
+
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.timeout)
+        except asyncio.TimeoutError:
+            if not waiter.done():
+                waiter.cancel()
+                self._waiters.remove(waiter)
+                return self._reject()
+        except BaseException:
+            # client went away: hand over a slot granted meanwhile, otherwise leave the queue
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            else:
+                waiter.cancel()
+                self._waiters.remove(waiter)
+            raise
+        admission_wait.observe(time.perf_counter() - started, (self.name,))
+        return True
+
+    def release(self) -> None:
+        # the slot passes straight to the oldest waiter, `active` stays the same
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def _reject(self) -> bool:
+        self.rejected += 1
+        admission_rejected.inc((self.name,))
+        return False
+
+    def stats(self) -> Dict[str, int]:
+        return {"limit": self.limit, "active": self.active, "queued": self.queued, "rejected": self.rejected}
+
+
+expensive_limiter = ConcurrencyLimiter(
+    "expensive", settings.ADMISSION_EXPENSIVE_LIMIT, settings.ADMISSION_EXPENSIVE_QUEUE, settings.ADMISSION_QUEUE_TIMEOUT_SECONDS
+)
+cheap_limiter = ConcurrencyLimiter(
+    "cheap", settings.ADMISSION_CHEAP_LIMIT, settings.ADMISSION_CHEAP_QUEUE, settings.ADMISSION_QUEUE_TIMEOUT_SECONDS
+)
+
+
+class AdmissionMiddleware:
+    """ASGI middleware answering 503 + Retry-After when the limiter of the request's class is saturated"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        expensive: ConcurrencyLimiter = expensive_limiter,
+        cheap: ConcurrencyLimiter = cheap_limiter,
+        retry_after: int = settings.ADMISSION_RETRY_AFTER_SECONDS,
+    ) -> None:
+        self.app = app
+        self.expensive = expensive
+        self.cheap = cheap
+        self.retry_after = str(retry_after).encode()
+
+    def limiter_for(self, method: str, path: str) -> Optional[ConcurrencyLimiter]:
+        path = path.rstrip("/") or "/"
+        if path in UNLIMITED_PATHS or method == "OPTIONS":
+            return None
+        limiter = self.expensive if (method, path) in EXPENSIVE_ROUTES else self.cheap
+        return limiter if limiter.enabled else None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        limiter = self.limiter_for(scope["method"], scope["path"]) if scope["type"] == "http" else None
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not await limiter.acquire():
+            await send({
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(BUSY_BODY)).encode()),
+                    (b"retry-after", self.retry_after),
+                ],
+            })
+            await send({"type": "http.response.body", "body": BUSY_BODY})
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
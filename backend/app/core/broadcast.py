@@ -0,0 +1,63 @@
+"""Periodic broadcast of one payload to many websocket subscribers"""
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Any, Callable, Dict, Optional, Set
+
+
+class Ticker:
+    """
+    Builds the payload once per interval while anyone listens and hands the encoded text to
+    every subscriber queue. Queues are small: a subscriber that cannot keep up gets `None`
+    instead of a backlog and is dropped.
+    """
+
+    def __init__(self, build: Callable[[], Dict[str, Any]], interval: float = 1.0, queue_size: int = 2) -> None:
+        self.build = build
+        self.interval = interval
+        self.queue_size = queue_size
+        self.dropped = 0
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    def subscribe(self) -> asyncio.Queue:
+        """Register a subscriber and start ticking if it is the first one; call from the event loop"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._task = loop.create_task(self._run())
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def tick(self) -> None:
+        """Encode the current payload once and offer it to all subscribers"""
+        text = json.dumps(self.build(), separators=(",", ":"))
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(text)
+            except asyncio.QueueFull:
+                self._drop(queue)
+
+    def _drop(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(None)
+        self.dropped += 1
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time()
+        while self._subscribers:
+            self.tick()
+            # fixed schedule, time spent building does not make ticks drift
+            deadline += self.interval
+            await asyncio.sleep(max(0.0, deadline - loop.time()))
+        self._task = None
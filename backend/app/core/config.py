@@ -31,6 +31,95 @@ class Settings(BaseSettings):
     DB_PASSWORD: str = Field(default="calendar_password")
     DB_NAME: str = Field(default="calendar_db")
     DB_SCHEMA: str = Field(default="calendar")
+    DB_ASYNC: bool = Field(default=False)
+
+    # Connection pool of the engine serving the routes (async one with DB_ASYNC); the other
+    # engine only serves websocket auth and startup work and gets the small DB_AUX_* pool
+    DB_POOL_SIZE: int = Field(default=5)
+    DB_MAX_OVERFLOW: int = Field(default=10)
+    DB_AUX_POOL_SIZE: int = Field(default=1)
+    DB_AUX_MAX_OVERFLOW: int = Field(default=1)
+    DB_POOL_TIMEOUT: float = Field(default=30.0)
+    DB_POOL_RECYCLE: int = Field(default=1800)
+    DB_STATEMENT_TIMEOUT_MS: int = Field(default=0)
+    # PgBouncer transaction pooling: no server-side prepared statements and no startup options
+    # (set statement_timeout on the database role instead); DB_NULL_POOL leaves pooling to PgBouncer
+    DB_PGBOUNCER: bool = Field(default=False)
+    DB_NULL_POOL: bool = Field(default=False)
+
+    # Read replicas (comma-separated SQLAlchemy URLs) for read-only task routes, "round_robin" or
+    # "least_loaded"; a user's reads stay on the primary for DB_READ_YOUR_WRITES_SECONDS after a write
+    # (on other workers only while the client sends back the X-Primary-Until response header)
+    DB_REPLICA_URLS: str = Field(default="")
+    DB_REPLICA_STRATEGY: str = Field(default="round_robin")
+    DB_READ_YOUR_WRITES_SECONDS: float = Field(default=5.0)
+
+    # Multi-worker launcher (python -m app.launcher): connections of all workers together, 0 = no budget
+    APP_WORKERS: int = Field(default=1)
+    DB_MAX_CONNECTIONS: int = Field(default=0)
+
+    # Password hashing pool: bcrypt runs on these workers, extra requests wait in a bounded queue
+    PASSWORD_HASH_WORKERS: int = Field(default=2)
+    PASSWORD_HASH_QUEUE: int = Field(default=8)
+
+    # Stateless auth: task routes trust token claims and only check `token_version` against a
+    # per-worker map refreshed after TOKEN_VERSION_TTL_SECONDS. A revocation made on another worker
+    # takes up to that long to reach these routes, and up to USER_CACHE_TTL_SECONDS to reach routes
+    # loading the user (also without stateless auth); newer tokens are accepted right away
+    JWT_STATELESS: bool = Field(default=False)
+    TOKEN_VERSION_CACHE_SIZE: int = Field(default=100_000)
+    TOKEN_VERSION_TTL_SECONDS: float = Field(default=5.0)
+
+    # Admission control: concurrent requests per class (login/register/bulk/listing vs the rest, 0
+    # disables) and how many may wait; a full queue or a longer wait than the timeout answers 503
+    ADMISSION_EXPENSIVE_LIMIT: int = Field(default=8)
+    ADMISSION_EXPENSIVE_QUEUE: int = Field(default=32)
+    ADMISSION_CHEAP_LIMIT: int = Field(default=32)
+    ADMISSION_CHEAP_QUEUE: int = Field(default=128)
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = Field(default=2.0)
+    ADMISSION_RETRY_AFTER_SECONDS: int = Field(default=1)
+
+    # Authenticated user cache (0 disables)
+    USER_CACHE_SIZE: int = Field(default=10_000)
+    USER_CACHE_TTL_SECONDS: float = Field(default=60.0)
+
+    # Task list response cache: "memory" or "none"
+    RESPONSE_CACHE_BACKEND: str = Field(default="memory")
+    RESPONSE_CACHE_MAX_BYTES: int = Field(default=64 * 1024 * 1024)
+
+    # Task change push (/ws/tasks): per-connection queue size, PostgreSQL NOTIFY fan-out across workers
+    TASK_EVENTS_QUEUE_SIZE: int = Field(default=256)
+    TASK_EVENTS_PG_NOTIFY: bool = Field(default=False)
+
+    # Delta sync (/api/tasks/changes): tombstones of deleted tasks are kept this many days and
+    # compacted every TASK_TOMBSTONE_COMPACT_INTERVAL_SECONDS (0 disables); older cursors get 410
+    TASK_TOMBSTONE_RETENTION_DAYS: int = Field(default=30)
+    TASK_TOMBSTONE_COMPACT_INTERVAL_SECONDS: float = Field(default=3600.0)
+
+    # Reminders for pending tasks with at_time: in-process scheduler keeping the next
+    # REMINDERS_HORIZON_SECONDS in memory; at_time is read in REMINDERS_TIMEZONE and reminded
+    # REMINDERS_LEAD_MINUTES before; sink "websocket" (/ws/tasks of this worker) or "log". Only
+    # started with TASK_EVENTS_PG_NOTIFY, workers do not see each other's writes otherwise
+    REMINDERS_ENABLED: bool = Field(default=False)
+    REMINDERS_SINK: str = Field(default="websocket")
+    REMINDERS_TIMEZONE: str = Field(default="UTC")
+    REMINDERS_LEAD_MINUTES: int = Field(default=0)
+    REMINDERS_HORIZON_SECONDS: float = Field(default=6 * 3600.0)
+
+    # Request profiling (off by default): requests with `X-Profile: <PROFILING_SECRET>`, or a
+    # PROFILING_SAMPLE_RATE share of requests to PROFILING_PATHS (comma-separated, empty = all), run
+    # under cProfile with their SQL recorded; the newest PROFILING_MAX_FILES go to PROFILING_DIR and
+    # are listed on /api/profiles, which also requires the secret
+    PROFILING_ENABLED: bool = Field(default=False)
+    PROFILING_SECRET: str = Field(default="")
+    PROFILING_SAMPLE_RATE: float = Field(default=0.0)
+    PROFILING_PATHS: str = Field(default="/api/tasks,/api/auth/login")
+    PROFILING_DIR: str = Field(default="profiles")
+    PROFILING_MAX_FILES: int = Field(default=200)
+
+    # gzip for responses of at least GZIP_MINIMUM_SIZE bytes (0 disables compression)
+    GZIP_MINIMUM_SIZE: int = Field(default=1024)
+    GZIP_COMPRESS_LEVEL: int = Field(default=5)
 
     # CORS
     CORS_ORIGINS: str = Field(default="*")
@@ -42,6 +131,21 @@ class Settings(BaseSettings):
             f"postgresql+psycopg://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
         )
 
+    @property
+    def sql_alchemy_async_uri(self) -> str:
+        """Return SQLAlchemy PostgreSQL connection URI for the async (psycopg) driver"""
+        return (
+            f"postgresql+psycopg_async://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
+        )
+
+    @property
+    def replica_urls_list(self) -> List[str]:
+        return [u.strip() for u in self.DB_REPLICA_URLS.split(",") if u.strip()]
+
+    @property
+    def profiling_paths_list(self) -> List[str]:
+        return [p.strip() for p in self.PROFILING_PATHS.split(",") if p.strip()]
+
     @property
     def cors_origins_list(self) -> List[str]:
         raw = self.CORS_ORIGINS
@@ -0,0 +1,322 @@
+"""Lightweight runtime metrics collected in-process
+
+`RequestStats` keeps the recent-latency window shown on /ws/status. The Prometheus metrics
+exposed on /metrics are plain counters and fixed-bucket histograms guarded by a lock, so
+recording a sample costs a dictionary lookup and a few additions.
+"""
+from __future__ import annotations
+
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+Labels = Tuple[str, ...]
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def percentile(sorted_values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted sequence"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+class RequestStats:
+    """In-flight HTTP requests and a window of the most recent latencies"""
+
+    def __init__(self, window: int = 2048) -> None:
+        self.in_flight = 0
+        self.total = 0
+        self._latencies: deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def started(self) -> None:
+        with self._lock:
+            self.in_flight += 1
+
+    def finished(self, seconds: float) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            self.total += 1
+            self._latencies.append(seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            latencies = sorted(self._latencies)
+            in_flight, total = self.in_flight, self.total
+        return {
+            "in_flight": in_flight,
+            "total": total,
+            "latency_ms": {
+                f"p{pct}": round(percentile(latencies, pct) * 1000, 2) for pct in (50, 95, 99)
+            },
+            "window": len(latencies),
+        }
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names: Sequence[str], values: Labels, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """Monotonic counter with a fixed set of label names"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, doc: str, labels: Sequence[str] = ()) -> None:
+        self.name = name
+        self.doc = doc
+        self.labels = tuple(labels)
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: Labels = (), amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, labels: Labels = ()) -> float:
+        return self._values.get(labels, 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_label_text(self.labels, labels)} {value:g}" for labels, value in items]
+
+
+class Histogram:
+    """Cumulative fixed-bucket histogram with a fixed set of label names"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, doc: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> None:
+        self.name = name
+        self.doc = doc
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # per label set: [count per bucket (+Inf last)], sum
+        self._values: Dict[Labels, Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, labels: Labels = ()) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][index] += 1
+            series[1][0] += value
+
+    def count(self, labels: Labels = ()) -> int:
+        series = self._values.get(labels)
+        return sum(series[0]) if series else 0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = [(labels, list(counts), total[0]) for labels, (counts, total) in self._values.items()]
+        lines = []
+        for labels, counts, total in items:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                bucket_labels = _label_text(self.labels, labels, 'le="' + le + '"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_label_text(self.labels, labels)} {total:.6f}")
+            lines.append(f"{self.name}_count{_label_text(self.labels, labels)} {cumulative}")
+        return lines
+
+
+class Gauge:
+    """Value read from a callback at scrape time"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, doc: str, read: Callable[[], Optional[float]]) -> None:
+        self.name = name
+        self.doc = doc
+        self.read = read
+
+    def samples(self) -> List[str]:
+        value = self.read()
+        return [] if value is None else [f"{self.name} {value:g}"]
+
+
+class Registry:
+    def __init__(self) -> None:
+        self.metrics: List[Any] = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Prometheus text exposition format 0.0.4"""
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.doc}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+request_stats = RequestStats()
+registry = Registry()
+
+http_requests = registry.register(
+    Counter("http_requests_total", "HTTP requests by route and status", ("method", "route", "status"))
+)
+http_errors = registry.register(
+    Counter("http_request_errors_total", "HTTP requests that failed with 5xx or an exception", ("method", "route"))
+)
+http_duration = registry.register(
+    Histogram("http_request_duration_seconds", "HTTP request latency", ("method", "route"))
+)
+http_in_flight = registry.register(
+    Gauge("http_requests_in_flight", "HTTP requests being processed", lambda: request_stats.in_flight)
+)
+db_statement_duration = registry.register(
+    Histogram("db_statement_duration_seconds", "SQL statement execution time", ("operation",), SQL_BUCKETS)
+)
+db_queries_per_request = registry.register(
+    Histogram("db_queries_per_request", "SQL statements executed while serving a request", ("route",), COUNT_BUCKETS)
+)
+db_pool_checkouts = registry.register(
+    Counter("db_pool_checkouts_total", "Connections checked out of instrumented pools")
+)
+"""Connections checked out and not yet returned, over all instrumented pools"""
+_pool_in_use = [0]
+_pool_lock = threading.Lock()
+db_pool_in_use = registry.register(
+    Gauge("db_pool_connections_in_use", "Pooled connections currently checked out", lambda: _pool_in_use[0])
+)
+
+
+"""Statements executed by the current request; a mutable holder so threadpool copies of the context share it"""
+_request_queries: ContextVar[Optional[List[int]]] = ContextVar("request_queries", default=None)
+"""(statement, seconds) of every statement while set, used by request profiling"""
+statement_log: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar("statement_log", default=None)
+
+
+def _route_label(scope: Scope) -> str:
+    # route templates keep the label set bounded, unmatched paths share one label
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """ASGI middleware feeding `RequestStats` and the HTTP Prometheus metrics; websockets are not counted"""
+
+    def __init__(self, app: ASGIApp, stats: RequestStats = request_stats) -> None:
+        self.app = app
+        self.stats = stats
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        queries = [0]
+        token = _request_queries.set(queries)
+        start = time.perf_counter()
+        self.stats.started()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            _request_queries.reset(token)
+            self.stats.finished(elapsed)
+            method, route = scope["method"], _route_label(scope)
+            http_requests.inc((method, route, str(status_code)))
+            http_duration.observe(elapsed, (method, route))
+            db_queries_per_request.observe(queries[0], (route,))
+            if status_code >= 500:
+                http_errors.inc((method, route))
+
+
+_OPERATION = re.compile(r"\s*(\w+)")
+
+
+def _operation(statement: str) -> str:
+    match = _OPERATION.match(statement)
+    return match.group(1).upper() if match else "OTHER"
+
+
+def instrument_engine(engine) -> None:
+    """Record statement timings, statements per request and pool checkouts of an engine"""
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, _cursor, _statement, _parameters, context, _executemany):
+        conn.info.setdefault("query_start", []).append((context, time.perf_counter()))
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, _cursor, statement, _parameters, _context, _executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()[1]
+        db_statement_duration.observe(elapsed, (_operation(statement),))
+        queries = _request_queries.get()
+        if queries is not None:
+            queries[0] += 1
+        log = statement_log.get()
+        if log is not None:
+            log.append((statement, elapsed))
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _failed(context):
+        # a failing statement gets no after_cursor_execute, drop its start time here
+        starts = context.connection.info.get("query_start") if context.connection is not None else None
+        if starts and starts[-1][0] is context.execution_context:
+            starts.pop()
+
+    @event.listens_for(sync_engine.pool, "checkout")
+    def _checkout(_dbapi_connection, _record, _proxy):
+        db_pool_checkouts.inc()
+        with _pool_lock:
+            _pool_in_use[0] += 1
+
+    @event.listens_for(sync_engine.pool, "checkin")
+    def _checkin(_dbapi_connection, _record):
+        with _pool_lock:
+            _pool_in_use[0] -= 1
+
+
+def pool_stats(engine) -> Dict[str, Any]:
+    """Connection usage of an engine's pool, `None` for counters the pool class does not track"""
+    pool = getattr(engine, "sync_engine", engine).pool
+
+    def counter(name: str):
+        method = getattr(pool, name, None)
+        return method() if callable(method) else None
+
+    return {
+        "class": type(pool).__name__,
+        "size": counter("size"),
+        "checked_out": counter("checkedout"),
+        "checked_in": counter("checkedin"),
+        "overflow": counter("overflow"),
+    }
@@ -0,0 +1,273 @@
+"""Opt-in per-request profiling with cProfile
+
+A request is profiled when it carries `X-Profile: <PROFILING_SECRET>` or, for the configured
+paths, with probability PROFILING_SAMPLE_RATE. The request gets one `cProfile.Profile`, enabled
+around its endpoint call by `profile_endpoints`, on the threadpool thread for sync endpoints and on
+the event loop for async ones (where coroutines of other requests interleaving are counted too).
+Dependencies are not profiled, their statements and time still show in the summary: every SQL
+statement the request executed is recorded with its timing.
+
+Only one request per worker is profiled at a time. From Python 3.12 cProfile is process-wide and
+refuses to start next to another active profiler; such a request is simply not profiled.
+"""
+from __future__ import annotations
+
+import asyncio
+import cProfile
+import functools
+import hmac
+import json
+import logging
+import pstats
+import random
+import re
+import secrets
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from inspect import iscoroutinefunction
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from fastapi.routing import APIRoute
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import get_settings
+from app.core.metrics import statement_log
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_ID_HEADER = b"x-profile-id"
+PROFILE_ID = re.compile(r"\d{8}T\d{12}-[0-9a-f]{8}")
+# statements kept per profile, the totals still count all of them
+MAX_STATEMENTS = 500
+TOP_FUNCTIONS = 40
+
+
+class RequestProfile:
+    """Profiler and SQL statements of one request"""
+
+    def __init__(self, reason: str) -> None:
+        self.id = f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S%f}-{secrets.token_hex(4)}"
+        self.reason = reason
+        self.profile = cProfile.Profile()
+        self.profiled = False  # the endpoint ran under the profiler
+        self.statements: List[Tuple[str, float]] = []
+
+    @contextmanager
+    def running(self) -> Iterator[None]:
+        """Profile the block, or just run it when another profiler is already active"""
+        try:
+            self.profile.enable()
+        except ValueError:
+            logger.warning("Not profiling request %s, another profiler is active", self.id)
+            yield
+            return
+        try:
+            yield
+        finally:
+            self.profile.disable()
+            self.profiled = True
+
+    def stats(self) -> pstats.Stats:
+        return pstats.Stats(self.profile)
+
+
+"""Profile of the request being served, read by the endpoint wrappers"""
+_active: ContextVar[Optional[RequestProfile]] = ContextVar("active_profile", default=None)
+
+
+def _profiled(call: Callable[..., Any]) -> Callable[..., Any]:
+    """Endpoint running under the current request's profiler, a context lookup otherwise"""
+    if iscoroutinefunction(call):
+
+        @functools.wraps(call)
+        async def run_async(**values: Any) -> Any:
+            profile = _active.get()
+            if profile is None:
+                return await call(**values)
+            with profile.running():
+                return await call(**values)
+
+        run_async.profiled = True
+        return run_async
+
+    @functools.wraps(call)
+    def run(**values: Any) -> Any:
+        # sync endpoints run on the threadpool with a copy of the request's context
+        profile = _active.get()
+        if profile is None:
+            return call(**values)
+        with profile.running():
+            return call(**values)
+
+    run.profiled = True
+    return run
+
+
+def profile_endpoints(routes: Iterable[Any]) -> None:
+    """Wrap the endpoint calls of the API routes; dependencies are left alone, overrides key on them"""
+    for route in routes:
+        if isinstance(route, APIRoute) and not getattr(route.dependant.call, "profiled", False):
+            route.dependant.call = _profiled(route.dependant.call)
+
+
+def top_functions(stats: pstats.Stats, limit: int = TOP_FUNCTIONS) -> List[Dict[str, Any]]:
+    """Functions with the highest cumulative time"""
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+    return [
+        {
+            "function": pstats.func_std_string(func),
+            "calls": calls,
+            "tottime_ms": round(tottime * 1000, 3),
+            "cumtime_ms": round(cumtime * 1000, 3),
+        }
+        for func, (_primitive, calls, tottime, cumtime, _callers) in rows
+    ]
+
+
+class ProfileStore:
+    """`<id>.prof` pstats dumps and `<id>.json` summaries in a directory, the newest `max_files` kept"""
+
+    def __init__(self, directory: str, max_files: int) -> None:
+        self.directory = Path(directory)
+        self.max_files = max_files
+
+    def save(self, profile: RequestProfile, summary: Dict[str, Any]) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        stats = profile.stats()
+        stats.dump_stats(self.directory / f"{profile.id}.prof")
+        summary["top_functions"] = top_functions(stats)
+        (self.directory / f"{profile.id}.json").write_text(json.dumps(summary), encoding="utf-8")
+        self._prune()
+
+    def _prune(self) -> None:
+        for stale in self._summaries()[self.max_files:]:
+            stale.unlink(missing_ok=True)
+            stale.with_suffix(".prof").unlink(missing_ok=True)
+
+    def _summaries(self) -> List[Path]:
+        """Summary files, newest first (ids start with their UTC timestamp)"""
+        if not self.directory.is_dir():
+            return []
+        return sorted(self.directory.glob("*.json"), reverse=True)
+
+    def index(self) -> List[Dict[str, Any]]:
+        """Summaries without the statement list and functions, newest first"""
+        entries = []
+        for path in self._summaries():
+            try:
+                summary = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue  # pruned or still being written
+            summary.pop("statements", None)
+            summary.pop("top_functions", None)
+            entries.append(summary)
+        return entries
+
+    def summary(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        path = self.dump_path(profile_id, ".json")
+        if path is None:
+            return None
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    def dump_path(self, profile_id: str, suffix: str = ".prof") -> Optional[Path]:
+        """Path of an existing artifact, None for unknown or malformed ids"""
+        if not PROFILE_ID.fullmatch(profile_id):
+            return None
+        path = self.directory / f"{profile_id}{suffix}"
+        return path if path.is_file() else None
+
+
+def secret_matches(secret: str, given: Optional[str]) -> bool:
+    return bool(secret) and given is not None and hmac.compare_digest(secret.encode(), given.encode())
+
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling forced and sampled HTTP requests into a `ProfileStore`"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        store: Optional[ProfileStore] = None,
+        secret: Optional[str] = None,
+        sample_rate: Optional[float] = None,
+        paths: Optional[List[str]] = None,
+    ) -> None:
+        settings = get_settings()
+        self.app = app
+        self.store = store or profile_store
+        self.secret = settings.PROFILING_SECRET if secret is None else secret
+        self.sample_rate = settings.PROFILING_SAMPLE_RATE if sample_rate is None else sample_rate
+        self.paths = frozenset(settings.profiling_paths_list if paths is None else paths)
+        self.busy = False
+
+    def _reason(self, scope: Scope) -> Optional[str]:
+        if self.busy:
+            return None
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER:
+                if secret_matches(self.secret, value.decode("latin-1")):
+                    return "header"
+                break
+        if self.sample_rate > 0 and (not self.paths or scope["path"] in self.paths):
+            if random.random() < self.sample_rate:
+                return "sampled"
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        reason = self._reason(scope) if scope["type"] == "http" else None
+        if reason is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(reason)
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if profile.profiled:
+                    message["headers"] = [*message.get("headers", ()), (PROFILE_ID_HEADER, profile.id.encode())]
+            await send(message)
+
+        self.busy = True
+        statements_token = statement_log.set(profile.statements)
+        active_token = _active.set(profile)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            _active.reset(active_token)
+            statement_log.reset(statements_token)
+            self.busy = False
+        if not profile.profiled:
+            return  # no endpoint ran (404, rejected) or the profiler could not start
+        route = getattr(scope.get("route"), "path", None)
+        summary = {
+            "id": profile.id,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "reason": reason,
+            "method": scope["method"],
+            "path": scope["path"],
+            "route": route,
+            "status": status_code,
+            "duration_ms": round(elapsed * 1000, 3),
+            "sql_count": len(profile.statements),
+            "sql_ms": round(sum(seconds for _, seconds in profile.statements) * 1000, 3),
+            "statements": [
+                {"sql": sql, "ms": round(seconds * 1000, 3)} for sql, seconds in profile.statements[:MAX_STATEMENTS]
+            ],
+        }
+        try:
+            await asyncio.to_thread(self.store.save, profile, summary)
+        except Exception:  # noqa: BLE001
+            logger.exception("Saving profile %s failed", profile.id)
+
+
+_settings = get_settings()
+profile_store = ProfileStore(_settings.PROFILING_DIR, _settings.PROFILING_MAX_FILES)
@@ -0,0 +1,179 @@
+"""In-process pub/sub of task changes, optionally fanned out across workers with PostgreSQL NOTIFY"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from sqlalchemy import text
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+Message = Dict[str, Any]
+# the user id is None for a `RESYNC` of every user, sent when messages of any user may have been missed
+Observer = Callable[[Optional[int], Message], None]
+
+"""Sent instead of the dropped messages when a subscriber falls behind, clients reload their lists"""
+RESYNC: Message = {"resync": True}
+
+
+class TaskEventHub:
+    """Per-user fan-out of task change messages to subscriber queues living on the event loop"""
+
+    def __init__(self, queue_size: int = 256) -> None:
+        self.queue_size = queue_size
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = {}
+        self._observers: List[Observer] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._bridge: Optional[PgNotifyBridge] = None
+
+    def subscribe(self, user_id: int) -> asyncio.Queue:
+        """Register a queue for the user's messages; call from the event loop"""
+        self._loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(user_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, user_id: int, queue: asyncio.Queue) -> None:
+        queues = self._subscribers.get(user_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[user_id]
+
+    def observe(self, observer: Observer) -> None:
+        """Call `observer(user_id, message)` for every message of every user on this worker; call from the event loop"""
+        self._loop = asyncio.get_running_loop()
+        self._observers.append(observer)
+
+    def unobserve(self, observer: Observer) -> None:
+        if observer in self._observers:
+            self._observers.remove(observer)
+
+    def subscriber_count(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    def publish(self, user_id: int, message: Message) -> None:
+        """Publish a message from any thread, sync routes run in the threadpool"""
+        if self._bridge is not None:
+            self._bridge.send(user_id, message)
+            return
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return  # nobody has subscribed yet
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self.dispatch(user_id, message)
+        else:
+            loop.call_soon_threadsafe(self.dispatch, user_id, message)
+
+    def dispatch(self, user_id: int, message: Message) -> None:
+        """Deliver to local subscribers and observers; runs on the event loop"""
+        self._notify_observers(user_id, message)
+        for queue in self._subscribers.get(user_id, ()):
+            self._put(queue, message)
+
+    def resync_all(self) -> None:
+        """Messages of any user may have been lost: send `RESYNC` to every local subscriber and observer"""
+        self._notify_observers(None, RESYNC)
+        for queues in self._subscribers.values():
+            for queue in queues:
+                self._put(queue, RESYNC)
+
+    def _notify_observers(self, user_id: Optional[int], message: Message) -> None:
+        for observer in self._observers:
+            try:
+                observer(user_id, message)
+            except Exception:  # noqa: BLE001
+                logger.exception("Task event observer failed")
+
+    @staticmethod
+    def _put(queue: asyncio.Queue, message: Message) -> None:
+        try:
+            queue.put_nowait(message)
+        except asyncio.QueueFull:
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(RESYNC)
+
+    def enable_pg_notify(self) -> None:
+        """Route messages through PostgreSQL so subscribers of every worker receive them"""
+        self._loop = asyncio.get_running_loop()
+        self._bridge = PgNotifyBridge(self)
+        self._bridge.start()
+
+
+class PgNotifyBridge:
+    """Sends messages with `pg_notify` and dispatches the ones LISTENed for to the local hub"""
+
+    CHANNEL = "task_events"
+    # PostgreSQL rejects NOTIFY payloads of 8000 bytes or more (default build)
+    MAX_PAYLOAD_BYTES = 7999
+    RECONNECT_DELAY = 1.0
+
+    def __init__(self, hub: TaskEventHub) -> None:
+        self.hub = hub
+        self._listener: Optional[asyncio.Task] = None
+
+    def encode(self, user_id: int, message: Message) -> str:
+        """NOTIFY payload; a message too large for it (bulk writes) becomes a resync at its version"""
+        payload = json.dumps({"user_id": user_id, "message": message}, separators=(",", ":"))
+        if len(payload.encode()) > self.MAX_PAYLOAD_BYTES:
+            resync = {**RESYNC, "version": message.get("version")}
+            payload = json.dumps({"user_id": user_id, "message": resync}, separators=(",", ":"))
+        return payload
+
+    def send(self, user_id: int, message: Message) -> None:
+        from app.db.session import engine
+
+        payload = self.encode(user_id, message)
+        try:
+            asyncio.get_running_loop().run_in_executor(None, self._notify, engine, payload)
+        except RuntimeError:
+            self._notify(engine, payload)
+
+    def _notify(self, engine, payload: str) -> None:
+        try:
+            with engine.begin() as conn:
+                conn.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": self.CHANNEL, "payload": payload})
+        except Exception:  # noqa: BLE001
+            logger.exception("Failed to publish task event")
+
+    def start(self) -> None:
+        self._listener = asyncio.get_running_loop().create_task(self._listen())
+
+    async def _listen(self) -> None:
+        import psycopg
+
+        settings = get_settings()
+        conninfo = (
+            f"host={settings.DB_HOST} port={settings.DB_PORT} dbname={settings.DB_NAME} "
+            f"user={settings.DB_USER} password={settings.DB_PASSWORD}"
+        )
+        failed = False
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(conninfo, autocommit=True) as conn:
+                    await conn.execute(f"LISTEN {self.CHANNEL}")
+                    if failed:
+                        # notifications sent while nobody was listening are gone
+                        self.hub.resync_all()
+                        failed = False
+                    async for notify in conn.notifies():
+                        data = json.loads(notify.payload)
+                        self.hub.dispatch(int(data["user_id"]), data["message"])
+            except asyncio.CancelledError:
+                raise
+            except Exception:  # noqa: BLE001
+                logger.exception("Task event listener disconnected, reconnecting")
+                failed = True
+                await asyncio.sleep(self.RECONNECT_DELAY)
+
+
+task_events = TaskEventHub(queue_size=get_settings().TASK_EVENTS_QUEUE_SIZE)
@@ -0,0 +1,95 @@
+"""Occurrence expansion of recurring task rules
+
+Works on day ordinals (`date.toordinal()`) so a rule costs a few `range` objects per window
+instead of a loop over every day; callers build dates only for the days they return.
+"""
+from __future__ import annotations
+
+import calendar
+from datetime import date
+from typing import List, Optional, Sequence
+
+FREQUENCIES = ("daily", "weekly", "monthly")
+
+
+def weekday_mask(weekdays: Sequence[int]) -> int:
+    """[0, 2, 4] (Monday, Wednesday, Friday) -> bitmask stored in `TaskRule.weekdays`"""
+    mask = 0
+    for weekday in weekdays:
+        mask |= 1 << weekday
+    return mask
+
+
+def mask_weekdays(mask: int) -> List[int]:
+    return [weekday for weekday in range(7) if mask >> weekday & 1]
+
+
+def _first_at_or_after(lo: int, anchor: int, period: int) -> int:
+    """Smallest x >= lo with x = anchor (mod period)"""
+    return lo + (anchor - lo) % period
+
+
+def occurrence_ranges(
+    freq: str,
+    interval: int,
+    weekdays: int,
+    start_day: date,
+    end_day: Optional[date],
+    first: date,
+    last: date,
+) -> List[Sequence[int]]:
+    """
+    Ordinals of the rule's occurrences within [first, last]: each sequence ascending, the
+    sequences interleaved (one `range` per weekday of a weekly rule)
+
+    Weekly rules without weekdays repeat on the weekday of `start_day`; monthly rules skip
+    months that do not have the day of month of `start_day`.
+    """
+    lo = max(first, start_day).toordinal()
+    hi = min(last, end_day).toordinal() if end_day is not None else last.toordinal()
+    if lo > hi:
+        return []
+    origin = start_day.toordinal()
+
+    if freq == "daily":
+        return [range(_first_at_or_after(lo, origin, interval), hi + 1, interval)]
+
+    if freq == "weekly":
+        period = 7 * interval
+        monday = origin - start_day.weekday()
+        days = mask_weekdays(weekdays) or [start_day.weekday()]
+        return [range(_first_at_or_after(lo, monday + weekday, period), hi + 1, period) for weekday in days]
+
+    if freq == "monthly":
+        day_of_month = start_day.day
+        start_month = start_day.year * 12 + start_day.month - 1
+        lo_date, hi_date = date.fromordinal(lo), date.fromordinal(hi)
+        lo_month = lo_date.year * 12 + lo_date.month - 1
+        hi_month = hi_date.year * 12 + hi_date.month - 1
+        found = []
+        for month in range(_first_at_or_after(lo_month, start_month, interval), hi_month + 1, interval):
+            year, month0 = divmod(month, 12)
+            if day_of_month <= calendar.monthrange(year, month0 + 1)[1]:
+                ordinal = date(year, month0 + 1, day_of_month).toordinal()
+                if lo <= ordinal <= hi:
+                    found.append(ordinal)
+        return [found]
+
+    raise ValueError(f"Unknown frequency {freq!r}")
+
+
+def occurrence_ordinals(
+    freq: str,
+    interval: int,
+    weekdays: int,
+    start_day: date,
+    end_day: Optional[date],
+    first: date,
+    last: date,
+) -> List[int]:
+    """Ordinals of the rule's occurrences within [first, last], ascending"""
+    ranges = occurrence_ranges(freq, interval, weekdays, start_day, end_day, first, last)
+    found = [ordinal for ordinals in ranges for ordinal in ordinals]
+    if len(ranges) > 1:
+        found.sort()
+    return found
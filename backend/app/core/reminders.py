@@ -0,0 +1,337 @@
+"""In-process reminders for tasks with `at_time`
+
+Only reminders due within the next `horizon` seconds are held in memory: a heap ordered by due
+time and one event-loop timer armed for its head. The horizon is extended slice by slice ahead of
+time, from the partial `ix_tasks_due` index, and task writes (observed on the `task_events` hub)
+add, move or drop entries in between. Nothing runs between due times, so an idle scheduler costs
+the same with ten or a hundred thousand pending reminders.
+
+The hub only carries writes of other workers with TASK_EVENTS_PG_NOTIFY; without it a worker never
+hears about them. A worker cannot tell how many siblings uvicorn or gunicorn started, so the
+scheduler is only started with the bridge. A `resync` message means writes were missed and the
+horizon is loaded again.
+
+Moved and completed tasks leave stale heap entries behind; they are recognized by sequence number
+when popped and the heap is rebuilt once they outnumber the live ones.
+"""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time as _time
+from dataclasses import dataclass
+from datetime import date, datetime, time, timezone, tzinfo
+from typing import Any, Callable, Dict, Iterable, List, Optional, Protocol, Tuple
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import Select, and_, or_, select
+
+from app.core.config import get_settings
+from app.core.pubsub import Message, TaskEventHub, task_events
+from app.db.models import PENDING_REMINDER, Task
+
+logger = logging.getLogger(__name__)
+
+# a failed horizon load is retried after this many seconds
+RETRY_SECONDS = 5.0
+
+
+@dataclass(frozen=True, slots=True)
+class Reminder:
+    task_id: int
+    user_id: int
+    title: str
+    day: date
+    at_time: time
+    due: float  # epoch seconds the reminder is delivered at
+
+    def message(self) -> Message:
+        """`/ws/tasks` message of the reminder"""
+        return {
+            "reminder": {
+                "task_id": self.task_id,
+                "title": self.title,
+                "day": self.day.isoformat(),
+                "at_time": self.at_time.isoformat(),
+            }
+        }
+
+
+class ReminderSink(Protocol):
+    def __call__(self, reminder: Reminder) -> None: ...
+
+
+class LogSink:
+    """Logs and keeps delivered reminders, for tests and local runs"""
+
+    def __init__(self) -> None:
+        self.delivered: List[Reminder] = []
+
+    def __call__(self, reminder: Reminder) -> None:
+        logger.info("Reminder for task %s of user %s: %s", reminder.task_id, reminder.user_id, reminder.title)
+        self.delivered.append(reminder)
+
+
+class WebSocketSink:
+    """
+    Pushes the reminder to the owner's `/ws/tasks` sockets on this worker only
+
+    Every worker schedules every reminder, so each socket gets it once, provided all workers see
+    all task writes (TASK_EVENTS_PG_NOTIFY).
+    """
+
+    def __init__(self, hub: TaskEventHub) -> None:
+        self.hub = hub
+
+    def __call__(self, reminder: Reminder) -> None:
+        self.hub.dispatch(reminder.user_id, reminder.message())
+
+
+"""Rows with `id, user_id, title, day, at_time` of pending tasks due in [start, end), local naive datetimes"""
+Loader = Callable[[datetime, datetime], Iterable[Any]]
+
+
+def due_tasks_stmt(start: datetime, end: datetime) -> Select:
+    """Pending tasks with `at_time` in [start, end), a range on the partial `ix_tasks_due` index"""
+    first, last = start.date(), end.date()
+    if first == last:
+        in_window = and_(Task.day == first, Task.at_time >= start.time(), Task.at_time < end.time())
+    else:
+        in_window = or_(
+            and_(Task.day == first, Task.at_time >= start.time()),
+            and_(Task.day > first, Task.day < last),
+            and_(Task.day == last, Task.at_time < end.time()),
+        )
+    return (
+        select(Task.id, Task.user_id, Task.title, Task.day, Task.at_time)
+        .where(Task.day.between(first, last), in_window, PENDING_REMINDER)
+    )
+
+
+def load_due_tasks(start: datetime, end: datetime) -> list:
+    """Default loader, reads on the primary through the sync engine"""
+    from app.db.session import SessionLocal
+
+    with SessionLocal() as db:
+        return db.execute(due_tasks_stmt(start, end)).all()
+
+
+class ReminderScheduler:
+    """Heap of reminders due within the loaded horizon, delivered to `sink` from the event loop"""
+
+    def __init__(
+        self,
+        loader: Loader,
+        sink: ReminderSink,
+        horizon: float = 6 * 3600.0,
+        lead: float = 0.0,
+        zone: tzinfo = timezone.utc,
+        clock: Callable[[], float] = _time.time,
+    ) -> None:
+        self.loader = loader
+        self.sink = sink
+        self.horizon = horizon
+        self.lead = lead
+        self.zone = zone
+        self.clock = clock
+        self.delivered = 0
+        self._heap: List[Tuple[float, int, Reminder]] = []
+        self._live: Dict[int, int] = {}  # task id -> sequence number of its current heap entry
+        self._seq = itertools.count()
+        self._loaded_until = 0.0
+        self._extend_at = 0.0
+        self._loading: Optional[float] = None  # end of the slice being loaded
+        self._touched: set[int] = set()  # tasks changed while a slice loads, the loaded rows are stale
+        self._reload = False  # writes were missed while a slice loads, load the horizon again after it
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._timer_at: Optional[float] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def start(self, hub: Optional[TaskEventHub] = None) -> None:
+        """Start loading the first slice and follow task writes published on `hub`; call from the event loop"""
+        self._loop = asyncio.get_running_loop()
+        now = self.clock()
+        self._loaded_until = self._extend_at = now
+        if hub is not None:
+            hub.observe(self.on_task_message)
+        self._extend(now)
+
+    def stop(self, hub: Optional[TaskEventHub] = None) -> None:
+        if hub is not None:
+            hub.unobserve(self.on_task_message)
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = self._timer_at = self._loop = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": len(self._live),
+            "heap": len(self._heap),
+            "delivered": self.delivered,
+            "loaded_until": datetime.fromtimestamp(self._loaded_until, tz=timezone.utc).isoformat() if self._loaded_until else None,
+        }
+
+    def due_at(self, day: date, at_time: time) -> float:
+        """Epoch seconds a task on `day` at `at_time` (local to `zone`) is reminded at"""
+        return datetime.combine(day, at_time, tzinfo=self.zone).timestamp() - self.lead
+
+    def _local(self, due: float) -> datetime:
+        """Local naive `day + at_time` of a task reminded at `due`"""
+        return datetime.fromtimestamp(due + self.lead, tz=self.zone).replace(tzinfo=None)
+
+    def _accepts(self, due: float) -> bool:
+        return self.clock() <= due < (self._loading or self._loaded_until)
+
+    def _push(self, reminder: Reminder) -> None:
+        seq = next(self._seq)
+        self._live[reminder.task_id] = seq
+        heapq.heappush(self._heap, (reminder.due, seq, reminder))
+        self._compact()
+
+    def _discard(self, task_id: int) -> None:
+        if self._live.pop(task_id, None) is not None:
+            self._compact()
+
+    def _compact(self) -> None:
+        if len(self._heap) > 2 * len(self._live) + 1024:
+            self._heap = [entry for entry in self._heap if self._live.get(entry[2].task_id) == entry[1]]
+            heapq.heapify(self._heap)
+
+    def schedule(self, reminder: Reminder) -> None:
+        """Add or move the reminder of a task, drop it when it falls outside the horizon"""
+        if self._loading is not None:
+            self._touched.add(reminder.task_id)
+        if self._accepts(reminder.due):
+            self._push(reminder)
+        else:
+            self._discard(reminder.task_id)
+        self._arm()
+
+    def cancel(self, task_id: int) -> None:
+        if self._loading is not None:
+            self._touched.add(task_id)
+        self._discard(task_id)
+
+    def resync(self) -> None:
+        """Task writes were missed: drop every pending reminder and load the horizon again"""
+        if self._loop is None:
+            return
+        self._heap, self._live = [], {}
+        self._loaded_until = self.clock()
+        if self._loading is not None:
+            self._reload = True
+            return
+        self._extend(self._loaded_until)
+        self._arm()
+
+    def on_task_message(self, user_id: Optional[int], message: Message) -> None:
+        """`task_events` observer: follow upserts and deletes, reload on resync, ignore everything else"""
+        if message.get("resync"):
+            self.resync()
+            return
+        for change in message.get("changes", ()):
+            if change["op"] == "delete":
+                self.cancel(change["id"])
+                continue
+            task = change["task"]
+            if task["completed"] or not task["at_time"]:
+                self.cancel(task["id"])
+                continue
+            day, at_time = date.fromisoformat(task["day"]), time.fromisoformat(task["at_time"])
+            self.schedule(Reminder(task["id"], user_id, task["title"], day, at_time, self.due_at(day, at_time)))
+
+    def _arm(self) -> None:
+        """Keep one timer armed for the earliest of the heap head and the next horizon extension"""
+        if self._loop is None:
+            return
+        wake_at = self._extend_at if self._loading is None else float("inf")
+        if self._heap:
+            wake_at = min(wake_at, self._heap[0][0])
+        if wake_at == self._timer_at:
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = self._timer_at = None
+        if wake_at != float("inf"):
+            self._timer_at = wake_at
+            self._timer = self._loop.call_later(max(0.0, wake_at - self.clock()), self._fire)
+
+    def _fire(self) -> None:
+        self._timer = self._timer_at = None
+        now = self.clock()
+        heap, live = self._heap, self._live
+        while heap and heap[0][0] <= now:
+            _, seq, reminder = heapq.heappop(heap)
+            if live.get(reminder.task_id) != seq:
+                continue  # moved, completed or deleted since it was pushed
+            del live[reminder.task_id]
+            self.delivered += 1
+            try:
+                self.sink(reminder)
+            except Exception:  # noqa: BLE001
+                logger.exception("Reminder sink failed for task %s", reminder.task_id)
+        if self._loading is None and now >= self._extend_at:
+            self._extend(now)
+        self._arm()
+
+    def _extend(self, now: float) -> None:
+        """Load the slice between the loaded horizon and `now + horizon` on a worker thread"""
+        start, end = max(self._loaded_until, now), now + self.horizon
+        self._loading = end
+        self._touched = set()
+        future = self._loop.run_in_executor(None, self._load_slice, start, end)
+        future.add_done_callback(lambda done: self._loaded(done, end))
+
+    def _load_slice(self, start: float, end: float) -> List[Reminder]:
+        """Query and convert the slice on the worker thread, the event loop only merges it"""
+        reminders = []
+        for row in self.loader(self._local(start), self._local(end)):
+            due = self.due_at(row.day, row.at_time)
+            if start <= due < end:
+                reminders.append(Reminder(row.id, row.user_id, row.title, row.day, row.at_time, due))
+        return reminders
+
+    def _loaded(self, future: asyncio.Future, end: float) -> None:
+        if self._loop is None:
+            return  # stopped meanwhile
+        self._loading = None
+        if self._reload:
+            self._reload = False
+            self._extend(self.clock())
+            return
+        try:
+            reminders = future.result()
+        except Exception:  # noqa: BLE001
+            logger.exception("Loading reminders failed, retrying in %ss", RETRY_SECONDS)
+            self._extend_at = self.clock() + RETRY_SECONDS
+            self._arm()
+            return
+        touched, seq, live, heap = self._touched, self._seq, self._live, self._heap
+        for reminder in reminders:
+            if reminder.task_id in touched:
+                continue  # a write newer than the rows already scheduled or cancelled it
+            number = next(seq)
+            live[reminder.task_id] = number
+            heap.append((reminder.due, number, reminder))
+        heapq.heapify(heap)
+        self._touched = set()
+        self._loaded_until = end
+        # extend again half a horizon ahead, so the next slice is in memory well before it is due
+        self._extend_at = end - self.horizon / 2
+        self._arm()
+
+
+def _sink(name: str) -> ReminderSink:
+    return LogSink() if name == "log" else WebSocketSink(task_events)
+
+
+_settings = get_settings()
+reminder_scheduler = ReminderScheduler(
+    load_due_tasks,
+    _sink(_settings.REMINDERS_SINK),
+    horizon=_settings.REMINDERS_HORIZON_SECONDS,
+    lead=_settings.REMINDERS_LEAD_MINUTES * 60.0,
+    zone=ZoneInfo(_settings.REMINDERS_TIMEZONE),
+)
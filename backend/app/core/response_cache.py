@@ -0,0 +1,181 @@
+"""Per-user cache of serialized task list responses
+
+Entries are keyed by (user_id, scope, variant): `scope` names the slice of the calendar the
+response covers, e.g. ("month", "2025-11") or ("day", "2025-11-03"), and `variant` holds the
+remaining filters. Task writes invalidate only the scopes of the days they touch.
+
+Every operation also receives the user's task list version from the database. A backend only
+serves entries while it has seen every version bump since they were stored, so writes made by
+other workers (which this process never hears about) turn into misses instead of stale hits.
+"""
+from __future__ import annotations
+
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Dict, Hashable, Iterable, Optional, Set, Tuple
+
+from app.core.config import get_settings
+
+Scope = Tuple[str, str]
+CacheKey = Tuple[Scope, Hashable]
+
+
+def day_scopes(*days: Optional[date]) -> Set[Scope]:
+    """Scopes whose cached lists contain tasks of the given days"""
+    scopes: Set[Scope] = set()
+    for day in days:
+        if day is not None:
+            scopes.add(("day", day.isoformat()))
+            scopes.add(("month", day.strftime("%Y-%m")))
+    return scopes
+
+
+class ResponseCache(ABC):
+    """Backend interface; a shared implementation (e.g. Redis) can replace the in-memory one"""
+
+    @abstractmethod
+    def get(self, user_id: int, version: int, key: CacheKey) -> Optional[bytes]:
+        """Return cached body valid for `version` of the user's tasks"""
+
+    @abstractmethod
+    def set(self, user_id: int, version: int, key: CacheKey, body: bytes) -> None:
+        """Store body built from tasks at `version`"""
+
+    @abstractmethod
+    def invalidate(self, user_id: int, version: int, scopes: Iterable[Scope]) -> None:
+        """Drop entries of `scopes` after a write that moved the user's tasks to `version`"""
+
+    @abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        """Counters for monitoring"""
+
+
+class NullResponseCache(ResponseCache):
+    """Disabled cache"""
+
+    def get(self, user_id: int, version: int, key: CacheKey) -> Optional[bytes]:
+        return None
+
+    def set(self, user_id: int, version: int, key: CacheKey, body: bytes) -> None:
+        return None
+
+    def invalidate(self, user_id: int, version: int, scopes: Iterable[Scope]) -> None:
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "none"}
+
+
+class MemoryResponseCache(ResponseCache):
+    """In-process LRU cache bounded by the total size of stored bodies"""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries: OrderedDict[Tuple[int, CacheKey], bytes] = OrderedDict()
+        self._user_keys: Dict[int, Set[CacheKey]] = {}
+        # last task list version whose entries are known to be consistent, per user with entries
+        self._synced: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int, version: int, key: CacheKey) -> Optional[bytes]:
+        with self._lock:
+            body = self._entries.get((user_id, key)) if self._synced.get(user_id) == version else None
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end((user_id, key))
+            self.hits += 1
+            return body
+
+    def set(self, user_id: int, version: int, key: CacheKey, body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            synced = self._synced.get(user_id)
+            if synced is not None and version < synced:
+                return  # built from rows older than a write we already invalidated for
+            if synced is not None and version > synced:
+                self._drop_user(user_id)
+            self._synced[user_id] = version
+            self._store(user_id, key, body)
+            while self.bytes > self.max_bytes:
+                (old_user, old_key), _ = next(iter(self._entries.items()))
+                self._remove(old_user, old_key)
+                self.evictions += 1
+
+    def invalidate(self, user_id: int, version: int, scopes: Iterable[Scope]) -> None:
+        with self._lock:
+            synced = self._synced.get(user_id)
+            if synced is None:
+                return
+            self.invalidations += 1
+            if version > synced + 1:
+                # some writes happened elsewhere, we cannot tell which scopes they touched
+                self._drop_user(user_id)
+                return
+            scopes = set(scopes)
+            for key in [k for k in self._user_keys[user_id] if k[0] in scopes]:
+                self._remove(user_id, key)
+            if version == synced + 1 and user_id in self._synced:
+                self._synced[user_id] = version
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": "memory",
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._user_keys.clear()
+            self._synced.clear()
+            self.bytes = 0
+
+    def _store(self, user_id: int, key: CacheKey, body: bytes) -> None:
+        previous = self._entries.pop((user_id, key), None)
+        if previous is not None:
+            self.bytes -= len(previous)
+        self._entries[(user_id, key)] = body
+        self._user_keys.setdefault(user_id, set()).add(key)
+        self.bytes += len(body)
+
+    def _remove(self, user_id: int, key: CacheKey) -> None:
+        body = self._entries.pop((user_id, key))
+        self.bytes -= len(body)
+        keys = self._user_keys[user_id]
+        keys.discard(key)
+        if not keys:
+            del self._user_keys[user_id]
+            self._synced.pop(user_id, None)
+
+    def _drop_user(self, user_id: int) -> None:
+        for key in list(self._user_keys.get(user_id, ())):
+            self._remove(user_id, key)
+        self._synced.pop(user_id, None)
+
+
+def build_response_cache() -> ResponseCache:
+    settings = get_settings()
+    if settings.RESPONSE_CACHE_BACKEND == "memory" and settings.RESPONSE_CACHE_MAX_BYTES > 0:
+        return MemoryResponseCache(max_bytes=settings.RESPONSE_CACHE_MAX_BYTES)
+    return NullResponseCache()
+
+
+response_cache: ResponseCache = build_response_cache()
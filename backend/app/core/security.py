@@ -1,8 +1,11 @@
 """Security helpers: password hashing and JWT token generation/verification"""
 from __future__ import annotations
 
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict
+from typing import Any, Callable, Dict, TypeVar
 
 import jwt
 from passlib.context import CryptContext
@@ -11,6 +14,46 @@ from app.core.config import get_settings
 
 pwd_context = CryptContext(schemes=["bcrypt_sha256"], deprecated="auto")
 
+T = TypeVar("T")
+
+
+class HashingPoolBusy(Exception):
+    """Raised when the password hashing queue is full"""
+
+
+class HashingPool:
+    """Dedicated executor for bcrypt work with a fail-fast bound on queued jobs"""
+
+    def __init__(self, workers: int, max_queue: int) -> None:
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+
+    def submit(self, fn: Callable[..., T], *args: Any) -> Future[T]:
+        """Schedule `fn` on the pool or raise `HashingPoolBusy` when all slots are taken"""
+        if not self._slots.acquire(blocking=False):
+            raise HashingPoolBusy("Password hashing queue is full")
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run `fn` on the pool and block the calling thread until done"""
+        return self.submit(fn, *args).result()
+
+    async def run_async(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run `fn` on the pool without blocking the event loop"""
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+
+_settings = get_settings()
+hashing_pool = HashingPool(workers=_settings.PASSWORD_HASH_WORKERS, max_queue=_settings.PASSWORD_HASH_QUEUE)
+
 
 def hash_password(password: str) -> str:
     """Hash password using bcrypt"""
@@ -22,6 +65,26 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def hash_password_pooled(password: str) -> str:
+    """`hash_password` executed on the hashing pool, for sync routes"""
+    return hashing_pool.run(hash_password, password)
+
+
+def verify_password_pooled(plain_password: str, hashed_password: str) -> bool:
+    """`verify_password` executed on the hashing pool, for sync routes"""
+    return hashing_pool.run(verify_password, plain_password, hashed_password)
+
+
+async def hash_password_async(password: str) -> str:
+    """`hash_password` executed on the hashing pool, for async routes"""
+    return await hashing_pool.run_async(hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """`verify_password` executed on the hashing pool, for async routes"""
+    return await hashing_pool.run_async(verify_password, plain_password, hashed_password)
+
+
 def create_access_token(subject: str, extra: Dict[str, Any] | None = None) -> str:
     """Create JWT token for the given credentials"""
     settings = get_settings()
@@ -0,0 +1,181 @@
+"""Versioned schema bootstrap
+
+The applied version is stored in a one-row `schema_version` table. A worker starting against
+an up-to-date database runs a single SELECT and returns. Otherwise it takes an advisory lock
+(PostgreSQL), re-reads the version in case another worker finished meanwhile and applies the
+missing steps in one transaction.
+
+Tables live in the schema the engine maps `None` to with `schema_translate_map`, model
+metadata is never modified. Step 1 creates tables from the current models, so later steps
+must tolerate running on a database that already has their changes.
+"""
+from __future__ import annotations
+
+import logging
+from typing import Callable, List, Optional, Tuple
+
+from sqlalchemy import Connection, Engine, inspect, text
+from sqlalchemy.exc import DBAPIError
+
+from app.db.search import FTS_TABLE, PG_EXTENSION, create_fts_index, drop_fts_index
+from app.db.session import Base
+import app.db.models  # noqa: F401  register models on Base.metadata
+
+logger = logging.getLogger(__name__)
+
+VERSION_TABLE = "schema_version"
+# pg_advisory_xact_lock key shared by all workers of this application
+ADVISORY_LOCK_KEY = 0x63616C656E646172 & 0x7FFFFFFFFFFFFFFF
+
+Step = Callable[[Connection, Optional[str]], None]
+
+
+def _qualified(schema: Optional[str], name: str) -> str:
+    return f"{schema}.{name}" if schema else name
+
+
+def _create_index(conn: Connection, table: str, name: str) -> None:
+    """Create one model index unless present; indexes of later steps may need columns added later"""
+    index = next(index for index in Base.metadata.tables[table].indexes if index.name == name)
+    index.create(bind=conn, checkfirst=True)
+
+
+def _create_tables(conn: Connection, _schema: Optional[str]) -> None:
+    Base.metadata.create_all(bind=conn)
+
+
+def _add_version_columns_and_task_index(conn: Connection, schema: Optional[str]) -> None:
+    """Columns and the composite listing index added after the first deployments"""
+    existing = {column["name"] for column in inspect(conn).get_columns("users", schema=schema)}
+    for column in ("tasks_version", "token_version"):
+        if column not in existing:
+            conn.execute(text(
+                f"ALTER TABLE {_qualified(schema, 'users')} ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0"
+            ))
+    for index in ("ix_tasks_user_id", "ix_tasks_day"):  # superseded by ix_tasks_user_day_at_time
+        conn.execute(text(f"DROP INDEX IF EXISTS {_qualified(schema, index)}"))
+    _create_index(conn, "tasks", "ix_tasks_user_day_at_time")
+
+
+def _create_task_rule_tables(conn: Connection, _schema: Optional[str]) -> None:
+    Base.metadata.create_all(
+        bind=conn, tables=[Base.metadata.tables["task_rules"], Base.metadata.tables["task_rule_overrides"]]
+    )
+
+
+def _create_task_search_index(conn: Connection, _schema: Optional[str]) -> None:
+    """GIN index on PostgreSQL; FTS5 table and triggers on SQLite, filled from existing tasks"""
+    tasks = Base.metadata.tables["tasks"]
+    if conn.dialect.name == "sqlite":
+        create_fts_index(tasks, conn)
+        conn.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        return
+    _create_index(conn, "tasks", "ix_tasks_search")
+
+
+def _add_task_sync_columns(conn: Connection, schema: Optional[str]) -> None:
+    """Task change versions for delta sync and the tombstone table; existing tasks get the current version"""
+    inspector = inspect(conn)
+    if "tasks_compacted_version" not in {column["name"] for column in inspector.get_columns("users", schema=schema)}:
+        conn.execute(text(
+            f"ALTER TABLE {_qualified(schema, 'users')} ADD COLUMN tasks_compacted_version INTEGER NOT NULL DEFAULT 0"
+        ))
+    if "version" not in {column["name"] for column in inspector.get_columns("tasks", schema=schema)}:
+        conn.execute(text(f"ALTER TABLE {_qualified(schema, 'tasks')} ADD COLUMN version INTEGER NOT NULL DEFAULT 0"))
+        conn.execute(text(
+            f"UPDATE {_qualified(schema, 'tasks')} SET version = (SELECT u.tasks_version FROM "
+            f"{_qualified(schema, 'users')} u WHERE u.id = {_qualified(schema, 'tasks')}.user_id)"
+        ))
+    Base.metadata.create_all(bind=conn, tables=[Base.metadata.tables["task_tombstones"]])
+    _create_index(conn, "tasks", "ix_tasks_user_version")
+
+
+def _create_task_due_index(conn: Connection, _schema: Optional[str]) -> None:
+    _create_index(conn, "tasks", "ix_tasks_due")
+
+
+def _move_task_versions(conn: Connection, schema: Optional[str]) -> None:
+    """Task list versions move from `users` to `task_versions`, task routes stop touching `users`"""
+    Base.metadata.create_all(bind=conn, tables=[Base.metadata.tables["task_versions"]])
+    if "tasks_version" not in {column["name"] for column in inspect(conn).get_columns("users", schema=schema)}:
+        return
+    conn.execute(text(
+        f"INSERT INTO {_qualified(schema, 'task_versions')} (user_id, version, compacted_version) "
+        f"SELECT id, tasks_version, tasks_compacted_version FROM {_qualified(schema, 'users')} "
+        "WHERE tasks_version > 0"
+    ))
+    for column in ("tasks_version", "tasks_compacted_version"):
+        conn.execute(text(f"ALTER TABLE {_qualified(schema, 'users')} DROP COLUMN {column}"))
+
+
+def _scope_task_search_index(conn: Connection, schema: Optional[str]) -> None:
+    """Search index rebuilt with `user_id`, a search only intersects with the user's entries"""
+    if conn.dialect.name == "sqlite":
+        drop_fts_index(Base.metadata.tables["tasks"], conn)
+        _create_task_search_index(conn, schema)
+        return
+    conn.execute(text(f"DROP INDEX IF EXISTS {_qualified(schema, 'ix_tasks_search')}"))
+    _create_index(conn, "tasks", "ix_tasks_search")
+
+
+"""Ordered (version, description, step); append new steps, never edit applied ones"""
+MIGRATIONS: List[Tuple[int, str, Step]] = [
+    (1, "create tables", _create_tables),
+    (2, "tasks_version/token_version columns, composite task index", _add_version_columns_and_task_index),
+    (3, "recurring task rules and occurrence overrides", _create_task_rule_tables),
+    (4, "full-text search index on task title and description", _create_task_search_index),
+    (5, "task versions and tombstones for delta sync", _add_task_sync_columns),
+    (6, "partial index of pending tasks with at_time for reminders", _create_task_due_index),
+    (7, "task list versions in their own table", _move_task_versions),
+    (8, "full-text search index led by user_id", _scope_task_search_index),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def engine_schema(engine: Engine) -> Optional[str]:
+    """Schema the engine's `schema_translate_map` puts unqualified tables in"""
+    return (engine.get_execution_options().get("schema_translate_map") or {}).get(None)
+
+
+def current_version(conn: Connection, schema: Optional[str]) -> Optional[int]:
+    """Applied version, None when the version table does not exist yet"""
+    if not inspect(conn).has_table(VERSION_TABLE, schema=schema):
+        return None
+    return conn.execute(text(f"SELECT version FROM {_qualified(schema, VERSION_TABLE)}")).scalar()
+
+
+def _fast_check(engine: Engine, schema: Optional[str]) -> Optional[int]:
+    try:
+        with engine.connect() as conn:
+            return conn.execute(text(f"SELECT version FROM {_qualified(schema, VERSION_TABLE)}")).scalar()
+    except DBAPIError:
+        return None  # first start: schema or version table missing
+
+
+def upgrade(engine: Engine) -> int:
+    """Bring the database to LATEST_VERSION, return the version found before"""
+    schema = engine_schema(engine)
+    found = _fast_check(engine, schema)
+    if found == LATEST_VERSION:
+        return found
+
+    with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": ADVISORY_LOCK_KEY})
+            if schema:
+                conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {schema}"))
+            # needed by the current search index, which step 1 and step 4 create too
+            conn.execute(text(f"CREATE EXTENSION IF NOT EXISTS {PG_EXTENSION}"))
+        found = current_version(conn, schema)
+        if found is None:
+            conn.execute(text(f"CREATE TABLE {_qualified(schema, VERSION_TABLE)} (version INTEGER NOT NULL)"))
+            conn.execute(text(f"INSERT INTO {_qualified(schema, VERSION_TABLE)} (version) VALUES (0)"))
+            found = 0
+        for version, description, step in MIGRATIONS:
+            if version > found:
+                logger.info("Applying schema migration %s: %s", version, description)
+                step(conn, schema)
+        if found < LATEST_VERSION:
+            conn.execute(text(f"UPDATE {_qualified(schema, VERSION_TABLE)} SET version = :v"), {"v": LATEST_VERSION})
+    return found
@@ -1,12 +1,13 @@
-"""SQLAlchemy models for users and tasks."""
+"""SQLAlchemy models for users, tasks, task tombstones and recurring task rules."""
 from __future__ import annotations
 
 from datetime import date, time, datetime
 from typing import Optional
 
-from sqlalchemy import Boolean, Date, DateTime, ForeignKey, Integer, String, Time, func, text
+from sqlalchemy import Boolean, Date, DateTime, ForeignKey, Index, Integer, SmallInteger, String, Time, and_, event, func, inspect, text
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 
+from app.db.search import create_fts_index, drop_fts_index, search_vector
 from app.db.session import Base
 
 
@@ -22,26 +23,136 @@ class User(Base):
     password_hash: Mapped[str] = mapped_column(String(255), nullable=False)
     is_active: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True, server_default=text("true"))
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    # Embedded in access tokens as `ver`, incrementing it revokes every token issued before
+    token_version: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default=text("0"))
 
     tasks: Mapped[list["Task"]] = relationship("Task", back_populates="owner", cascade="all, delete-orphan")
 
 
+@event.listens_for(User, "before_update")
+def _revoke_tokens(_mapper, _connection, target: User) -> None:
+    """Password changes and deactivation invalidate all issued tokens"""
+    attrs = inspect(target).attrs
+    if attrs.password_hash.history.has_changes() or attrs.is_active.history.has_changes():
+        # incremented in SQL: the loaded value may be a stale cached snapshot of another worker's write
+        target.token_version = User.token_version + 1
+
+
+class TaskVersion(Base):
+    """
+    Version of a user's task list, kept apart from `users` so task routes never read that table
+
+    The row is created by the user's first task write; users without one are at version 0.
+    """
+
+    __tablename__ = "task_versions"
+
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    # Incremented in the same transaction as every change of the user's tasks, drives ETags
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default=text("0"))
+    # Tombstones up to this version were compacted, older delta-sync cursors have to resync
+    compacted_version: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default=text("0"))
+
+
 class Task(Base):
     """To-do task assigned to calendar day"""
 
     __tablename__ = "tasks"
+    __table_args__ = (
+        # Matches listing filter (user_id, day range) and order (day, at_time NULLS LAST, id)
+        Index("ix_tasks_user_day_at_time", "user_id", "day", "at_time", "id"),
+        # Delta sync: tasks of a user changed after a cursor
+        Index("ix_tasks_user_version", "user_id", "version"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
-    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), index=True, nullable=False)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
 
     title: Mapped[str] = mapped_column(String(200), nullable=False)
     description: Mapped[Optional[str]] = mapped_column(String(2000))
-    day: Mapped[date] = mapped_column(Date, nullable=False, index=True)
+    day: Mapped[date] = mapped_column(Date, nullable=False)
     at_time: Mapped[Optional[time]] = mapped_column(Time(timezone=False))
     color: Mapped[Optional[str]] = mapped_column(String(20))
     completed: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False, server_default=text("false"))
+    # owner's task list version of the write that last changed the task
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default=text("0"))
 
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
     owner: Mapped[User] = relationship("User", back_populates="tasks")
+
+
+# Full-text search (app.db.search): GIN index of owner and document on PostgreSQL, FTS5 table and triggers on SQLite
+Index(
+    "ix_tasks_search", Task.user_id, search_vector(Task.title, Task.description), postgresql_using="gin"
+).ddl_if(dialect="postgresql")
+event.listen(Task.__table__, "after_create", create_fts_index)
+event.listen(Task.__table__, "before_drop", drop_fts_index)
+
+# Reminder horizon loads (app.core.reminders): pending tasks with at_time by due day and time;
+# queries repeat PENDING_REMINDER verbatim so the planner can use the partial index
+PENDING_REMINDER = and_(Task.completed.is_(False), Task.at_time.is_not(None))
+Index("ix_tasks_due", Task.day, Task.at_time, postgresql_where=PENDING_REMINDER, sqlite_where=PENDING_REMINDER)
+
+
+class TaskTombstone(Base):
+    """Deleted task, kept for delta sync until compacted"""
+
+    __tablename__ = "task_tombstones"
+    __table_args__ = (
+        Index("ix_task_tombstones_deleted_at", "deleted_at"),
+    )
+
+    # primary key order serves the delta-sync range (user_id, version > cursor)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, primary_key=True)
+    task_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    deleted_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+class TaskRule(Base):
+    """Recurring task stored once, its occurrences are expanded per requested window"""
+
+    __tablename__ = "task_rules"
+    __table_args__ = (
+        Index("ix_task_rules_user_start", "user_id", "start_day"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+
+    title: Mapped[str] = mapped_column(String(200), nullable=False)
+    description: Mapped[Optional[str]] = mapped_column(String(2000))
+    at_time: Mapped[Optional[time]] = mapped_column(Time(timezone=False))
+    color: Mapped[Optional[str]] = mapped_column(String(20))
+
+    # "daily", "weekly" or "monthly", every `interval` periods counted from `start_day`
+    freq: Mapped[str] = mapped_column(String(10), nullable=False)
+    interval: Mapped[int] = mapped_column(SmallInteger, nullable=False, default=1, server_default=text("1"))
+    # weekly rules: bit 0 = Monday ... bit 6 = Sunday
+    weekdays: Mapped[int] = mapped_column(SmallInteger, nullable=False, default=0, server_default=text("0"))
+    start_day: Mapped[date] = mapped_column(Date, nullable=False)
+    end_day: Mapped[Optional[date]] = mapped_column(Date)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    overrides: Mapped[list["TaskRuleOverride"]] = relationship("TaskRuleOverride", cascade="all, delete-orphan")
+
+
+class TaskRuleOverride(Base):
+    """Changes of one occurrence of a rule; only occurrences that differ from the rule have a row"""
+
+    __tablename__ = "task_rule_overrides"
+
+    rule_id: Mapped[int] = mapped_column(ForeignKey("task_rules.id", ondelete="CASCADE"), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+
+    # NULL keeps the rule's value
+    title: Mapped[Optional[str]] = mapped_column(String(200))
+    description: Mapped[Optional[str]] = mapped_column(String(2000))
+    at_time: Mapped[Optional[time]] = mapped_column(Time(timezone=False))
+    color: Mapped[Optional[str]] = mapped_column(String(20))
+    completed: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False, server_default=text("false"))
+    cancelled: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False, server_default=text("false"))
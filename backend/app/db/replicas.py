@@ -0,0 +1,119 @@
+"""Read replica selection with a read-your-writes window"""
+from __future__ import annotations
+
+import itertools
+import threading
+import time
+from contextvars import ContextVar
+from typing import Callable, Generic, Hashable, List, Optional, Sequence, TypeVar
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.cache import TTLCache
+
+S = TypeVar("S")
+
+STRATEGIES = ("round_robin", "least_loaded")
+
+"""
+End (unix seconds) of the caller's read-your-writes window, sent on responses to writes
+
+`recent_writers` only lives in the worker that served the write. Clients send the header back on
+their reads so a read landing on any other worker also skips the replicas until then.
+"""
+PRIMARY_UNTIL_HEADER = "X-Primary-Until"
+
+"""Window end of the write committed by the current request; a mutable holder shared with threadpool copies"""
+_request_window: ContextVar[Optional[List[float]]] = ContextVar("request_window", default=None)
+
+
+class ReplicaRouter(Generic[S]):
+    """
+    Picks the replica session factory for each read
+
+    Callers that committed a write in the last `sticky_seconds` are sent back to the primary
+    (`acquire` returns None) so they never read a replica that has not replayed their change yet:
+    known to this worker through `recent_writers`, to the others through `PRIMARY_UNTIL_HEADER`.
+    """
+
+    def __init__(
+        self,
+        factories: Sequence[Callable[[], S]],
+        strategy: str = "round_robin",
+        sticky_seconds: float = 5.0,
+        max_tracked: int = 100_000,
+    ) -> None:
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown replica strategy {strategy!r}, expected one of {', '.join(STRATEGIES)}")
+        self.factories: List[Callable[[], S]] = list(factories)
+        self.strategy = strategy
+        self.sticky_seconds = sticky_seconds
+        self.in_flight = [0] * len(self.factories)
+        self.recent_writers: TTLCache[bool] = TTLCache(maxsize=max_tracked, ttl=sticky_seconds)
+        self._next = itertools.count()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.factories)
+
+    def mark_write(self, key: Optional[Hashable]) -> None:
+        """Start the read-your-writes window of `key`, also reported to the client of the current request"""
+        if key is not None:
+            self.recent_writers.set(key, True)
+        window = _request_window.get()
+        if window is not None and self.factories:
+            window[0] = max(window[0], time.time() + self.sticky_seconds)
+
+    def wrote_recently(self, key: Optional[Hashable]) -> bool:
+        return key is not None and self.recent_writers.get(key) is not None
+
+    def acquire(self, key: Optional[Hashable], primary_until: float = 0.0) -> Optional[int]:
+        """Index of the replica to read from, None when the read must go to the primary"""
+        if not self.factories or self.wrote_recently(key) or primary_until > time.time():
+            return None
+        with self._lock:
+            if self.strategy == "least_loaded":
+                index = min(range(len(self.factories)), key=self.in_flight.__getitem__)
+            else:
+                index = next(self._next) % len(self.factories)
+            self.in_flight[index] += 1
+        return index
+
+    def release(self, index: int) -> None:
+        with self._lock:
+            self.in_flight[index] -= 1
+
+
+def primary_until(value: Optional[str]) -> float:
+    """`PRIMARY_UNTIL_HEADER` value sent back by the client, 0 when missing or malformed"""
+    try:
+        return float(value) if value else 0.0
+    except ValueError:
+        return 0.0
+
+
+class ReadYourWritesMiddleware:
+    """ASGI middleware adding `PRIMARY_UNTIL_HEADER` to responses of requests that committed a write"""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        window = [0.0]
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and window[0]:
+                header = (PRIMARY_UNTIL_HEADER.lower().encode(), f"{window[0]:.3f}".encode())
+                message["headers"] = [*message.get("headers", ()), header]
+            await send(message)
+
+        token = _request_window.set(window)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_window.reset(token)
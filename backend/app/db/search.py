@@ -0,0 +1,105 @@
+"""Full-text search over task title and description
+
+PostgreSQL: GIN index on `user_id` (btree_gin) and a weighted `tsvector` of both columns
+(`search_vector`), declared next to the `Task` model and maintained by the database with every
+write. SQLite (local and test runs): FTS5 external-content table `tasks_fts` with `user_id` as
+an indexed column, kept in sync by triggers on `tasks`, created and dropped together with that
+table.
+
+Both are queried for the owner and every search term as a prefix, all required, so a search
+intersects with the user's own entries instead of collecting the matches of every user.
+"""
+from __future__ import annotations
+
+import re
+from typing import List
+
+from sqlalchemy import Connection, cast, column, func, table, text
+from sqlalchemy.dialects.postgresql import REGCONFIG, TSVECTOR
+from sqlalchemy.sql.elements import ColumnElement
+
+MAX_TERMS = 8
+# no stemming, content is mostly Polish; matches SQLite's unicode61 tokenizer closely enough
+TS_CONFIG = "simple"
+FTS_TABLE = "tasks_fts"
+FTS_TRIGGERS = tuple(f"{FTS_TABLE}_{operation}" for operation in ("insert", "delete", "update"))
+# GIN operator classes for plain columns, `user_id` leads the search index
+PG_EXTENSION = "btree_gin"
+
+_TERM = re.compile(r"[^\W_]+")
+
+"""FTS5 index, lookup columns used by the search query"""
+tasks_fts = table(FTS_TABLE, column("rowid"), column(FTS_TABLE), column("rank"))
+
+"""
+SQLite FTS5 table and triggers; title outweighs description like weights A/B in `search_vector`,
+`user_id` is only matched as a whole token and does not count towards the rank
+"""
+FTS_DDL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "user_id, title, description, content='tasks', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 0', prefix='2 3')",
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rank) VALUES ('rank', 'bm25(0.0, 1.0, 0.4)')",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TRIGGERS[0]} AFTER INSERT ON tasks BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, user_id, title, description) "
+    "VALUES (new.id, new.user_id, new.title, new.description); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TRIGGERS[1]} AFTER DELETE ON tasks BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, user_id, title, description) "
+    "VALUES ('delete', old.id, old.user_id, old.title, old.description); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TRIGGERS[2]} AFTER UPDATE OF user_id, title, description ON tasks BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, user_id, title, description) "
+    "VALUES ('delete', old.id, old.user_id, old.title, old.description); "
+    f"INSERT INTO {FTS_TABLE}(rowid, user_id, title, description) "
+    "VALUES (new.id, new.user_id, new.title, new.description); END",
+)
+
+
+def search_terms(query: str) -> List[str]:
+    """Lowercased distinct words of the query, at most MAX_TERMS"""
+    return list(dict.fromkeys(_TERM.findall(query.lower())))[:MAX_TERMS]
+
+
+def prefix_tsquery(terms: List[str]) -> str:
+    """`to_tsquery` text matching all terms as prefixes"""
+    return " & ".join(f"{term}:*" for term in terms)
+
+
+def prefix_fts5_query(terms: List[str]) -> str:
+    """FTS5 MATCH text matching all terms as prefixes; terms are quoted, no query syntax gets through"""
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def user_fts5_query(user_id: int, terms: List[str]) -> str:
+    """`prefix_fts5_query` in title and description of the user's tasks only"""
+    return f'user_id : "{int(user_id)}" AND {{title description}} : ({prefix_fts5_query(terms)})'
+
+
+def _ts_config() -> ColumnElement:
+    # a constant, not a bound parameter: the query expression has to equal the indexed one
+    return cast(text(f"'{TS_CONFIG}'"), REGCONFIG)
+
+
+def search_vector(title, description) -> ColumnElement:
+    """Weighted document of a task, the expression behind the PostgreSQL GIN index"""
+    return func.setweight(func.to_tsvector(_ts_config(), title), text("'A'")).op("||", return_type=TSVECTOR)(
+        func.setweight(func.to_tsvector(_ts_config(), func.coalesce(description, text("''"))), text("'B'"))
+    )
+
+
+def search_tsquery(terms: List[str]) -> ColumnElement:
+    return func.to_tsquery(_ts_config(), prefix_tsquery(terms))
+
+
+def create_fts_index(_target, connection: Connection, **_kw) -> None:
+    """`after_create` hook of the tasks table, also run by the migration adding search"""
+    if connection.dialect.name == "sqlite":
+        for statement in FTS_DDL:
+            connection.exec_driver_sql(statement)
+
+
+def drop_fts_index(_target, connection: Connection, **_kw) -> None:
+    """`before_drop` hook of the tasks table, also run by the migration rebuilding the index"""
+    if connection.dialect.name == "sqlite":
+        for trigger in FTS_TRIGGERS:
+            connection.exec_driver_sql(f"DROP TRIGGER IF EXISTS {trigger}")
+        connection.exec_driver_sql(f"DROP TABLE IF EXISTS {FTS_TABLE}")
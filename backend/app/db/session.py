@@ -1,22 +1,111 @@
 """Database engine and session factory"""
 from __future__ import annotations
 
-from typing import Generator
+from typing import Any, AsyncGenerator, Dict, Generator, Optional
 
-from sqlalchemy import text
+from fastapi import Depends, Request
+from sqlalchemy import event, make_url, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker, declarative_base
 from sqlalchemy import create_engine
+from sqlalchemy.pool import NullPool
 
 from app.core.config import get_settings
+from app.core.metrics import instrument_engine
+from app.core.security import decode_token
+from app.db.replicas import PRIMARY_UNTIL_HEADER, ReplicaRouter, primary_until
 
 settings = get_settings()
 
-engine = create_engine(settings.sql_alchemy_uri, pool_pre_ping=True, future=True)
+"""Unqualified tables resolve to DB_SCHEMA at execution time, model metadata stays schema-less"""
+SCHEMA_OPTIONS = {"schema_translate_map": {None: settings.DB_SCHEMA}}
+
+
+def engine_options(serves_routes: bool) -> Dict[str, Any]:
+    """create_engine keyword arguments from the pool and driver settings"""
+    connect_args: Dict[str, Any] = {}
+    if settings.DB_PGBOUNCER:
+        # prepared statements live on one server connection, PgBouncer hands out a different one
+        connect_args["prepare_threshold"] = None
+    elif settings.DB_STATEMENT_TIMEOUT_MS > 0:
+        connect_args["options"] = f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+
+    options: Dict[str, Any] = dict(pool_pre_ping=True, execution_options=SCHEMA_OPTIONS, connect_args=connect_args)
+    if settings.DB_NULL_POOL:
+        options["poolclass"] = NullPool
+        return options
+    options.update(
+        pool_size=settings.DB_POOL_SIZE if serves_routes else settings.DB_AUX_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW if serves_routes else settings.DB_AUX_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+    )
+    return options
+
+
+engine = create_engine(settings.sql_alchemy_uri, future=True, **engine_options(serves_routes=not settings.DB_ASYNC))
+
+async_engine = create_async_engine(settings.sql_alchemy_async_uri, **engine_options(serves_routes=settings.DB_ASYNC))
+
+instrument_engine(engine)
+instrument_engine(async_engine)
 
 Base = declarative_base()
 
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
 
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+
+def _replica_factories(use_async: bool) -> list:
+    """Session factories of the configured replicas, only for the engine kind serving the routes"""
+    if use_async != settings.DB_ASYNC:
+        return []
+    factories = []
+    for raw in settings.replica_urls_list:
+        url = make_url(raw)
+        if use_async:
+            if url.drivername in ("postgresql", "postgresql+psycopg"):
+                url = url.set(drivername="postgresql+psycopg_async")
+            replica = create_async_engine(url, **engine_options(serves_routes=True))
+            factories.append(async_sessionmaker(bind=replica, autoflush=False, expire_on_commit=False))
+        else:
+            replica = create_engine(url, future=True, **engine_options(serves_routes=True))
+            factories.append(sessionmaker(bind=replica, autoflush=False, autocommit=False, future=True))
+        instrument_engine(replica)
+    return factories
+
+
+replicas: ReplicaRouter[Session] = ReplicaRouter(
+    _replica_factories(use_async=False), settings.DB_REPLICA_STRATEGY, settings.DB_READ_YOUR_WRITES_SECONDS
+)
+async_replicas: ReplicaRouter[AsyncSession] = ReplicaRouter(
+    _replica_factories(use_async=True), settings.DB_REPLICA_STRATEGY, settings.DB_READ_YOUR_WRITES_SECONDS
+)
+
+"""`Session.info` key naming who a write session works for, its commits open their read-your-writes window"""
+WRITER_KEY = "replica_writer"
+
+
+@event.listens_for(Session, "after_commit")
+def _open_read_your_writes_window(session: Session) -> None:
+    writer = session.info.get(WRITER_KEY)
+    if writer is not None:
+        replicas.mark_write(writer)
+        async_replicas.mark_write(writer)
+
+
+def request_subject(request: Request) -> Optional[str]:
+    """`sub` of a valid bearer token, keys the read-your-writes window (authentication happens elsewhere)"""
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return decode_token(token).get("sub")
+    except Exception:  # noqa: BLE001
+        return None
+
+
 def get_db() -> Generator[Session, None, None]:
     """FastAPI dependency that yields database session and ensures closing"""
     db = SessionLocal()
@@ -24,3 +113,50 @@ def get_db() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """FastAPI dependency that yields async database session and ensures closing"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_write_db(request: Request, db: Session = Depends(get_db)) -> Session:
+    """Primary session for routes that write, the caller's reads then stay on the primary for a while"""
+    db.info[WRITER_KEY] = request_subject(request)
+    return db
+
+
+def get_read_db(request: Request, db: Session = Depends(get_db)) -> Generator[Session, None, None]:
+    """Replica session for read-only routes, the primary one without replicas or right after the caller wrote"""
+    index = replicas.acquire(request_subject(request), primary_until(request.headers.get(PRIMARY_UNTIL_HEADER)))
+    if index is None:
+        yield db
+        return
+    replica = replicas.factories[index]()
+    try:
+        yield replica
+    finally:
+        replica.close()
+        replicas.release(index)
+
+
+async def get_async_write_db(request: Request, db: AsyncSession = Depends(get_async_db)) -> AsyncSession:
+    """`get_write_db` for the async routes"""
+    db.info[WRITER_KEY] = request_subject(request)
+    return db
+
+
+async def get_async_read_db(
+    request: Request, db: AsyncSession = Depends(get_async_db)
+) -> AsyncGenerator[AsyncSession, None]:
+    """`get_read_db` for the async routes"""
+    index = async_replicas.acquire(request_subject(request), primary_until(request.headers.get(PRIMARY_UNTIL_HEADER)))
+    if index is None:
+        yield db
+        return
+    try:
+        async with async_replicas.factories[index]() as replica:
+            yield replica
+    finally:
+        async_replicas.release(index)
@@ -0,0 +1,48 @@
+"""Retention of deleted-task tombstones used by delta sync
+
+Tombstones older than the retention are deleted periodically. Each affected user's
+`TaskVersion.compacted_version` moves up to the newest deleted tombstone in the same transaction, so
+`/api/tasks/changes` can tell that an older cursor would miss deletions and answer 410 instead.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import Engine, delete, func, select, update
+
+from app.db.models import TaskTombstone, TaskVersion
+
+logger = logging.getLogger(__name__)
+
+
+def compact_tombstones(engine: Engine, retention_days: int, now: Optional[datetime] = None) -> int:
+    """Delete tombstones older than `retention_days`, return how many were removed"""
+    cutoff = (now or datetime.now(timezone.utc)) - timedelta(days=retention_days)
+    expired = TaskTombstone.deleted_at < cutoff
+    newest_expired = (
+        select(func.max(TaskTombstone.version))
+        .where(TaskTombstone.user_id == TaskVersion.user_id, expired)
+        .scalar_subquery()
+    )
+    with engine.begin() as conn:
+        conn.execute(
+            update(TaskVersion)
+            .where(TaskVersion.user_id.in_(select(TaskTombstone.user_id).where(expired)))
+            .values(compacted_version=newest_expired)
+        )
+        return conn.execute(delete(TaskTombstone).where(expired)).rowcount
+
+
+async def run_compaction(engine: Engine, retention_days: int, interval: float) -> None:
+    """Compact every `interval` seconds on a worker thread until cancelled"""
+    while True:
+        try:
+            removed = await asyncio.to_thread(compact_tombstones, engine, retention_days)
+            if removed:
+                logger.info("Compacted %s task tombstones", removed)
+        except Exception:  # noqa: BLE001
+            logger.exception("Task tombstone compaction failed")
+        await asyncio.sleep(interval)
@@ -0,0 +1,61 @@
+"""Multi-worker launcher that keeps all workers within one database connection budget
+
+    DB_MAX_CONNECTIONS=80 python -m app.launcher --workers 4
+
+Every worker owns its own pools, so the budget is divided between them: each worker first
+reserves connections for the auxiliary engine and the task event listener, the rest goes to
+the pool of the engine serving the routes. The computed sizes are passed to the workers as
+DB_POOL_SIZE / DB_MAX_OVERFLOW environment variables.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+from typing import Dict
+
+import uvicorn
+
+from app.core.config import Settings, get_settings
+
+logger = logging.getLogger(__name__)
+
+
+def worker_pool_env(settings: Settings, workers: int, budget: int) -> Dict[str, str]:
+    """Pool settings per worker so `workers` processes never open more than `budget` connections"""
+    if budget <= 0 or settings.DB_NULL_POOL:
+        return {}
+    reserved = settings.DB_AUX_POOL_SIZE + settings.DB_AUX_MAX_OVERFLOW
+    if settings.TASK_EVENTS_PG_NOTIFY:
+        reserved += 1  # LISTEN connection
+    per_worker = budget // workers - reserved
+    if per_worker < 1:
+        raise SystemExit(
+            f"DB_MAX_CONNECTIONS={budget} leaves no pooled connection for {workers} workers "
+            f"({reserved} reserved per worker)"
+        )
+    pool_size = min(settings.DB_POOL_SIZE, per_worker)
+    return {"DB_POOL_SIZE": str(pool_size), "DB_MAX_OVERFLOW": str(per_worker - pool_size)}
+
+
+def main() -> None:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=settings.APP_WORKERS)
+    parser.add_argument("--max-connections", type=int, default=settings.DB_MAX_CONNECTIONS)
+    parser.add_argument("--host", default=settings.APP_HOST)
+    parser.add_argument("--port", type=int, default=settings.APP_PORT)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s:     %(message)s")
+
+    pool_env = worker_pool_env(settings, args.workers, args.max_connections)
+    os.environ.update(pool_env)  # inherited by the worker processes
+    if pool_env:
+        logger.info(
+            "%s workers x (pool %s + overflow %s)", args.workers, pool_env["DB_POOL_SIZE"], pool_env["DB_MAX_OVERFLOW"]
+        )
+    uvicorn.run("app.main:app", host=args.host, port=args.port, workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
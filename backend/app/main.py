@@ -1,16 +1,47 @@
 from __future__ import annotations
 
-from fastapi import FastAPI
+import asyncio
+import logging
+from typing import Optional
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse
 
+from app.core.admission import AdmissionMiddleware
 from app.core.config import get_settings
+from app.core.metrics import MetricsMiddleware
+from app.core.profiling import ProfilingMiddleware, profile_endpoints
+from app.core.reminders import reminder_scheduler
+from app.core.security import HashingPoolBusy
 from app.db.init_db import init_db
-from app.api.routes import auth, tasks, health
+from app.db.replicas import ReadYourWritesMiddleware
+from app.db.session import engine
+from app.db.tombstones import run_compaction
+from app.api.routes import auth, auth_async, tasks, tasks_async, task_rules, task_rules_async, task_events, health, metrics, profiles
+from app.core.pubsub import task_events as task_event_hub
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
 
 app = FastAPI(title=settings.APP_NAME)
 
+"""Compress large responses (task months and years), innermost so cached bodies stay uncompressed"""
+if settings.GZIP_MINIMUM_SIZE > 0:
+    app.add_middleware(GZipMiddleware, minimum_size=settings.GZIP_MINIMUM_SIZE, compresslevel=settings.GZIP_COMPRESS_LEVEL)
+
+"""Opt-in cProfile of forced and sampled requests, inside admission so time spent queued is not profiled"""
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
+"""Concurrency limits with bounded queues, inside CORS and metrics so 503s still get CORS headers and are counted"""
+app.add_middleware(AdmissionMiddleware)
+
+"""Tell clients how long their reads must skip the replicas after a write, for every worker to honour"""
+if settings.replica_urls_list:
+    app.add_middleware(ReadYourWritesMiddleware)
+
 """CORS"""
 app.add_middleware(
     CORSMiddleware,
@@ -18,14 +49,83 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Retry-After", "X-Profile-Id", "X-Primary-Until"],
 )
 
-"""Create DB schema/tables at startup"""
+"""Request metrics for /metrics and /ws/status"""
+app.add_middleware(MetricsMiddleware)
+
+"""Bring the DB schema to the current version at startup (one version check when up to date)"""
 @app.on_event("startup")
 def on_startup() -> None:
     init_db()
 
+
+"""Share task change pushes between workers through PostgreSQL"""
+@app.on_event("startup")
+async def start_task_events() -> None:
+    if settings.TASK_EVENTS_PG_NOTIFY:
+        task_event_hub.enable_pg_notify()
+
+
+"""Drop delta-sync tombstones past their retention; every worker runs it, repeated runs are no-ops"""
+_compaction: Optional[asyncio.Task] = None
+
+
+@app.on_event("startup")
+async def start_tombstone_compaction() -> None:
+    global _compaction
+    if settings.TASK_TOMBSTONE_COMPACT_INTERVAL_SECONDS > 0:
+        _compaction = asyncio.get_running_loop().create_task(
+            run_compaction(engine, settings.TASK_TOMBSTONE_RETENTION_DAYS, settings.TASK_TOMBSTONE_COMPACT_INTERVAL_SECONDS)
+        )
+
+
+@app.on_event("shutdown")
+async def stop_tombstone_compaction() -> None:
+    if _compaction is not None:
+        _compaction.cancel()
+
+
+"""Reminders of tasks with at_time, following task writes through the task event hub"""
+@app.on_event("startup")
+async def start_reminders() -> None:
+    if not settings.REMINDERS_ENABLED:
+        return
+    if not settings.TASK_EVENTS_PG_NOTIFY:
+        # other workers' writes would never reach this scheduler, and the worker count is unknown here
+        logger.error("Reminders disabled: REMINDERS_ENABLED needs TASK_EVENTS_PG_NOTIFY=true")
+        return
+    reminder_scheduler.start(task_event_hub)
+
+
+@app.on_event("shutdown")
+async def stop_reminders() -> None:
+    reminder_scheduler.stop(task_event_hub)
+
+
+"""Password hashing queue full: fail fast instead of piling up requests"""
+@app.exception_handler(HashingPoolBusy)
+async def hashing_pool_busy(_request: Request, _exc: HashingPoolBusy) -> JSONResponse:
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Authentication service busy, try again shortly"},
+        headers={"Retry-After": "1"},
+    )
+
+
 """Routers"""
-app.include_router(auth.router)
-app.include_router(tasks.router)
+if settings.DB_ASYNC:
+    app.include_router(auth_async.router)
+    app.include_router(tasks_async.router)
+    app.include_router(task_rules_async.router)
+else:
+    app.include_router(auth.router)
+    app.include_router(tasks.router)
+    app.include_router(task_rules.router)
+app.include_router(task_events.router)
 app.include_router(health.router)
+app.include_router(metrics.router)
+if settings.PROFILING_ENABLED:
+    app.include_router(profiles.router)
+    profile_endpoints(app.routes)
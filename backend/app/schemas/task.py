@@ -1,9 +1,12 @@
 """Models for task input/output."""
 from __future__ import annotations
 from datetime import date, time, datetime
-from typing import Optional
+from typing import List, Literal, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
+from typing_extensions import TypedDict
+
+BULK_MAX_ITEMS = 500
 
 
 class TaskBase(BaseModel):
@@ -27,6 +30,14 @@ class TaskUpdate(BaseModel):
     color: Optional[str] = Field(default=None, max_length=20)
     completed: Optional[bool] = None
 
+    @field_validator("title", "day", "completed")
+    @classmethod
+    def _not_null(cls, value):
+        # omit the field to keep it, the column is NOT NULL
+        if value is None:
+            raise ValueError("must not be null")
+        return value
+
 
 class TaskOut(TaskBase):
     id: int
@@ -35,3 +46,65 @@ class TaskOut(TaskBase):
 
     class Config:
         from_attributes = True
+
+
+class TaskRow(TypedDict):
+    """`TaskOut` fields of a plain row, serialized without building a model per task"""
+    title: str
+    description: Optional[str]
+    day: date
+    at_time: Optional[time]
+    color: Optional[str]
+    completed: bool
+    id: int
+    created_at: datetime
+    updated_at: datetime
+
+
+class TaskColumns(TypedDict):
+    """`TaskRow` fields stored column-wise: each name once, values of all tasks in listing order"""
+    title: List[str]
+    description: List[Optional[str]]
+    day: List[date]
+    at_time: List[Optional[time]]
+    color: List[Optional[str]]
+    completed: List[bool]
+    id: List[int]
+    created_at: List[datetime]
+    updated_at: List[datetime]
+
+
+class TaskChanges(TypedDict):
+    """Delta-sync page: apply `upserted`, then `deleted`, and pass `cursor` as `since` next time"""
+    cursor: str
+    upserted: List[TaskRow]
+    deleted: List[int]
+
+
+class TaskDaySummary(BaseModel):
+    day: date
+    total: int
+    completed: int
+
+
+class TaskBulkUpdate(TaskUpdate):
+    id: int
+
+
+class TaskBulkIn(BaseModel):
+    create: List[TaskCreate] = Field(default_factory=list, max_length=BULK_MAX_ITEMS)
+    update: List[TaskBulkUpdate] = Field(default_factory=list, max_length=BULK_MAX_ITEMS)
+    delete: List[int] = Field(default_factory=list, max_length=BULK_MAX_ITEMS)
+
+
+class TaskBulkResult(BaseModel):
+    op: Literal["create", "update", "delete"]
+    index: int
+    id: Optional[int] = None
+    status: int
+    task: Optional[TaskOut] = None
+    detail: Optional[str] = None
+
+
+class TaskBulkOut(BaseModel):
+    results: List[TaskBulkResult]
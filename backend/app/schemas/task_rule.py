@@ -0,0 +1,79 @@
+"""Models for recurring task rules and their occurrences."""
+from __future__ import annotations
+from datetime import date, time, datetime
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field, field_validator, model_validator
+from typing_extensions import Annotated, TypedDict
+
+from app.core.recurrence import mask_weekdays
+
+
+class TaskRuleBase(BaseModel):
+    title: str = Field(min_length=1, max_length=200)
+    description: Optional[str] = Field(default=None, max_length=2000)
+    at_time: Optional[time] = None
+    color: Optional[str] = Field(default=None, max_length=20)
+    freq: Literal["daily", "weekly", "monthly"]
+    interval: int = Field(default=1, ge=1, le=366)
+    weekdays: List[Annotated[int, Field(ge=0, le=6)]] = Field(
+        default_factory=list, max_length=7, description="Weekly rules: 0 = Monday ... 6 = Sunday"
+    )
+    start_day: date
+    end_day: Optional[date] = None
+
+    @model_validator(mode="after")
+    def _check_range(self) -> "TaskRuleBase":
+        if self.end_day is not None and self.end_day < self.start_day:
+            raise ValueError("end_day must not be before start_day")
+        if self.weekdays and self.freq != "weekly":
+            raise ValueError("weekdays apply to weekly rules only")
+        return self
+
+
+class TaskRuleCreate(TaskRuleBase):
+    pass
+
+
+class TaskRuleOut(TaskRuleBase):
+    id: int
+    created_at: datetime
+    updated_at: datetime
+
+    @field_validator("weekdays", mode="before")
+    @classmethod
+    def _from_mask(cls, value):
+        return mask_weekdays(value) if isinstance(value, int) else value
+
+    class Config:
+        from_attributes = True
+
+
+class TaskOccurrenceUpdate(BaseModel):
+    title: Optional[str] = Field(default=None, min_length=1, max_length=200)
+    description: Optional[str] = Field(default=None, max_length=2000)
+    at_time: Optional[time] = None
+    color: Optional[str] = Field(default=None, max_length=20)
+    completed: Optional[bool] = None
+
+
+class TaskOccurrence(TypedDict):
+    """One expanded occurrence of a rule with its override applied"""
+    rule_id: int
+    day: date
+    title: str
+    description: Optional[str]
+    at_time: Optional[time]
+    color: Optional[str]
+    completed: bool
+
+
+class TaskOccurrenceColumns(TypedDict):
+    """`TaskOccurrence` fields stored column-wise, in listing order"""
+    rule_id: List[int]
+    day: List[date]
+    title: List[str]
+    description: List[Optional[str]]
+    at_time: List[Optional[time]]
+    color: List[Optional[str]]
+    completed: List[bool]
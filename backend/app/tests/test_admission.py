@@ -0,0 +1,62 @@
+"""Admission control tests"""
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.admission import AdmissionMiddleware, ConcurrencyLimiter
+
+
+def test_limiter_queues_then_sheds():
+    async def scenario():
+        limiter = ConcurrencyLimiter("test", limit=1, max_queue=1, timeout=1.0)
+        assert await limiter.acquire()
+        waiting = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        assert limiter.queued == 1
+        # queue full: rejected without waiting
+        assert not await limiter.acquire()
+
+        limiter.release()
+        assert await waiting
+        assert limiter.stats() == {"limit": 1, "active": 1, "queued": 0, "rejected": 1}
+
+        limiter.timeout = 0.01
+        assert not await limiter.acquire()
+        assert limiter.queued == 0 and limiter.rejected == 2
+        limiter.release()
+        assert limiter.active == 0
+
+    asyncio.run(scenario())
+
+
+def test_saturated_class_gets_503_while_health_and_other_class_answer():
+    expensive = ConcurrencyLimiter("expensive", limit=1, max_queue=0, timeout=1.0)
+    cheap = ConcurrencyLimiter("cheap", limit=1, max_queue=0, timeout=1.0)
+    app = FastAPI()
+    app.add_middleware(AdmissionMiddleware, expensive=expensive, cheap=cheap, retry_after=3)
+
+    @app.get("/api/tasks")
+    def list_tasks():
+        return []
+
+    @app.get("/api/tasks/1")
+    def get_task():
+        return {}
+
+    @app.get("/api/health")
+    def health():
+        return {"status": "ok"}
+
+    client = TestClient(app)
+    assert client.get("/api/tasks").status_code == 200
+    expensive.active = 1  # a listing still running
+
+    r = client.get("/api/tasks")
+    assert r.status_code == 503
+    assert r.headers["retry-after"] == "3"
+    assert r.json()["detail"]
+    assert client.get("/api/tasks/1").status_code == 200
+    cheap.active = 1
+    assert client.get("/api/health").status_code == 200
+    assert (expensive.rejected, cheap.rejected) == (1, 0)
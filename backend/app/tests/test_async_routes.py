@@ -0,0 +1,98 @@
+"""Async (AsyncSession) route tests"""
+import asyncio
+import os
+from datetime import date
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.api.routes import auth_async, task_rules_async, tasks_async
+from app.db.session import Base, get_async_db
+
+ASYNC_DB_FILE = "./test_async.db"
+ASYNC_DATABASE_URL = f"sqlite+aiosqlite:///{ASYNC_DB_FILE}"
+
+
+@pytest.fixture(scope="module")
+def async_client():
+    engine = create_async_engine(ASYNC_DATABASE_URL)
+    SessionAsync = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+    async def create_schema():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    asyncio.run(create_schema())
+
+    async def override_get_async_db():
+        async with SessionAsync() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(auth_async.router)
+    app.include_router(tasks_async.router)
+    app.include_router(task_rules_async.router)
+    app.dependency_overrides[get_async_db] = override_get_async_db
+
+    with TestClient(app) as client:
+        yield client
+
+    asyncio.run(engine.dispose())
+    os.remove(ASYNC_DB_FILE)
+
+
+def test_async_auth_and_task_crud(async_client):
+    r = async_client.post(
+        "/api/auth/register",
+        json={"email": "async@example.com", "first_name": "Ala", "last_name": "Nowak", "password": "Secret123"},
+    )
+    assert r.status_code == 201, r.text
+    r = async_client.post("/api/auth/login", json={"email": "async@example.com", "password": "Secret123"})
+    assert r.status_code == 200, r.text
+    async_client.headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+    assert async_client.get("/api/auth/me").json()["email"] == "async@example.com"
+
+    today = str(date.today())
+    r = async_client.post("/api/tasks", json={"title": "async", "day": today, "at_time": "09:00:00"})
+    assert r.status_code == 201, r.text
+    task_id = r.json()["id"]
+
+    r = async_client.put(f"/api/tasks/{task_id}", json={"completed": True})
+    assert r.status_code == 200
+    assert r.json()["completed"] is True
+
+    r = async_client.get("/api/tasks", params={"month": today[:7]})
+    assert r.status_code == 200
+    assert [t["id"] for t in r.json()] == [task_id]
+    assert [t["id"] for t in async_client.get("/api/tasks/search", params={"q": "asy"}).json()] == [task_id]
+    cursor = async_client.get("/api/tasks/changes").json()["cursor"]
+
+    assert async_client.delete(f"/api/tasks/{task_id}").status_code == 204
+    assert async_client.get(f"/api/tasks/{task_id}").status_code == 404
+    assert async_client.get(f"/api/tasks/{task_id}", headers={"If-None-Match": "*"}).status_code == 404
+    assert async_client.get("/api/tasks/changes", params={"since": cursor}).json()["deleted"] == [task_id]
+
+
+def test_async_task_rules(async_client):
+    async_client.post(
+        "/api/auth/register",
+        json={"email": "async-rules@example.com", "first_name": "Ala", "last_name": "Nowak", "password": "Secret123"},
+    )
+    r = async_client.post("/api/auth/login", json={"email": "async-rules@example.com", "password": "Secret123"})
+    async_client.headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+    r = async_client.post("/api/task-rules", json={"title": "Trening", "freq": "daily", "interval": 3, "start_day": "2025-03-01"})
+    assert r.status_code == 201, r.text
+    rule_id = r.json()["id"]
+    assert async_client.put(f"/api/task-rules/{rule_id}/occurrences/2025-03-04", json={"completed": True}).status_code == 200
+    assert async_client.delete(f"/api/task-rules/{rule_id}/occurrences/2025-03-07").status_code == 204
+
+    r = async_client.get("/api/task-rules/occurrences", params={"start": "2025-03-01", "end": "2025-03-10"})
+    assert [(o["day"], o["completed"]) for o in r.json()] == [
+        ("2025-03-01", False), ("2025-03-04", True), ("2025-03-10", False)
+    ]
+    assert async_client.delete(f"/api/task-rules/{rule_id}").status_code == 204
+    assert async_client.get("/api/task-rules").json() == []
@@ -76,4 +76,170 @@ def test_login_with_new_password(client):
 
     client.headers = {}
     r = client.post(LOGIN_URL, json={"email": email, "password": new_pw})
-    assert r.status_code == 200, r.text
\ No newline at end of file
+    assert r.status_code == 200, r.text
+
+
+def test_current_user_cache_invalidation(client, db_session):
+    from app.api.deps import user_cache
+    from app.db.models import User
+
+    email = "cached@example.com"
+    client.post(
+        REGISTER_URL,
+        json={"email": email, "first_name": "Ola", "last_name": "Lis", "password": "Cache1234"},
+    )
+    r = client.post(LOGIN_URL, json={"email": email, "password": "Cache1234"})
+    client.headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+    client.get(ME_URL)
+    hits = user_cache.stats()["hits"]
+    assert client.get(ME_URL).status_code == 200
+    assert user_cache.stats()["hits"] == hits + 1
+
+    r = client.put(ME_URL, json={"first_name": "Aleksandra"})
+    assert r.status_code == 200
+    assert client.get(ME_URL).json()["first_name"] == "Aleksandra"
+
+    user = db_session.query(User).filter(User.email == email).first()
+    user.is_active = False
+    db_session.commit()
+    assert client.get(ME_URL).status_code == 401
+
+
+def test_user_cache_is_invalidated_on_commit_not_flush(client, db_session):
+    from fastapi import HTTPException
+    from sqlalchemy import update
+    from sqlalchemy.orm import Session
+
+    from app.api.deps import user_cache, user_from_token
+    from app.db.models import User
+
+    email = "flushed@example.com"
+    client.post(REGISTER_URL, json={"email": email, "first_name": "F", "last_name": "L", "password": "Flush1234"})
+    token = client.post(LOGIN_URL, json={"email": email, "password": "Flush1234"}).json()["access_token"]
+    reader = Session(db_session.get_bind())
+    try:
+        user = db_session.query(User).filter(User.email == email).first()
+        user.first_name = "Flushed"
+        db_session.flush()
+        # a request served between flush and commit caches the committed row
+        assert user_from_token(reader, token).first_name == "F"
+        reader.rollback()
+        db_session.commit()
+        assert user_from_token(reader, token).first_name == "Flushed"
+
+        # a read started before an invalidation does not store what it loaded
+        generation = user_cache.generation
+        user_cache.invalidate(email)
+        user_cache.set(email, {"email": email}, generation)
+        assert user_cache.get(email) is None
+
+        # bulk statements skip mapper events, they drop every cached user on commit
+        assert user_from_token(reader, token).is_active
+        reader.rollback()
+        db_session.execute(update(User).where(User.email == email).values(is_active=False))
+        db_session.commit()
+        with pytest.raises(HTTPException):
+            user_from_token(reader, token)
+    finally:
+        reader.close()
+
+
+def test_login_fails_fast_when_hashing_queue_full(client, monkeypatch):
+    import threading
+
+    from app.core import security
+
+    pool = security.HashingPool(workers=1, max_queue=0)
+    monkeypatch.setattr(security, "hashing_pool", pool)
+    release = threading.Event()
+    pool.submit(release.wait)
+    try:
+        r = client.post(LOGIN_URL, json={"email": "user2@example.com", "password": "Secret123"})
+        assert r.status_code == 503
+        assert r.headers["Retry-After"] == "1"
+    finally:
+        release.set()
+
+
+def test_password_change_revokes_issued_tokens(client):
+    email = "revoke@example.com"
+    client.post(REGISTER_URL, json={"email": email, "first_name": "R", "last_name": "V", "password": "Revoke123"})
+    r = client.post(LOGIN_URL, json={"email": email, "password": "Revoke123"})
+    client.headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+    r = client.post(CHANGE_PW_URL, json={"old_password": "Revoke123", "new_password": "Revoke456"})
+    assert r.status_code == 204
+    assert client.get(ME_URL).status_code == 401
+
+    r = client.post(LOGIN_URL, json={"email": email, "password": "Revoke456"})
+    client.headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+    assert client.get(ME_URL).status_code == 200
+
+
+def test_revocation_by_another_worker_with_stale_user_cache(client, db_session):
+    from sqlalchemy import update
+
+    from app.api.deps import user_cache
+    from app.db.models import User
+
+    email = "staleworker@example.com"
+    client.post(REGISTER_URL, json={"email": email, "first_name": "S", "last_name": "W", "password": "Stale1234"})
+    r = client.post(LOGIN_URL, json={"email": email, "password": "Stale1234"})
+    client.headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+    assert client.get(ME_URL).status_code == 200
+    assert user_cache.get(email)["token_version"] == 0
+
+    # another worker revoked the tokens: this worker's cache does not hear about it
+    with db_session.get_bind().begin() as conn:
+        conn.execute(update(User).where(User.email == email).values(token_version=User.token_version + 1))
+    r = client.post(LOGIN_URL, json={"email": email, "password": "Stale1234"})
+    client.headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+    assert client.get(ME_URL).status_code == 200  # the newer token reloads the cached row
+
+    # a password change served from a stale snapshot still moves the version past the stored one
+    user_cache.set(email, {**user_cache.get(email), "token_version": 0})
+    with db_session.get_bind().begin() as conn:
+        conn.execute(update(User).where(User.email == email).values(token_version=5))
+    r = client.post(LOGIN_URL, json={"email": email, "password": "Stale1234"})
+    client.headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+    r = client.post(CHANGE_PW_URL, json={"old_password": "Stale1234", "new_password": "Stale5678"})
+    assert r.status_code == 204
+    db_session.expire_all()
+    assert db_session.query(User.token_version).filter(User.email == email).scalar() == 6
+
+
+def test_stateless_tokens_skip_users_table(client, db_session, monkeypatch):
+    from sqlalchemy import event
+
+    from app.api import deps
+    from app.db.models import User
+
+    monkeypatch.setattr(deps._settings, "JWT_STATELESS", True)
+    email = "stateless@example.com"
+    client.post(REGISTER_URL, json={"email": email, "first_name": "S", "last_name": "L", "password": "Stateless1"})
+    r = client.post(LOGIN_URL, json={"email": email, "password": "Stateless1"})
+    client.headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+    summary = "/api/tasks/summary?start=2025-01-01&end=2025-01-31"
+    assert client.get(summary).status_code == 200  # loads the version map
+
+    statements = []
+    engine = db_session.get_bind()
+    listener = lambda *args: statements.append(args[2])  # noqa: E731
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        assert client.get(summary).status_code == 200
+        task_id = client.post("/api/tasks", json={"title": "s", "day": "2025-01-02"}).json()["id"]
+        assert client.put(f"/api/tasks/{task_id}", json={"completed": True}).status_code == 200
+        assert client.get("/api/tasks", params={"month": "2025-01"}).json()[0]["completed"] is True
+        assert client.get(f"/api/tasks/{task_id}").status_code == 200
+        assert client.get("/api/tasks/changes").status_code == 200
+        assert client.delete(f"/api/tasks/{task_id}").status_code == 204
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    assert statements and not any("users" in sql for sql in statements)
+
+    user = db_session.query(User).filter(User.email == email).first()
+    user.is_active = False
+    db_session.commit()
+    assert client.get(summary).status_code == 401
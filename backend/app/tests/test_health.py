@@ -1,7 +1,10 @@
 """Websocket and health check tests"""
+import asyncio
 import json
 from fastapi.testclient import TestClient
 
+from app.core.broadcast import Ticker
+
 def test_health_endpoint(client: TestClient):
     r = client.get("/api/health")
     assert r.status_code == 200
@@ -14,4 +17,28 @@ def test_websocket_status(client: TestClient):
         data = ws.receive_text()
         parsed = json.loads(data)
         assert parsed["status"] == "ok"
-        assert "datetime_utc" in parsed
\ No newline at end of file
+        assert "datetime_utc" in parsed
+
+def test_websocket_status_runtime_metrics(client: TestClient):
+    client.get("/api/health")
+    with client.websocket_connect("/ws/status") as ws:
+        parsed = json.loads(ws.receive_text())
+    assert parsed["requests"]["total"] >= 1
+    assert set(parsed["requests"]["latency_ms"]) == {"p50", "p95", "p99"}
+    assert "checked_out" in parsed["db_pool"]["sync"]
+    assert parsed["websockets"]["status"] >= 1
+
+
+def test_ticker_drops_slow_subscribers():
+    async def scenario():
+        ticker = Ticker(lambda: {"n": 1}, interval=3600, queue_size=2)
+        fast, slow = ticker.subscribe(), ticker.subscribe()
+        for _ in range(3):
+            ticker.tick()
+            fast.get_nowait()
+        assert ticker.subscriber_count() == 1
+        assert ticker.dropped == 1
+        assert slow.get_nowait() is None
+        ticker.unsubscribe(fast)
+
+    asyncio.run(scenario())
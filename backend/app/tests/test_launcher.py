@@ -0,0 +1,33 @@
+"""Connection budget tests"""
+import pytest
+
+from app.core.config import get_settings
+from app.db.session import engine_options
+from app.launcher import worker_pool_env
+
+
+def test_budget_is_divided_between_workers():
+    settings = get_settings().model_copy(update={"DB_POOL_SIZE": 5, "DB_AUX_POOL_SIZE": 1, "DB_AUX_MAX_OVERFLOW": 1})
+    env = worker_pool_env(settings, workers=4, budget=80)
+    assert env == {"DB_POOL_SIZE": "5", "DB_MAX_OVERFLOW": "13"}
+    assert 4 * (int(env["DB_POOL_SIZE"]) + int(env["DB_MAX_OVERFLOW"]) + 2) <= 80
+
+    notify = settings.model_copy(update={"TASK_EVENTS_PG_NOTIFY": True})
+    assert worker_pool_env(notify, workers=16, budget=64) == {"DB_POOL_SIZE": "1", "DB_MAX_OVERFLOW": "0"}
+    with pytest.raises(SystemExit):
+        worker_pool_env(notify, workers=16, budget=48)
+    assert worker_pool_env(settings, workers=4, budget=0) == {}
+
+
+def test_pgbouncer_engine_options(monkeypatch):
+    from app.db import session
+
+    monkeypatch.setattr(session.settings, "DB_STATEMENT_TIMEOUT_MS", 5000)
+    assert engine_options(True)["connect_args"] == {"options": "-c statement_timeout=5000"}
+    assert engine_options(True)["pool_size"] == session.settings.DB_POOL_SIZE
+
+    monkeypatch.setattr(session.settings, "DB_PGBOUNCER", True)
+    monkeypatch.setattr(session.settings, "DB_NULL_POOL", True)
+    options = engine_options(True)
+    assert options["connect_args"] == {"prepare_threshold": None}
+    assert options["poolclass"].__name__ == "NullPool" and "pool_size" not in options
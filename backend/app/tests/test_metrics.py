@@ -0,0 +1,43 @@
+"""Prometheus metrics tests"""
+import pytest
+from sqlalchemy import create_engine, exc, text
+
+from app.core.metrics import db_pool_checkouts, db_pool_in_use, db_statement_duration, http_duration, http_requests, instrument_engine
+
+
+def test_metrics_endpoint_counts_requests_by_route(client):
+    before = http_requests.value(("GET", "/api/health", "200"))
+    client.get("/api/health")
+    client.get("/api/does-not-exist")
+
+    assert http_requests.value(("GET", "/api/health", "200")) == before + 1
+    assert http_requests.value(("GET", "unmatched", "404")) >= 1
+    assert http_duration.count(("GET", "/api/health")) >= 1
+
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'http_requests_total{method="GET",route="/api/health",status="200"}' in r.text
+    assert '# TYPE http_request_duration_seconds histogram' in r.text
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/api/health",le="+Inf"}' in r.text
+
+
+def test_engine_hooks_record_statements_and_pool_checkouts():
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+    selects = db_statement_duration.count(("SELECT",))
+    checkouts, in_use = db_pool_checkouts.value(), db_pool_in_use.read()
+
+    with engine.connect() as conn:
+        assert db_pool_in_use.read() == in_use + 1
+        conn.execute(text("SELECT 1"))
+        with pytest.raises(exc.OperationalError):
+            conn.execute(text("SELEC 2"))
+        # the failed statement left no start time behind
+        assert conn.info["query_start"] == []
+        conn.execute(text("select 2"))
+
+    assert db_statement_duration.count(("SELECT",)) == selects + 2
+    assert db_pool_checkouts.value() == checkouts + 1
+    assert db_pool_in_use.read() == in_use
+    engine.dispose()
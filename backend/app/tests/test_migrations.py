@@ -0,0 +1,115 @@
+"""Schema bootstrap tests
+
+SQLite always runs; set TEST_POSTGRES_URL to also check the advisory-locked path with a
+schema mapped through `schema_translate_map`.
+"""
+import os
+
+import pytest
+from sqlalchemy import create_engine, event, inspect, text
+
+from app.api.routes.tasks import search_tasks_stmt
+from app.db.migrations import LATEST_VERSION, VERSION_TABLE, current_version, upgrade
+
+ENGINES = ["sqlite"] + (["postgresql"] if os.getenv("TEST_POSTGRES_URL") else [])
+PG_SCHEMA = "migration_test"
+
+
+@pytest.fixture(params=ENGINES)
+def bare_engine(request, tmp_path):
+    if request.param == "sqlite":
+        engine = create_engine(f"sqlite:///{tmp_path / 'migrations.db'}")
+        yield engine
+    else:
+        engine = create_engine(
+            os.environ["TEST_POSTGRES_URL"], execution_options={"schema_translate_map": {None: PG_SCHEMA}}
+        )
+        yield engine
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {PG_SCHEMA} CASCADE"))
+    engine.dispose()
+
+
+def _schema(engine):
+    return PG_SCHEMA if engine.dialect.name == "postgresql" else None
+
+
+def test_fresh_database_is_created_and_versioned(bare_engine):
+    assert upgrade(bare_engine) == 0
+    schema = _schema(bare_engine)
+    tables = set(inspect(bare_engine).get_table_names(schema=schema))
+    assert {"users", "tasks", VERSION_TABLE} <= tables
+    with bare_engine.connect() as conn:
+        assert current_version(conn, schema) == LATEST_VERSION
+
+
+def test_current_schema_costs_one_query(bare_engine):
+    upgrade(bare_engine)
+    statements = []
+    event.listen(bare_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    assert upgrade(bare_engine) == LATEST_VERSION
+    assert len(statements) == 1 and VERSION_TABLE in statements[0]
+
+
+def test_legacy_create_all_database_is_upgraded(bare_engine):
+    schema = _schema(bare_engine)
+    prefix = f"{schema}." if schema else ""
+    with bare_engine.begin() as conn:
+        if schema:
+            conn.execute(text(f"CREATE SCHEMA {schema}"))
+        # tables as the first create_all-based releases left them
+        conn.execute(text(
+            f"CREATE TABLE {prefix}users (id INTEGER PRIMARY KEY, email VARCHAR(320) NOT NULL UNIQUE, "
+            "first_name VARCHAR(100) NOT NULL, last_name VARCHAR(100) NOT NULL, password_hash VARCHAR(255) NOT NULL, "
+            "is_active BOOLEAN NOT NULL DEFAULT true, created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP)"
+        ))
+        conn.execute(text(
+            f"CREATE TABLE {prefix}tasks (id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL REFERENCES {prefix}users(id), "
+            "title VARCHAR(200) NOT NULL, description VARCHAR(2000), day DATE NOT NULL, at_time TIME, color VARCHAR(20), "
+            "completed BOOLEAN NOT NULL DEFAULT false, created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP, "
+            "updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP)"
+        ))
+        conn.execute(text(f"CREATE INDEX ix_tasks_user_id ON {prefix}tasks (user_id)"))
+        conn.execute(text(f"CREATE INDEX ix_tasks_day ON {prefix}tasks (day)"))
+        conn.execute(text(
+            f"INSERT INTO {prefix}users (id, email, first_name, last_name, password_hash) VALUES (1, 'l@example.com', 'L', 'L', 'x')"
+        ))
+        conn.execute(text(f"INSERT INTO {prefix}tasks (id, user_id, title, day) VALUES (1, 1, 'Zakupy przed migracją', '2024-01-01')"))
+
+    upgrade(bare_engine)
+
+    inspector = inspect(bare_engine)
+    columns = {column["name"] for column in inspector.get_columns("users", schema=schema)}
+    assert "token_version" in columns and not {"tasks_version", "tasks_compacted_version"} & columns
+    assert "task_versions" in inspector.get_table_names(schema=schema)
+    assert "version" in {column["name"] for column in inspector.get_columns("tasks", schema=schema)}
+    indexes = {index["name"] for index in inspector.get_indexes("tasks", schema=schema)}
+    assert {"ix_tasks_user_day_at_time", "ix_tasks_user_version"} <= indexes
+    assert not indexes & {"ix_tasks_user_id", "ix_tasks_day"}
+    # tasks written before the search index existed are found
+    with bare_engine.connect() as conn:
+        assert [row.id for row in conn.execute(search_tasks_stmt(bare_engine.dialect.name, 1, ["zak"]))] == [1]
+
+
+def test_task_versions_move_out_of_users(bare_engine):
+    """A database at version 6 keeps its task list versions and delta-sync marks"""
+    schema = _schema(bare_engine)
+    prefix = f"{schema}." if schema else ""
+    upgrade(bare_engine)
+    with bare_engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE {prefix}task_versions"))
+        for column in ("tasks_version", "tasks_compacted_version"):
+            conn.execute(text(f"ALTER TABLE {prefix}users ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0"))
+        conn.execute(text(
+            f"INSERT INTO {prefix}users (id, email, first_name, last_name, password_hash, tasks_version, tasks_compacted_version) "
+            "VALUES (1, 'a@example.com', 'A', 'A', 'x', 9, 4), (2, 'b@example.com', 'B', 'B', 'x', 0, 0)"
+        ))
+        conn.execute(text(f"UPDATE {prefix}{VERSION_TABLE} SET version = 6"))
+
+    assert upgrade(bare_engine) == 6
+    with bare_engine.connect() as conn:
+        rows = conn.execute(text(f"SELECT user_id, version, compacted_version FROM {prefix}task_versions")).all()
+    assert [tuple(row) for row in rows] == [(1, 9, 4)]
+    columns = {column["name"] for column in inspect(bare_engine).get_columns("users", schema=schema)}
+    assert not {"tasks_version", "tasks_compacted_version"} & columns
@@ -0,0 +1,101 @@
+"""Request profiling tests"""
+import pstats
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from app.api.routes import profiles
+from app.core.config import get_settings
+from app.core.metrics import instrument_engine
+from app.core import profiling
+from app.core.profiling import ProfileStore, ProfilingMiddleware, profile_endpoints
+
+SECRET = "s3cret"
+
+
+def _app(store: ProfileStore, **options) -> FastAPI:
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+
+    def _hot_path() -> int:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            return conn.execute(text("SELECT 2")).scalar()
+
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware, store=store, secret=SECRET, **options)
+    app.include_router(profiles.router)
+    app.dependency_overrides[profiles.get_profile_store] = lambda: store
+
+    @app.get("/api/tasks")
+    def list_tasks():
+        return {"value": _hot_path()}
+
+    @app.get("/api/other")
+    async def other():
+        return {}
+
+    profile_endpoints(app.routes)
+    return app
+
+
+def test_profile_header_records_threadpool_calls_and_sql(tmp_path, monkeypatch):
+    monkeypatch.setattr(get_settings(), "PROFILING_SECRET", SECRET)
+    store = ProfileStore(str(tmp_path), max_files=10)
+    client = TestClient(_app(store, sample_rate=0.0))
+
+    assert "x-profile-id" not in client.get("/api/tasks").headers
+    assert "x-profile-id" not in client.get("/api/tasks", headers={"X-Profile": "wrong"}).headers
+    assert client.get("/api/profiles", headers={"X-Profile": "wrong"}).status_code == 403
+
+    r = client.get("/api/tasks", headers={"X-Profile": SECRET})
+    assert r.status_code == 200 and r.json() == {"value": 2}
+    profile_id = r.headers["x-profile-id"]
+
+    index = client.get("/api/profiles", headers={"X-Profile": SECRET}).json()["profiles"]
+    assert [(p["id"], p["reason"], p["route"], p["status"], p["sql_count"]) for p in index] == [
+        (profile_id, "header", "/api/tasks", 200, 2)
+    ]
+    summary = client.get(f"/api/profiles/{profile_id}", headers={"X-Profile": SECRET}).json()
+    assert [s["sql"] for s in summary["statements"]] == ["SELECT 1", "SELECT 2"]
+    # the sync endpoint ran on a threadpool thread under the request's profiler
+    assert any("_hot_path" in f["function"] for f in summary["top_functions"])
+
+    dump = client.get(f"/api/profiles/{profile_id}.prof", headers={"X-Profile": SECRET})
+    assert dump.status_code == 200
+    (tmp_path / "download.prof").write_bytes(dump.content)
+    functions = pstats.Stats(str(tmp_path / "download.prof")).stats
+    assert any(name == "_hot_path" for _file, _line, name in functions)
+
+    assert client.get("/api/profiles/../x", headers={"X-Profile": SECRET}).status_code == 404
+    assert client.get("/api/profiles/20250101T000000000000-00000000", headers={"X-Profile": SECRET}).status_code == 404
+
+
+def test_sampling_is_limited_to_paths_and_keeps_newest_profiles(tmp_path):
+    store = ProfileStore(str(tmp_path), max_files=2)
+    client = TestClient(_app(store, sample_rate=1.0, paths=["/api/tasks"]))
+
+    assert "x-profile-id" not in client.get("/api/other").headers
+    ids = [client.get("/api/tasks").headers["x-profile-id"] for _ in range(3)]
+
+    assert [p["id"] for p in store.index()] == ids[:0:-1]
+    assert all(p["reason"] == "sampled" for p in store.index())
+    assert sorted(path.name for path in tmp_path.iterdir()) == sorted(
+        f"{profile_id}{suffix}" for profile_id in ids[1:] for suffix in (".json", ".prof")
+    )
+
+
+def test_request_is_not_profiled_when_another_profiler_is_active(tmp_path, monkeypatch):
+    class ActiveElsewhere(profiling.cProfile.Profile):
+        def enable(self, *args, **kwargs):
+            raise ValueError("Another profiling tool is already active")
+
+    monkeypatch.setattr(profiling.cProfile, "Profile", ActiveElsewhere)
+    store = ProfileStore(str(tmp_path), max_files=10)
+    client = TestClient(_app(store, sample_rate=1.0, paths=[]))
+
+    for path in ("/api/tasks", "/api/other"):
+        r = client.get(path)
+        assert r.status_code == 200 and "x-profile-id" not in r.headers
+    assert store.index() == []
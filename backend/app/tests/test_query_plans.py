@@ -0,0 +1,130 @@
+"""Query plan regression tests for the task listing queries
+
+The listing queries are seeded with enough rows for the planner to prefer indexes and
+their plans are checked for a range scan on the composite index without a full sort.
+SQLite always runs; set TEST_POSTGRES_URL to check the PostgreSQL plans as well.
+"""
+import os
+import random
+from datetime import date, datetime, time, timedelta
+
+import pytest
+from sqlalchemy import create_engine, insert, text
+
+from app.api.routes.tasks import changed_tasks_stmt, encode_cursor, list_tasks_stmt, search_tasks_stmt
+from app.core.reminders import due_tasks_stmt
+from app.db.models import Task, User
+from app.db.session import Base
+
+INDEX_NAME = "ix_tasks_user_day_at_time"
+USERS = 200
+TASKS_PER_USER = 250
+
+ENGINES = ["sqlite"] + (["postgresql"] if os.getenv("TEST_POSTGRES_URL") else [])
+
+
+def _seed(engine) -> None:
+    rnd = random.Random(42)
+    first = date(2024, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(
+            insert(User),
+            [
+                {"id": uid, "email": f"plan{uid}@example.com", "first_name": "P", "last_name": "L",
+                 "password_hash": "x", "is_active": True}
+                for uid in range(1, USERS + 1)
+            ],
+        )
+        conn.execute(
+            insert(Task),
+            [
+                {
+                    "user_id": uid,
+                    "title": "t",
+                    "day": first + timedelta(days=rnd.randrange(730)),
+                    "at_time": None if rnd.random() < 0.3 else time(rnd.randrange(24), 0),
+                    "completed": rnd.random() < 0.5,
+                }
+                for uid in range(1, USERS + 1)
+                for _ in range(TASKS_PER_USER)
+            ],
+        )
+        conn.execute(text("ANALYZE"))
+
+
+@pytest.fixture(scope="module", params=ENGINES)
+def plan_engine(request):
+    if request.param == "sqlite":
+        engine = create_engine("sqlite://")
+    else:
+        engine = create_engine(os.environ["TEST_POSTGRES_URL"])
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    _seed(engine)
+    yield engine
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+
+
+def _plan(engine, stmt) -> str:
+    sql = str(stmt.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+    with engine.connect() as conn:
+        if engine.dialect.name == "sqlite":
+            rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}").all()
+            return "\n".join(row[-1] for row in rows)
+        return "\n".join(row[0] for row in conn.exec_driver_sql(f"EXPLAIN {sql}").all())
+
+
+def _assert_index_range_without_sort(engine, stmt) -> None:
+    plan = _plan(engine, stmt)
+    assert INDEX_NAME in plan, plan
+    if engine.dialect.name == "sqlite":
+        # SQLite indexes cannot store NULLS LAST, a per-day sort of the at_time part is expected
+        assert "SCAN tasks" not in plan, plan
+        assert "USE TEMP B-TREE FOR ORDER BY" not in plan, plan
+    else:
+        assert "Seq Scan" not in plan, plan
+        assert "Sort" not in plan, plan
+
+
+QUERIES = {
+    "month": dict(month="2024-06"),
+    "day": dict(day=date(2024, 6, 15)),
+    "month_completed": dict(month="2024-06", completed=True),
+    "page": dict(limit=51),
+}
+
+
+@pytest.mark.parametrize("name", QUERIES)
+def test_listing_uses_composite_index(plan_engine, name):
+    _assert_index_range_without_sort(plan_engine, list_tasks_stmt(user_id=7, **QUERIES[name]))
+
+
+def test_keyset_page_uses_composite_index(plan_engine):
+    with plan_engine.connect() as conn:
+        row = conn.execute(
+            list_tasks_stmt(user_id=7).with_only_columns(Task.day, Task.at_time, Task.id).offset(100).limit(1)
+        ).one()
+    cursor = encode_cursor(Task(day=row.day, at_time=row.at_time, id=row.id))
+    _assert_index_range_without_sort(plan_engine, list_tasks_stmt(user_id=7, cursor=cursor, limit=51))
+
+
+def test_search_uses_full_text_index(plan_engine):
+    plan = _plan(plan_engine, search_tasks_stmt(plan_engine.dialect.name, 7, ["zakupy"]))
+    if plan_engine.dialect.name == "sqlite":
+        # matches come from the FTS5 index, tasks are then fetched by rowid
+        assert "SCAN tasks_fts VIRTUAL TABLE" in plan, plan
+        assert "SEARCH tasks USING INTEGER PRIMARY KEY" in plan, plan
+    else:
+        assert "ix_tasks_search" in plan, plan
+        assert "Seq Scan" not in plan, plan
+
+
+def test_delta_sync_uses_version_index(plan_engine):
+    plan = _plan(plan_engine, changed_tasks_stmt(7, 0))
+    assert "ix_tasks_user_version" in plan, plan
+
+
+def test_reminder_horizon_uses_partial_due_index(plan_engine):
+    plan = _plan(plan_engine, due_tasks_stmt(datetime(2024, 6, 15, 22, 0), datetime(2024, 6, 16, 4, 0)))
+    assert "ix_tasks_due" in plan, plan
@@ -0,0 +1,117 @@
+"""Reminder scheduler tests"""
+import asyncio
+import time
+from collections import namedtuple
+from datetime import datetime, timezone
+
+from app.core.pubsub import TaskEventHub
+from app.core.reminders import LogSink, ReminderScheduler
+
+Row = namedtuple("Row", "id user_id title day at_time")
+
+
+def _row(task_id: int, due: float, user_id: int = 1) -> Row:
+    local = datetime.fromtimestamp(due, tz=timezone.utc)
+    return Row(task_id, user_id, f"Task {task_id}", local.date(), local.time())
+
+
+def _upsert(row: Row, completed: bool = False) -> dict:
+    task = {"id": row.id, "title": row.title, "day": row.day.isoformat(), "at_time": row.at_time.isoformat(), "completed": completed}
+    return {"version": 1, "changes": [{"op": "upsert", "task": task}]}
+
+
+def test_scheduler_delivers_due_reminders_and_follows_task_writes():
+    async def scenario():
+        now = time.time()
+        rows = [_row(1, now + 0.05), _row(2, now + 0.1), _row(3, now + 0.12), _row(4, now + 30)]
+        sink, hub = LogSink(), TaskEventHub()
+        scheduler = ReminderScheduler(lambda start, end: rows, sink, horizon=60)
+        scheduler.start(hub)
+        await asyncio.sleep(0.02)
+        assert scheduler.stats()["pending"] == 4
+
+        hub.publish(1, _upsert(_row(1, now + 0.15)))  # moved later
+        hub.publish(1, _upsert(rows[1], completed=True))
+        hub.publish(1, {"version": 2, "changes": [{"op": "delete", "id": 3}]})
+        hub.publish(2, _upsert(_row(5, now + 0.08, user_id=2)))  # created
+        hub.publish(2, _upsert(_row(6, now + 3600, user_id=2)))  # beyond the horizon
+        await asyncio.sleep(0.3)
+
+        assert [(r.task_id, r.user_id) for r in sink.delivered] == [(5, 2), (1, 1)]
+        assert scheduler.stats()["pending"] == 1
+        scheduler.stop(hub)
+
+    asyncio.run(scenario())
+
+
+def test_resync_reloads_the_horizon_instead_of_trusting_missed_writes():
+    async def scenario():
+        now = time.time()
+        rows = [_row(1, now + 20), _row(2, now + 30)]
+        hub = TaskEventHub()
+        scheduler = ReminderScheduler(lambda start, end: list(rows), LogSink(), horizon=60)
+        scheduler.start(hub)
+        await asyncio.sleep(0.02)
+        assert scheduler.stats()["pending"] == 2
+
+        # another worker deleted task 1 and created task 3, only a resync made it here
+        rows[:] = [rows[1], _row(3, now + 40)]
+        hub.publish(1, {"resync": True, "version": 7})
+        await asyncio.sleep(0.05)
+        assert sorted(scheduler._live) == [2, 3]
+        scheduler.stop(hub)
+
+    asyncio.run(scenario())
+
+
+def test_reminders_need_pg_notify_whatever_the_worker_count(monkeypatch):
+    # uvicorn --workers or gunicorn start several workers without telling them
+    from app import main
+    from app.core.config import get_settings
+
+    monkeypatch.setattr(get_settings(), "REMINDERS_ENABLED", True)
+    monkeypatch.setattr(get_settings(), "TASK_EVENTS_PG_NOTIFY", False)
+    started = []
+    monkeypatch.setattr(main.reminder_scheduler, "start", started.append)
+
+    asyncio.run(main.start_reminders())
+    assert started == []
+
+
+def test_scheduler_loads_only_the_horizon_and_extends_it_ahead():
+    windows = []
+
+    def loader(start, end):
+        windows.append((start, end))
+        return []
+
+    async def scenario():
+        scheduler = ReminderScheduler(loader, LogSink(), horizon=0.2)
+        scheduler.start()
+        await asyncio.sleep(0.25)
+        scheduler.stop()
+
+    asyncio.run(scenario())
+    assert 2 <= len(windows) <= 4
+    first_start, first_end = windows[0]
+    assert abs((first_end - first_start).total_seconds() - 0.2) < 0.01
+    # each slice starts where the previous one ended
+    assert all(prev[1] == nxt[0] for prev, nxt in zip(windows, windows[1:]))
+
+
+def test_idle_scheduler_with_many_pending_reminders_does_no_work():
+    async def scenario():
+        now = time.time()
+        rows = [_row(i, now + 3600 + i % 7200) for i in range(100_000)]
+        scheduler = ReminderScheduler(lambda start, end: rows, LogSink(), horizon=4 * 3600)
+        scheduler.start()
+        while scheduler.stats()["pending"] < len(rows):
+            await asyncio.sleep(0.01)
+
+        cpu = time.process_time()
+        await asyncio.sleep(0.5)
+        idle_cpu = time.process_time() - cpu
+        scheduler.stop()
+        assert idle_cpu < 0.1, idle_cpu
+
+    asyncio.run(scenario())
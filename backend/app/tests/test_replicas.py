@@ -0,0 +1,86 @@
+"""Read/write routing tests with a second SQLite database standing in for the replica"""
+import time
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db import session
+from app.db.replicas import ReadYourWritesMiddleware, ReplicaRouter
+from app.db.session import Base
+
+TASKS_URL = "/api/tasks"
+
+
+@pytest.fixture()
+def replica_router(tmp_path, monkeypatch):
+    replica_engine = create_engine(f"sqlite:///{tmp_path / 'replica.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=replica_engine)
+    router = ReplicaRouter([sessionmaker(bind=replica_engine, autoflush=False)], sticky_seconds=60)
+    monkeypatch.setattr(session, "replicas", router)
+    yield router
+    replica_engine.dispose()
+
+
+def _login(client, email):
+    password = "Secret123"
+    client.post(
+        "/api/auth/register",
+        json={"email": email, "first_name": "Ala", "last_name": "Nowak", "password": password},
+    )
+    r = client.post("/api/auth/login", json={"email": email, "password": password})
+    client.headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+def test_reads_go_to_replica_except_right_after_a_write(client, replica_router):
+    _login(client, "replica-user@example.com")
+    # the empty replica answers reads of a user that has not written
+    assert client.get(TASKS_URL).json() == []
+
+    r = client.post(TASKS_URL, json={"title": "Fresh", "day": str(date.today())})
+    assert r.status_code == 201
+    assert replica_router.wrote_recently("replica-user@example.com")
+    # read-your-writes: the primary serves the next read
+    assert [task["title"] for task in client.get(TASKS_URL).json()] == ["Fresh"]
+
+    replica_router.recent_writers.clear()
+    assert client.get(TASKS_URL).json() == []
+    assert replica_router.in_flight == [0]
+
+
+def test_write_window_travels_with_the_client_to_other_workers(client, replica_router):
+    from app.main import app
+
+    client = TestClient(ReadYourWritesMiddleware(app), headers=client.headers)
+    _login(client, "replica-header@example.com")
+    assert "x-primary-until" not in client.get(TASKS_URL).headers
+
+    r = client.post(TASKS_URL, json={"title": "Elsewhere", "day": str(date.today())})
+    until = float(r.headers["x-primary-until"])
+    assert time.time() + 50 < until <= time.time() + 60
+
+    # another worker never saw the write, only the header keeps its reads on the primary
+    replica_router.recent_writers.clear()
+    assert client.get(TASKS_URL).json() == []
+    r = client.get(TASKS_URL, headers={"X-Primary-Until": f"{until:.3f}"})
+    assert [task["title"] for task in r.json()] == ["Elsewhere"]
+    assert client.get(TASKS_URL, headers={"X-Primary-Until": str(time.time() - 1)}).json() == []
+    assert client.get(TASKS_URL, headers={"X-Primary-Until": "soon"}).json() == []
+
+
+def test_replica_selection_strategies():
+    round_robin = ReplicaRouter([object, object])
+    assert [round_robin.acquire(None) for _ in range(3)] == [0, 1, 0]
+
+    least_loaded = ReplicaRouter([object, object], strategy="least_loaded")
+    assert [least_loaded.acquire(None), least_loaded.acquire(None)] == [0, 1]
+    least_loaded.release(0)
+    assert least_loaded.acquire("someone") == 0
+
+    least_loaded.mark_write("someone")
+    assert least_loaded.acquire("someone") is None
+    assert ReplicaRouter([]).acquire(None) is None
+    with pytest.raises(ValueError):
+        ReplicaRouter([object], strategy="random")
@@ -0,0 +1,39 @@
+"""Response cache backend tests"""
+from datetime import date
+
+from app.core.response_cache import MemoryResponseCache, day_scopes
+
+AUG = (("month", "2025-08"), None)
+SEP = (("month", "2025-09"), None)
+
+
+def test_lru_eviction_by_bytes():
+    cache = MemoryResponseCache(max_bytes=10)
+    cache.set(1, 0, AUG, b"12345")
+    cache.set(2, 0, AUG, b"12345")
+    cache.get(1, 0, AUG)
+    cache.set(3, 0, AUG, b"123")
+    assert cache.get(1, 0, AUG) == b"12345"
+    assert cache.get(2, 0, AUG) is None
+    assert cache.stats()["bytes"] <= 10
+    assert cache.stats()["evictions"] == 1
+
+
+def test_precise_invalidation_and_foreign_writes():
+    cache = MemoryResponseCache(max_bytes=1000)
+    cache.set(1, 5, AUG, b"aug")
+    cache.set(1, 5, SEP, b"sep")
+
+    cache.invalidate(1, 6, day_scopes(date(2025, 9, 3)))
+    assert cache.get(1, 6, AUG) == b"aug"
+    assert cache.get(1, 6, SEP) is None
+
+    # version 7 was written by another worker: nothing cached may be trusted anymore
+    assert cache.get(1, 7, AUG) is None
+    cache.invalidate(1, 8, day_scopes(date(2025, 9, 3)))
+    assert cache.get(1, 8, AUG) is None
+
+    # rows read before an invalidation we already processed are not stored
+    cache.set(1, 8, AUG, b"aug8")
+    cache.set(1, 7, SEP, b"stale")
+    assert cache.get(1, 8, SEP) is None
@@ -0,0 +1,95 @@
+"""Recurring task tests"""
+from datetime import date
+from types import SimpleNamespace
+
+from app.api.routes.task_rules import expand_occurrences
+from app.core.recurrence import occurrence_ordinals, weekday_mask
+
+RULES_URL = "/api/task-rules"
+
+
+def _days(freq, start, first, last, interval=1, weekdays=(), end=None):
+    ordinals = occurrence_ordinals(freq, interval, weekday_mask(weekdays), start, end, first, last)
+    return [date.fromordinal(o) for o in ordinals]
+
+
+def test_occurrence_expansion():
+    # every other day, window starting between occurrences
+    assert _days("daily", date(2025, 1, 1), date(2025, 1, 2), date(2025, 1, 7), interval=2) == [
+        date(2025, 1, 3), date(2025, 1, 5), date(2025, 1, 7)
+    ]
+    # Mon/Wed every second week, counted from the week of start_day (Wednesday 2025-01-01)
+    assert _days("weekly", date(2025, 1, 1), date(2025, 1, 1), date(2025, 1, 31), interval=2, weekdays=[0, 2]) == [
+        date(2025, 1, 1), date(2025, 1, 13), date(2025, 1, 15), date(2025, 1, 27), date(2025, 1, 29)
+    ]
+    # monthly on the 31st skips shorter months and stops at end_day
+    assert _days("monthly", date(2025, 1, 31), date(2025, 1, 1), date(2025, 12, 31), end=date(2025, 7, 31)) == [
+        date(2025, 1, 31), date(2025, 3, 31), date(2025, 5, 31), date(2025, 7, 31)
+    ]
+    assert _days("weekly", date(2025, 6, 1), date(2025, 1, 1), date(2025, 5, 31)) == []
+
+
+def test_overrides_of_rules_outside_the_window_are_ignored():
+    def rule(rule_id):
+        return SimpleNamespace(id=rule_id, freq="daily", interval=1, weekdays=0, start_day=date(2025, 1, 1),
+                               end_day=None, title=f"r{rule_id}", description=None, at_time=None, color=None)
+
+    def override(rule_id, day, **values):
+        fields = dict(title=None, description=None, at_time=None, color=None, completed=False, cancelled=False)
+        return SimpleNamespace(rule_id=rule_id, day=day, **{**fields, **values})
+
+    overrides = [
+        override(99, date(2025, 1, 3), cancelled=True),  # unknown rule, would alias rule 1 on Jan 2
+        override(99, date(2025, 1, 4), title="stray"),
+        override(2, date(2025, 1, 2), title="moved", completed=True),
+    ]
+    columns = expand_occurrences([rule(1), rule(2)], overrides, date(2025, 1, 2), date(2025, 1, 3))
+    assert list(zip(columns["rule_id"], columns["day"], columns["title"], columns["completed"])) == [
+        (1, date(2025, 1, 2), "r1", False),
+        (2, date(2025, 1, 2), "moved", True),
+        (1, date(2025, 1, 3), "r1", False),
+        (2, date(2025, 1, 3), "r2", False),
+    ]
+
+
+def _login(client, email="rules@example.com"):
+    password = "Secret123"
+    client.post(
+        "/api/auth/register",
+        json={"email": email, "first_name": "Ala", "last_name": "Nowak", "password": password},
+    )
+    r = client.post("/api/auth/login", json={"email": email, "password": password})
+    client.headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+def test_weekday_rule_occurrences_with_overrides(client):
+    _login(client)
+    r = client.post(RULES_URL, json={
+        "title": "Stand-up", "at_time": "09:00:00", "freq": "weekly", "weekdays": [0, 1, 2, 3, 4], "start_day": "2025-09-01"
+    })
+    assert r.status_code == 201, r.text
+    rule = r.json()
+    assert rule["weekdays"] == [0, 1, 2, 3, 4]
+    client.post(RULES_URL, json={"title": "Czynsz", "freq": "monthly", "start_day": "2025-08-10"})
+
+    september = client.get(f"{RULES_URL}/occurrences", params={"month": "2025-09"}).json()
+    assert len(september) == 22 + 1
+    assert september[0]["day"] == "2025-09-01" and september[0]["title"] == "Stand-up"
+    assert [o["day"] for o in september if o["title"] == "Czynsz"] == ["2025-09-10"]
+
+    r = client.put(f"{RULES_URL}/{rule['id']}/occurrences/2025-09-02", json={"completed": True, "at_time": "10:30:00"})
+    assert r.status_code == 200
+    assert r.json()["completed"] is True and r.json()["at_time"] == "10:30:00"
+    assert client.delete(f"{RULES_URL}/{rule['id']}/occurrences/2025-09-03").status_code == 204
+    # Saturday is not an occurrence
+    assert client.put(f"{RULES_URL}/{rule['id']}/occurrences/2025-09-06", json={"completed": True}).status_code == 404
+
+    week = client.get(f"{RULES_URL}/occurrences", params={"start": "2025-09-01", "end": "2025-09-07"}).json()
+    assert [(o["day"], o["completed"]) for o in week] == [
+        ("2025-09-01", False), ("2025-09-02", True), ("2025-09-04", False), ("2025-09-05", False)
+    ]
+    assert client.get(f"{RULES_URL}/occurrences").status_code == 400
+
+    assert client.delete(f"{RULES_URL}/{rule['id']}").status_code == 204
+    assert [r["title"] for r in client.get(RULES_URL).json()] == ["Czynsz"]
+    assert client.post(RULES_URL, json={"title": "x", "freq": "daily", "weekdays": [1], "start_day": "2025-01-01"}).status_code == 422
@@ -1,5 +1,12 @@
 """Task tests"""
+import json
 from datetime import date
+from typing import List, get_type_hints
+
+import pytest
+from starlette.websockets import WebSocketDisconnect
+
+from app.core.pubsub import PgNotifyBridge, TaskEventHub
 
 TASKS_URL = "/api/tasks"
 
@@ -94,4 +101,395 @@ def test_delete_task(client):
     task_id = r.json()["id"]
 
     r = client.delete(f"{TASKS_URL}/{task_id}")
-    assert r.status_code == 204
\ No newline at end of file
+    assert r.status_code == 204
+
+def test_keyset_pagination(client):
+    _register_and_login(client, email="taskpages@example.com")
+    day = str(date.today())
+    for i, at_time in enumerate(["09:00:00", None, "08:00:00", "09:00:00", None]):
+        body = {"title": f"p{i}", "day": day}
+        if at_time:
+            body["at_time"] = at_time
+        assert client.post(TASKS_URL, json=body).status_code == 201
+    expected = [t["id"] for t in client.get(TASKS_URL, params={"day": day}).json()]
+
+    seen, cursor = [], None
+    while True:
+        params = {"day": day, "limit": 2, **({"cursor": cursor} if cursor else {})}
+        r = client.get(TASKS_URL, params=params)
+        assert r.status_code == 200
+        assert len(r.json()) <= 2
+        seen += [t["id"] for t in r.json()]
+        cursor = r.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert seen == expected
+    assert len(seen) == 5
+
+    assert client.get(TASKS_URL, params={"cursor": "garbage"}).status_code == 400
+
+
+def test_ndjson_stream(client):
+    _register_and_login(client, email="taskstream@example.com")
+    day = str(date.today())
+    for i in range(3):
+        client.post(TASKS_URL, json={"title": f"s{i}", "day": day})
+    r = client.get(TASKS_URL, params={"day": day}, headers={"Accept": "application/x-ndjson"})
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in r.text.splitlines()]
+    assert [t["title"] for t in rows] == ["s0", "s1", "s2"]
+
+
+def test_summary_counts_per_day(client):
+    _register_and_login(client, email="tasksummary@example.com")
+    client.post(TASKS_URL, json={"title": "a", "day": "2025-03-01", "completed": True})
+    client.post(TASKS_URL, json={"title": "b", "day": "2025-03-01"})
+    client.post(TASKS_URL, json={"title": "c", "day": "2025-03-05"})
+    client.post(TASKS_URL, json={"title": "outside", "day": "2025-04-01"})
+
+    r = client.get(f"{TASKS_URL}/summary", params={"start": "2025-03-01", "end": "2025-03-31"})
+    assert r.status_code == 200
+    assert r.json() == [
+        {"day": "2025-03-01", "total": 2, "completed": 1},
+        {"day": "2025-03-05", "total": 1, "completed": 0},
+    ]
+
+    r = client.get(f"{TASKS_URL}/summary", params={"start": "2025-03-31", "end": "2025-03-01"})
+    assert r.status_code == 400
+
+
+def test_bulk_operations(client):
+    _register_and_login(client, email="taskbulkother@example.com")
+    foreign_id = client.post(TASKS_URL, json={"title": "not yours", "day": "2025-05-01"}).json()["id"]
+
+    _register_and_login(client, email="taskbulk@example.com")
+    keep = client.post(TASKS_URL, json={"title": "keep", "day": "2025-05-01"}).json()["id"]
+    drop = client.post(TASKS_URL, json={"title": "drop", "day": "2025-05-02"}).json()["id"]
+
+    r = client.post(
+        f"{TASKS_URL}/bulk",
+        json={
+            "create": [{"title": "n1", "day": "2025-05-03"}, {"title": "n2", "day": "2025-05-04", "at_time": "07:30:00"}],
+            "update": [{"id": keep, "completed": True, "title": "kept"}, {"id": foreign_id, "title": "hijack"}],
+            "delete": [drop, foreign_id],
+        },
+    )
+    assert r.status_code == 200, r.text
+    results = r.json()["results"]
+    assert [(x["op"], x["status"]) for x in results] == [
+        ("create", 201), ("create", 201), ("update", 200), ("update", 404), ("delete", 204), ("delete", 404),
+    ]
+    assert results[1]["task"]["at_time"] == "07:30:00"
+    assert results[2]["task"]["title"] == "kept" and results[2]["task"]["completed"] is True
+
+    titles = sorted(t["title"] for t in client.get(TASKS_URL, params={"month": "2025-05"}).json())
+    assert titles == ["kept", "n1", "n2"]
+
+    _register_and_login(client, email="taskbulkother@example.com")
+    assert client.get(f"{TASKS_URL}/{foreign_id}").json()["title"] == "not yours"
+
+    # explicit nulls for NOT NULL columns are rejected up front instead of failing the batch
+    for field in ("title", "day", "completed"):
+        r = client.post(f"{TASKS_URL}/bulk", json={"update": [{"id": foreign_id, field: None}]})
+        assert r.status_code == 422, r.text
+    assert client.put(f"{TASKS_URL}/{foreign_id}", json={"title": None}).status_code == 422
+    assert client.put(f"{TASKS_URL}/{foreign_id}", json={"at_time": None}).status_code == 200
+
+
+def test_etag_conditional_requests(client):
+    _register_and_login(client, email="tasketag@example.com")
+    task_id = client.post(TASKS_URL, json={"title": "e", "day": "2025-06-01"}).json()["id"]
+
+    r = client.get(TASKS_URL, params={"month": "2025-06"})
+    etag = r.headers["ETag"]
+    r = client.get(TASKS_URL, params={"month": "2025-06"}, headers={"If-None-Match": etag})
+    assert r.status_code == 304
+    assert r.content == b""
+
+    other = client.get(TASKS_URL, params={"month": "2025-07"}).headers["ETag"]
+    assert other != etag
+
+    task_etag = client.get(f"{TASKS_URL}/{task_id}").headers["ETag"]
+    assert client.get(f"{TASKS_URL}/{task_id}", headers={"If-None-Match": task_etag}).status_code == 304
+
+    client.put(f"{TASKS_URL}/{task_id}", json={"completed": True})
+    r = client.get(TASKS_URL, params={"month": "2025-06"}, headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.headers["ETag"] != etag
+    assert client.get(f"{TASKS_URL}/{task_id}", headers={"If-None-Match": task_etag}).status_code == 200
+
+
+def test_if_none_match_any_needs_an_existing_owned_task(client):
+    _register_and_login(client, email="tasketagother@example.com")
+    foreign_id = client.post(TASKS_URL, json={"title": "theirs", "day": "2025-06-01"}).json()["id"]
+
+    _register_and_login(client, email="tasketagany@example.com")
+    task_id = client.post(TASKS_URL, json={"title": "mine", "day": "2025-06-01"}).json()["id"]
+
+    any_match = {"If-None-Match": "*"}
+    assert client.get(f"{TASKS_URL}/{task_id}", headers=any_match).status_code == 304
+    assert client.get(f"{TASKS_URL}/{foreign_id}", headers=any_match).status_code == 404
+    assert client.get(f"{TASKS_URL}/999999", headers=any_match).status_code == 404
+
+
+def test_month_view_response_cache(client):
+    from app.core.response_cache import response_cache
+
+    _register_and_login(client, email="taskcache@example.com")
+    task_id = client.post(TASKS_URL, json={"title": "c1", "day": "2025-08-10", "at_time": "10:00:00"}).json()["id"]
+
+    first = client.get(TASKS_URL, params={"month": "2025-08"})
+    hits = response_cache.stats()["hits"]
+    second = client.get(TASKS_URL, params={"month": "2025-08"})
+    assert response_cache.stats()["hits"] == hits + 1
+    assert second.content == first.content
+    # byte-identical to the response_model serialization used by the uncached path
+    assert client.get(TASKS_URL, params={"month": "2025-08", "limit": 100}).content == first.content
+
+    # a write in another month keeps this entry
+    client.post(TASKS_URL, json={"title": "other", "day": "2025-09-01"})
+    client.get(TASKS_URL, params={"month": "2025-08"})
+    assert response_cache.stats()["hits"] == hits + 2
+
+    client.put(f"{TASKS_URL}/{task_id}", json={"title": "c1 changed"})
+    r = client.get(TASKS_URL, params={"month": "2025-08"})
+    assert response_cache.stats()["hits"] == hits + 2
+    assert r.json()[0]["title"] == "c1 changed"
+
+    client.put(f"{TASKS_URL}/{task_id}", json={"day": "2025-09-02"})
+    assert client.get(TASKS_URL, params={"month": "2025-08"}).json() == []
+    assert len(client.get(TASKS_URL, params={"month": "2025-09"}).json()) == 2
+
+
+def test_task_events_websocket(client):
+    _register_and_login(client, email="pushuser@example.com")
+    token = client.headers["Authorization"].split()[1]
+
+    with client.websocket_connect(f"/ws/tasks?token={token}") as ws:
+        version = ws.receive_json()["version"]
+
+        task = client.post(TASKS_URL, json={"title": "Push", "day": "2025-10-01"}).json()
+        message = ws.receive_json()
+        assert message["version"] == version + 1
+        assert message["changes"] == [{"op": "upsert", "task": task}]
+
+        client.put(f"{TASKS_URL}/{task['id']}", json={"completed": True})
+        message = ws.receive_json()
+        assert message["version"] == version + 2
+        assert message["changes"][0]["task"]["completed"] is True
+
+        client.post(f"{TASKS_URL}/bulk", json={"create": [{"title": "B", "day": "2025-10-02"}], "delete": [task["id"]]})
+        ops = [change["op"] for change in ws.receive_json()["changes"]]
+        assert ops == ["upsert", "delete"]
+
+        client.delete(f"{TASKS_URL}/{task['id']}")  # already gone: 404, nothing published
+        other = client.post(TASKS_URL, json={"title": "Last", "day": "2025-10-03"}).json()
+        message = ws.receive_json()
+        assert message["version"] == version + 4
+        assert message["changes"][0]["task"]["id"] == other["id"]
+
+
+def test_pg_notify_payload_over_limit_becomes_resync():
+    bridge = PgNotifyBridge(TaskEventHub())
+    small = {"version": 3, "changes": [{"op": "delete", "id": 1}]}
+    assert json.loads(bridge.encode(7, small)) == {"user_id": 7, "message": small}
+
+    large = {"version": 4, "changes": [{"op": "delete", "id": i} for i in range(2000)]}
+    payload = bridge.encode(7, large)
+    assert len(payload.encode()) <= PgNotifyBridge.MAX_PAYLOAD_BYTES
+    assert json.loads(payload) == {"user_id": 7, "message": {"resync": True, "version": 4}}
+
+
+def test_pg_notify_listener_resyncs_everyone_after_reconnecting(monkeypatch):
+    import asyncio
+
+    import psycopg
+
+    hub = TaskEventHub()
+    bridge = PgNotifyBridge(hub)
+    monkeypatch.setattr(PgNotifyBridge, "RECONNECT_DELAY", 0.0)
+    change = {"version": 1, "changes": [{"op": "delete", "id": 5}]}
+    attempts = []
+
+    class Connection:
+        def __init__(self, notifications, drop):
+            self.notifications, self.drop = notifications, drop
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def execute(self, sql):
+            pass
+
+        async def notifies(self):
+            for payload in self.notifications:
+                yield type("Notify", (), {"payload": payload})()
+            if self.drop:
+                raise psycopg.OperationalError("server closed the connection")
+            await asyncio.Event().wait()
+
+    async def connect(conninfo, autocommit):
+        attempts.append(conninfo)
+        if len(attempts) == 1:
+            return Connection([bridge.encode(7, change)], drop=True)
+        if len(attempts) == 2:
+            raise psycopg.OperationalError("connection refused")
+        return Connection([], drop=False)
+
+    monkeypatch.setattr(psycopg.AsyncConnection, "connect", connect)
+
+    async def scenario():
+        observed = []
+        hub.observe(lambda user_id, message: observed.append((user_id, message)))
+        queues = [hub.subscribe(7), hub.subscribe(8)]
+        bridge.start()
+        while len(attempts) < 3:
+            await asyncio.sleep(0.001)
+        await asyncio.sleep(0.01)
+        bridge._listener.cancel()
+
+        assert observed == [(7, change), (None, {"resync": True})]
+        assert [queues[0].get_nowait() for _ in range(2)] == [change, {"resync": True}]
+        assert queues[1].get_nowait() == {"resync": True} and queues[1].empty()
+
+    asyncio.run(scenario())
+
+
+def test_task_events_websocket_rejects_invalid_token(client):
+    with pytest.raises(WebSocketDisconnect):
+        with client.websocket_connect("/ws/tasks?token=invalid") as ws:
+            ws.receive_json()
+
+
+def test_list_serialization_matches_task_out(client):
+    _register_and_login(client, email="serial@example.com")
+    client.post(TASKS_URL, json={"title": "Pełne", "description": "Opis", "day": "2025-07-02",
+                                 "at_time": "08:30:00", "color": "#dc3545", "completed": True})
+    client.post(TASKS_URL, json={"title": "Puste", "day": "2025-07-01"})
+
+    month = client.get(TASKS_URL, params={"month": "2025-07"}).json()
+    page = client.get(TASKS_URL, params={"limit": 10}).json()
+    singles = [client.get(f"{TASKS_URL}/{task['id']}").json() for task in month]
+
+    assert month == page == singles
+    assert [list(task) for task in month] == [list(task) for task in singles]
+    assert month[0]["at_time"] is None and month[1]["at_time"] == "08:30:00"
+
+
+def test_task_row_layouts_follow_task_out_fields():
+    # the row fast paths zip values with these names by position, a new TaskOut field must land in all of them
+    from app.api.routes.tasks import TASK_OUT_COLUMNS
+    from app.schemas.task import TaskChanges, TaskColumns, TaskOut, TaskRow
+
+    fields = list(TaskOut.model_fields)
+    assert list(TaskRow.__annotations__) == fields
+    assert list(TaskColumns.__annotations__) == fields
+    assert [column.key for column in TASK_OUT_COLUMNS] == fields
+    assert get_type_hints(TaskChanges)["upserted"] == List[TaskRow]
+
+
+def test_compact_list_formats_and_compression(client):
+    import msgpack
+
+    _register_and_login(client, email="compact@example.com")
+    for i in range(40):
+        client.post(TASKS_URL, json={"title": f"Zadanie {i}", "description": "x" * 30, "day": f"2025-08-{i % 28 + 1:02d}"})
+    rows = client.get(TASKS_URL, params={"month": "2025-08"}).json()
+    expected = {name: [task[name] for task in rows] for name in rows[0]}
+
+    columns = client.get(TASKS_URL, params={"month": "2025-08"}, headers={"Accept": "application/vnd.tasks.columns+json"})
+    assert columns.headers["content-type"] == "application/vnd.tasks.columns+json"
+    assert columns.json() == expected
+    assert len(columns.content) < len(json.dumps(rows))
+    assert columns.headers["etag"] != client.get(TASKS_URL, params={"month": "2025-08"}).headers["etag"]
+
+    packed = client.get(TASKS_URL, params={"month": "2025-08", "limit": 1000}, headers={"Accept": "application/msgpack"})
+    assert packed.headers["content-type"] == "application/msgpack"
+    assert msgpack.unpackb(packed.content) == expected
+
+    empty = client.get(TASKS_URL, params={"day": "2030-01-01"}, headers={"Accept": "application/vnd.tasks.columns+json"})
+    assert empty.json() == {name: [] for name in expected}
+
+    gzipped = client.get(TASKS_URL, params={"month": "2025-08"}, headers={"Accept-Encoding": "gzip"})
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert gzipped.json() == rows
+
+
+def test_search_tasks(client, db_session):
+    from sqlalchemy import text
+
+    from app.db.models import User
+    from app.db.search import FTS_TABLE, user_fts5_query
+
+    _register_and_login(client, email="search-other@example.com")
+    foreign = client.post(TASKS_URL, json={"title": "Zakupy cudze", "day": "2025-09-01"}).json()
+    _register_and_login(client, email="search@example.com")
+    in_title = client.post(TASKS_URL, json={"title": "Zakupy: mleko", "day": "2025-09-01"}).json()
+    in_description = client.post(
+        TASKS_URL, json={"title": "Sobota", "description": "zakupy na targu, mleko", "day": "2025-09-06"}
+    ).json()
+    client.post(TASKS_URL, json={"title": "Dentysta", "day": "2025-09-02"})
+
+    r = client.get(f"{TASKS_URL}/search", params={"q": "ZAK mle"})
+    assert r.status_code == 200
+    assert [t["id"] for t in r.json()] == [in_title["id"], in_description["id"]]
+    assert client.get(f"{TASKS_URL}/search", params={"q": "zak"}, headers={"If-None-Match": r.headers["etag"]}).status_code == 200
+    assert client.get(f"{TASKS_URL}/search", params={"q": "ZAK mle"}, headers={"If-None-Match": r.headers["etag"]}).status_code == 304
+    assert client.get(f"{TASKS_URL}/search", params={"q": "zak", "completed": True}).json() == []
+    assert client.get(f"{TASKS_URL}/search", params={"q": '"*" OR -'}).json() == []
+
+    # the index itself is scoped to the owner, and the owner id is not searchable text
+    other_id = db_session.query(User.id).filter(User.email == "search-other@example.com").scalar()
+    fts_match = text(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :query")
+    assert db_session.execute(fts_match, {"query": user_fts5_query(other_id, ["zak"])}).scalars().all() == [foreign["id"]]
+    own_id = db_session.query(User.id).filter(User.email == "search@example.com").scalar()
+    assert client.get(f"{TASKS_URL}/search", params={"q": str(own_id)}).json() == []
+
+    client.put(f"{TASKS_URL}/{in_title['id']}", json={"title": "Apteka"})
+    client.delete(f"{TASKS_URL}/{in_description['id']}")
+    assert client.get(f"{TASKS_URL}/search", params={"q": "zakupy"}).json() == []
+    assert [t["title"] for t in client.get(f"{TASKS_URL}/search", params={"q": "apt"}).json()] == ["Apteka"]
+
+
+def test_delta_sync_changes(client, db_session):
+    from datetime import datetime, timedelta, timezone
+
+    from app.db.tombstones import compact_tombstones
+
+    _register_and_login(client, email="sync@example.com")
+    kept = client.post(TASKS_URL, json={"title": "Zostaje", "day": "2025-10-01"}).json()
+    removed = client.post(TASKS_URL, json={"title": "Usunięte", "day": "2025-10-01"}).json()
+
+    full = client.get(f"{TASKS_URL}/changes")
+    assert full.status_code == 200
+    assert [t["id"] for t in full.json()["upserted"]] == [kept["id"], removed["id"]]
+    assert full.json()["deleted"] == []
+    cursor = full.json()["cursor"]
+
+    nothing = client.get(f"{TASKS_URL}/changes", params={"since": cursor})
+    assert nothing.json() == {"cursor": cursor, "upserted": [], "deleted": []}
+    assert client.get(
+        f"{TASKS_URL}/changes", params={"since": cursor}, headers={"If-None-Match": nothing.headers["etag"]}
+    ).status_code == 304
+
+    client.put(f"{TASKS_URL}/{kept['id']}", json={"completed": True})
+    client.delete(f"{TASKS_URL}/{removed['id']}")
+    r = client.post(f"{TASKS_URL}/bulk", json={"create": [{"title": "Nowe", "day": "2025-10-02"}, {"title": "Chwilowe", "day": "2025-10-02"}]})
+    new, short_lived = (item["id"] for item in r.json()["results"])
+    client.post(f"{TASKS_URL}/bulk", json={"delete": [short_lived, short_lived]})
+
+    delta = client.get(f"{TASKS_URL}/changes", params={"since": cursor}).json()
+    assert [(t["id"], t["completed"]) for t in delta["upserted"]] == [(kept["id"], True), (new, False)]
+    assert delta["deleted"] == [removed["id"], short_lived]
+    assert int(delta["cursor"]) > int(cursor)
+    assert client.get(f"{TASKS_URL}/changes", params={"since": "abc"}).status_code == 400
+    assert client.get(f"{TASKS_URL}/changes", params={"since": int(delta["cursor"]) + 1}).status_code == 410
+
+    # tombstones past retention are compacted, cursors from before them must resync
+    assert compact_tombstones(db_session.get_bind(), 30, now=datetime.now(timezone.utc) + timedelta(days=31)) >= 2
+    assert client.get(f"{TASKS_URL}/changes", params={"since": cursor}).status_code == 410
+    assert client.get(f"{TASKS_URL}/changes", params={"since": delta["cursor"]}).json()["upserted"] == []
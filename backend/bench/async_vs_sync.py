@@ -0,0 +1,74 @@
+"""Throughput benchmark: sync (threadpool) vs async (AsyncSession) routes under high concurrency
+
+Start two servers against the same PostgreSQL database, one per mode:
+
+    DB_ASYNC=false uvicorn app.main:app --port 8001
+    DB_ASYNC=true  uvicorn app.main:app --port 8002
+
+and run:
+
+    python -m bench.async_vs_sync --sync-url http://localhost:8001 --async-url http://localhost:8002 -c 500
+
+Every client repeatedly requests the month view of a seeded user and the script prints
+requests/sec and latency percentiles for both servers.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+from datetime import date
+
+import httpx
+
+from bench.common import login, register_user, seed_month, summarize
+
+
+async def run_one(base_url: str, concurrency: int, duration: float, tasks: int) -> dict[str, float]:
+    """Hammer `GET /api/tasks?month=` with `concurrency` clients for `duration` seconds"""
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+        headers = await login(client, await register_user(client))
+        await seed_month(client, headers, tasks)
+        params = {"month": date.today().strftime("%Y-%m")}
+        latencies: list[float] = []
+        errors = 0
+        deadline = time.perf_counter() + duration
+
+        async def worker() -> None:
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    r = await client.get("/api/tasks", params=params, headers=headers)
+                    if r.status_code != 200:
+                        errors += 1
+                        continue
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return summarize(latencies, time.perf_counter() - started, errors)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sync-url", default="http://localhost:8001")
+    parser.add_argument("--async-url", default="http://localhost:8002")
+    parser.add_argument("-c", "--concurrency", type=int, default=500)
+    parser.add_argument("-d", "--duration", type=float, default=20.0)
+    parser.add_argument("--tasks", type=int, default=60, help="tasks seeded for the benchmark user")
+    args = parser.parse_args()
+
+    results = {}
+    for mode, url in (("sync", args.sync_url), ("async", args.async_url)):
+        results[mode] = await run_one(url, args.concurrency, args.duration, args.tasks)
+    print(json.dumps({"concurrency": args.concurrency, "duration_s": args.duration, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,60 @@
+"""Helpers shared by the benchmark scripts"""
+from __future__ import annotations
+
+import statistics
+import uuid
+from datetime import date, timedelta
+from typing import Dict, List
+
+import httpx
+
+PASSWORD = "Bench1234"
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of `values` (0.0 for an empty list)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def summarize(latencies: List[float], elapsed: float, errors: int = 0) -> Dict[str, float]:
+    """Throughput and latency percentiles (ms) of one measured run"""
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 2) if latencies else 0.0,
+    }
+
+
+async def register_user(client: httpx.AsyncClient, email: str | None = None) -> str:
+    """Register a fresh benchmark user and return its email"""
+    email = email or f"bench-{uuid.uuid4().hex[:12]}@example.com"
+    r = await client.post(
+        "/api/auth/register",
+        json={"email": email, "first_name": "Bench", "last_name": "User", "password": PASSWORD},
+    )
+    r.raise_for_status()
+    return email
+
+
+async def login(client: httpx.AsyncClient, email: str) -> Dict[str, str]:
+    """Log in and return the Authorization header"""
+    r = await client.post("/api/auth/login", json={"email": email, "password": PASSWORD})
+    r.raise_for_status()
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+async def seed_month(client: httpx.AsyncClient, headers: Dict[str, str], tasks: int) -> None:
+    """Create `tasks` tasks spread over the current month through the API"""
+    first = date.today().replace(day=1)
+    for i in range(tasks):
+        day = first + timedelta(days=i % 28)
+        r = await client.post("/api/tasks", json={"title": f"task {i}", "day": str(day)}, headers=headers)
+        r.raise_for_status()
@@ -0,0 +1,63 @@
+"""Compare two `bench.workload` reports endpoint by endpoint
+
+    python -m bench.compare before.json after.json [--json]
+
+Prints throughput and latency percentiles of both runs with the relative change; `--json`
+emits the same comparison as JSON for CI.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+from typing import Dict, Optional
+
+METRICS = ("rps", "p50_ms", "p95_ms", "p99_ms", "errors")
+
+
+def _change(before: Optional[float], after: Optional[float]) -> Optional[float]:
+    if before is None or after is None or before == 0:
+        return None
+    return round((after - before) / before * 100, 1)
+
+
+def compare(before: dict, after: dict) -> Dict[str, Dict[str, dict]]:
+    """{endpoint: {metric: {"before", "after", "change_pct"}}} for endpoints present in either report"""
+    rows = {"total": (before.get("total", {}), after.get("total", {}))}
+    for endpoint in sorted(set(before["endpoints"]) | set(after["endpoints"])):
+        rows[endpoint] = (before["endpoints"].get(endpoint, {}), after["endpoints"].get(endpoint, {}))
+    return {
+        endpoint: {
+            metric: {"before": old.get(metric), "after": new.get(metric), "change_pct": _change(old.get(metric), new.get(metric))}
+            for metric in METRICS
+        }
+        for endpoint, (old, new) in rows.items()
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    with open(args.before, encoding="utf-8") as fh:
+        before = json.load(fh)
+    with open(args.after, encoding="utf-8") as fh:
+        after = json.load(fh)
+    result = compare(before, after)
+
+    if args.json:
+        print(json.dumps({"before": before["meta"], "after": after["meta"], "endpoints": result}, indent=2))
+        return
+
+    print(f"before: {before['meta'].get('commit')}  after: {after['meta'].get('commit')}")
+    for endpoint, metrics in result.items():
+        print(endpoint)
+        for metric, values in metrics.items():
+            change = "" if values["change_pct"] is None else f"{values['change_pct']:+.1f}%"
+            print(f"  {metric:<8} {values['before']!s:>10} -> {values['after']!s:>10}  {change}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Mixed-workload benchmark: `/api/tasks` latency with and without a concurrent login storm
+
+Run against a started server:
+
+    uvicorn app.main:app --port 8000
+    python -m bench.login_storm --url http://localhost:8000 --readers 20 --logins 200
+
+The readers phase measures month-view latency alone, the storm phase repeats it while
+`--logins` clients hammer `/api/auth/login`. With the bounded hashing pool the reader
+percentiles stay flat and surplus logins are rejected with 503 instead of queueing.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+from datetime import date
+
+import httpx
+
+from bench.common import PASSWORD, login, register_user, seed_month, summarize
+
+
+async def _readers(client: httpx.AsyncClient, headers: dict[str, str], count: int, duration: float) -> dict:
+    params = {"month": date.today().strftime("%Y-%m")}
+    latencies: list[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def reader() -> None:
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            r = await client.get("/api/tasks", params=params, headers=headers)
+            if r.status_code == 200:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(reader() for _ in range(count)))
+    return summarize(latencies, time.perf_counter() - started, errors)
+
+
+async def _storm(client: httpx.AsyncClient, email: str, count: int, stop: asyncio.Event) -> dict:
+    statuses: dict[str, int] = {}
+
+    async def attacker() -> None:
+        while not stop.is_set():
+            r = await client.post("/api/auth/login", json={"email": email, "password": PASSWORD})
+            statuses[str(r.status_code)] = statuses.get(str(r.status_code), 0) + 1
+
+    await asyncio.gather(*(attacker() for _ in range(count)))
+    return statuses
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--readers", type=int, default=20)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("-d", "--duration", type=float, default=15.0)
+    args = parser.parse_args()
+
+    limits = httpx.Limits(max_connections=args.readers + args.logins)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=60.0) as client:
+        email = await register_user(client)
+        headers = await login(client, email)
+        await seed_month(client, headers, 60)
+
+        baseline = await _readers(client, headers, args.readers, args.duration)
+
+        stop = asyncio.Event()
+        storm = asyncio.create_task(_storm(client, email, args.logins, stop))
+        under_storm = await _readers(client, headers, args.readers, args.duration)
+        stop.set()
+        login_statuses = await storm
+
+    print(json.dumps({"tasks_baseline": baseline, "tasks_during_login_storm": under_storm,
+                      "login_statuses": login_statuses}, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,96 @@
+"""Size and encoding time of task list payloads per wire format, raw and gzipped
+
+    python -m bench.payloads --tasks-per-day 20 --repeat 20
+
+Seeds one user with tasks on every day of a year in an in-memory SQLite database, then encodes
+a month view and the whole year as JSON, columnar JSON and MessagePack, each also compressed
+with gzip at the level the app uses. Times are medians per response.
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import statistics
+import time
+from datetime import date, time as dtime, timedelta
+from typing import Callable, Dict, List
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+from app.api.routes.tasks import (
+    COLUMNS_MEDIA_TYPE,
+    JSON_MEDIA_TYPE,
+    MSGPACK_MEDIA_TYPE,
+    encode_tasks,
+    list_tasks_stmt,
+    task_rows_stmt,
+)
+from app.core.config import get_settings
+from app.db.models import Task, User
+from app.db.session import Base
+
+FORMATS = {"json": JSON_MEDIA_TYPE, "columns": COLUMNS_MEDIA_TYPE, "msgpack": MSGPACK_MEDIA_TYPE}
+YEAR = 2025
+
+
+def _median_ms(fn: Callable[[], object], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return round(statistics.median(samples) * 1000, 3)
+
+
+def measure(rows: list, repeat: int, level: int) -> Dict[str, dict]:
+    results = {}
+    for name, media_type in FORMATS.items():
+        body = encode_tasks(rows, media_type)
+        compressed = gzip.compress(body, compresslevel=level)
+        results[name] = {
+            "bytes": len(body),
+            "gzip_bytes": len(compressed),
+            "encode_ms": _median_ms(lambda: encode_tasks(rows, media_type), repeat),
+            "encode_gzip_ms": _median_ms(lambda: gzip.compress(encode_tasks(rows, media_type), compresslevel=level), repeat),
+        }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks-per-day", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    level = get_settings().GZIP_COMPRESS_LEVEL
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    days = [date(YEAR, 1, 1) + timedelta(days=i) for i in range(365)]
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{"id": 1, "email": "p@example.com", "first_name": "P", "last_name": "P", "password_hash": "x"}])
+        conn.execute(
+            insert(Task),
+            [
+                {"user_id": 1, "title": f"Task {day:%d.%m} #{i}", "description": "Notatka do zadania" if i % 2 else None,
+                 "day": day, "at_time": dtime(8 + i % 12, 30) if i % 3 else None, "color": "#6f42c1" if i % 4 else None,
+                 "completed": bool(i % 5)}
+                for day in days
+                for i in range(args.tasks_per_day)
+            ],
+        )
+
+    report: Dict[str, object] = {"tasks_per_day": args.tasks_per_day, "repeat": args.repeat, "gzip_level": level}
+    with Session(engine) as db:
+        views: Dict[str, List] = {
+            "month": db.execute(task_rows_stmt(list_tasks_stmt(1, month=f"{YEAR}-06"))).all(),
+            "year": db.execute(task_rows_stmt(list_tasks_stmt(1))).all(),
+        }
+        for view, rows in views.items():
+            report[view] = {"tasks": len(rows), **measure(rows, args.repeat, level)}
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
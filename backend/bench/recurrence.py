@@ -0,0 +1,121 @@
+"""Year view of recurring tasks: rules expanded per request vs one materialized `Task` row per occurrence
+
+    python -m bench.recurrence --rules 300 --repeat 20
+
+Seeds one user with a mix of weekday, weekly, every-n-days and monthly rules (plus sparse
+completions) in an in-memory SQLite database, materializes the same occurrences as tasks for a
+second user and times both year views: query + encoding (row JSON for both, plus the columnar
+layout for rules), and the expansion alone.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import statistics
+import time
+from datetime import date, time as dtime
+from typing import Callable, Dict, List
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+from app.api.routes.task_rules import (
+    encode_occurrences,
+    expand_occurrences,
+    overrides_in_window_stmt,
+    rules_in_window_stmt,
+)
+from app.api.routes.tasks import COLUMNS_MEDIA_TYPE, JSON_MEDIA_TYPE, encode_task_rows, list_tasks_stmt, task_rows_stmt
+from app.core.recurrence import weekday_mask
+from app.db.models import Task, TaskRule, TaskRuleOverride, User
+from app.db.session import Base
+
+FIRST, LAST = date(2025, 1, 1), date(2025, 12, 31)
+RULE_USER, TASK_USER = 1, 2
+
+
+def _rule(i: int, rnd: random.Random) -> dict:
+    kind = i % 10
+    rule = {"user_id": RULE_USER, "title": f"Rule {i}", "description": "Powtarzalne" if i % 2 else None,
+            "at_time": dtime(7 + i % 12, 0) if i % 3 else None, "color": "#0d6efd" if i % 4 else None,
+            "start_day": date(2025, 1, 1 + i % 28), "end_day": None, "interval": 1, "weekdays": 0}
+    if kind < 4:
+        rule.update(freq="weekly", weekdays=weekday_mask(range(5)))
+    elif kind < 7:
+        rule.update(freq="weekly", weekdays=weekday_mask(rnd.sample(range(7), 2)))
+    elif kind < 9:
+        rule.update(freq="daily", interval=rnd.randint(2, 7))
+    else:
+        rule.update(freq="monthly")
+    return rule
+
+
+def _median_ms(fn: Callable[[], object], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return round(statistics.median(samples) * 1000, 2)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rules", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    rnd = random.Random(1)
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"id": uid, "email": f"r{uid}@example.com", "first_name": "R", "last_name": "R", "password_hash": "x"}
+            for uid in (RULE_USER, TASK_USER)
+        ])
+        conn.execute(insert(TaskRule), [_rule(i, rnd) for i in range(args.rules)])
+
+    with Session(engine) as db:
+        rules = db.execute(rules_in_window_stmt(RULE_USER, FIRST, LAST)).all()
+        columns = expand_occurrences(rules, [], FIRST, LAST)
+        occurrences = [dict(zip(columns, values)) for values in zip(*columns.values())]
+        # sparse per-occurrence state: every 20th occurrence completed
+        done = [{"rule_id": o["rule_id"], "day": o["day"], "completed": True} for o in occurrences[::20]]
+        db.execute(insert(TaskRuleOverride), done)
+        db.execute(insert(Task), [
+            {"user_id": TASK_USER, "title": o["title"], "description": o["description"], "day": o["day"],
+             "at_time": o["at_time"], "color": o["color"], "completed": False}
+            for o in occurrences
+        ])
+        db.commit()
+
+        def lazy(media_type: str = JSON_MEDIA_TYPE) -> bytes:
+            rows = db.execute(rules_in_window_stmt(RULE_USER, FIRST, LAST)).all()
+            overrides = db.scalars(overrides_in_window_stmt(RULE_USER, FIRST, LAST)).all()
+            return encode_occurrences(expand_occurrences(rows, overrides, FIRST, LAST), media_type)
+
+        def materialized() -> bytes:
+            return encode_task_rows(db.execute(task_rows_stmt(list_tasks_stmt(TASK_USER))).all())
+
+        overrides = db.scalars(overrides_in_window_stmt(RULE_USER, FIRST, LAST)).all()
+        results: Dict[str, object] = {
+            "rules": args.rules,
+            "occurrences": len(occurrences),
+            "stored_rows": {"rules": args.rules + len(done), "materialized": len(occurrences)},
+            "year_view_ms": {
+                "lazy_json": _median_ms(lazy, args.repeat),
+                "lazy_columns": _median_ms(lambda: lazy(COLUMNS_MEDIA_TYPE), args.repeat),
+                "materialized_json": _median_ms(materialized, args.repeat),
+            },
+            "expansion_only_ms": _median_ms(lambda: expand_occurrences(rules, overrides, FIRST, LAST), args.repeat),
+        }
+        month: List = db.execute(rules_in_window_stmt(RULE_USER, date(2025, 6, 1), date(2025, 6, 30))).all()
+        results["month_expansion_ms"] = _median_ms(
+            lambda: expand_occurrences(month, [], date(2025, 6, 1), date(2025, 6, 30)), args.repeat
+        )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Reminder scheduler with many pending reminders: horizon load, memory, idle CPU and update cost
+
+    python -m bench.reminders --pending 100000 --idle 5
+
+Feeds the scheduler a horizon of generated task rows (no database), then measures the slice
+load, the memory held by the heap, process CPU time while idling with everything pending and the
+time to apply task moves arriving as `task_events` messages.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+from collections import namedtuple
+from datetime import datetime, timezone
+
+from app.core.reminders import LogSink, ReminderScheduler
+
+Row = namedtuple("Row", "id user_id title day at_time")
+HORIZON = 6 * 3600.0
+
+
+def _rows(count: int, now: float) -> list:
+    rows = []
+    for i in range(count):
+        local = datetime.fromtimestamp(now + 600 + i * (HORIZON - 1200) / count, tz=timezone.utc)
+        rows.append(Row(i, i % 5000, f"Task {i}", local.date(), local.time().replace(microsecond=0)))
+    return rows
+
+
+async def _loaded(rows: list) -> ReminderScheduler:
+    scheduler = ReminderScheduler(lambda start, end: rows, LogSink(), horizon=HORIZON)
+    scheduler.start()
+    while scheduler.stats()["pending"] < len(rows):
+        await asyncio.sleep(0.001)
+    return scheduler
+
+
+async def run(pending: int, idle: float, moves: int) -> dict:
+    now = time.time()
+    rows = _rows(pending, now)
+
+    tracemalloc.start()
+    (await _loaded(rows)).stop()
+    heap_bytes = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    scheduler = await _loaded(rows)
+    load_ms = (time.perf_counter() - started) * 1000
+
+    cpu = time.process_time()
+    await asyncio.sleep(idle)
+    idle_cpu_ms = (time.process_time() - cpu) * 1000
+
+    started = time.perf_counter()
+    for i in range(moves):
+        row = rows[i * 7 % pending]
+        # a third is completed, the rest moves to another minute of the same hour
+        at_time = row.at_time.replace(minute=(row.at_time.minute + 1 + i % 99) % 60)
+        task = {"id": row.id, "title": row.title, "day": row.day.isoformat(), "at_time": at_time.isoformat(), "completed": i % 3 == 0}
+        scheduler.on_task_message(row.user_id, {"version": i, "changes": [{"op": "upsert", "task": task}]})
+    move_us = (time.perf_counter() - started) / moves * 1e6
+    stats = scheduler.stats()
+    scheduler.stop()
+    return {
+        "pending": pending,
+        "load_ms": round(load_ms, 1),
+        "peak_memory_mb": round(heap_bytes / 2**20, 1),
+        "idle_seconds": idle,
+        "idle_cpu_ms": round(idle_cpu_ms, 2),
+        "move_us": round(move_us, 2),
+        "after_moves": {"pending": stats["pending"], "heap": stats["heap"]},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pending", type=int, default=100_000)
+    parser.add_argument("--idle", type=float, default=5.0)
+    parser.add_argument("--moves", type=int, default=20_000)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.pending, args.idle, args.moves)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Task search through the full-text index vs a LIKE scan, as the task and user counts grow
+
+    python -m bench.search --tasks 10000 100000 --users 1 10 --repeat 20
+
+Seeds `users` users per run in an in-memory SQLite database, each with `tasks` tasks whose
+titles come from a small vocabulary plus one rare word on every 1000th task, then times a first
+page of the indexed search and of a `LIKE '%word%'` filter over title and description (newest
+first) for a rare and a common prefix, as the first user. With more users the table grows while
+the searching user's matches stay the same.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import statistics
+import time
+from datetime import date, timedelta
+from typing import Callable, Dict
+
+from sqlalchemy import create_engine, insert, or_, select
+from sqlalchemy.orm import Session
+
+from app.api.routes.tasks import SEARCH_DEFAULT_LIMIT, TASK_OUT_COLUMNS, search_tasks_stmt
+from app.db.models import Task, User
+from app.db.search import search_terms
+from app.db.session import Base
+
+WORDS = ("zakupy", "mleko", "raport", "spotkanie", "trening", "lekarz", "rachunki", "sprzątanie", "projekt", "urodziny")
+RARE = "zegarmistrz"
+QUERIES = {"rare": "zegarm", "common": "rap"}
+
+
+def _median_ms(fn: Callable[[], object], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return round(statistics.median(samples) * 1000, 3)
+
+
+def run(tasks: int, repeat: int, users: int = 1) -> Dict[str, object]:
+    rnd = random.Random(tasks)
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"id": user_id, "email": f"s{user_id}@example.com", "first_name": "S", "last_name": "S", "password_hash": "x"}
+            for user_id in range(1, users + 1)
+        ])
+        for user_id in range(1, users + 1):
+            conn.execute(insert(Task), [
+                {"user_id": user_id, "day": date(2025, 1, 1) + timedelta(days=i % 365),
+                 "title": " ".join(rnd.sample(WORDS, 2)) + (f" {RARE}" if i % 1000 == 0 else ""),
+                 "description": " ".join(rnd.sample(WORDS, 3)) if i % 2 else None}
+                for i in range(tasks)
+            ])
+
+    results: Dict[str, object] = {"tasks": tasks, "users": users}
+    with Session(engine) as db:
+        for name, query in QUERIES.items():
+            indexed = search_tasks_stmt("sqlite", 1, search_terms(query))
+            pattern = f"%{query}%"
+            scan = (
+                select(*TASK_OUT_COLUMNS)
+                .where(Task.user_id == 1, or_(Task.title.ilike(pattern), Task.description.ilike(pattern)))
+                .order_by(Task.day.desc(), Task.id.desc())
+                .limit(SEARCH_DEFAULT_LIMIT)
+            )
+            results[name] = {
+                "matches": len(db.execute(indexed.limit(None)).all()),
+                "index_ms": _median_ms(lambda: db.execute(indexed).all(), repeat),
+                "like_scan_ms": _median_ms(lambda: db.execute(scan).all(), repeat),
+            }
+    engine.dispose()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, nargs="+", default=[10_000, 100_000], help="tasks per user")
+    parser.add_argument("--users", type=int, nargs="+", default=[1, 10])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    print(json.dumps([run(tasks, args.repeat, users) for tasks in args.tasks for users in args.users], indent=2))
+
+
+if __name__ == "__main__":
+    main()
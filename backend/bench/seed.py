@@ -0,0 +1,103 @@
+"""Bulk seeding of benchmark users and tasks straight into the database
+
+    python -m bench.seed --db-url sqlite:///bench.db --users 1000 --tasks 1000000
+
+Rows are inserted in executemany batches, so a million tasks take seconds instead of the
+hours that going through the API would. All users share one password hash.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from datetime import date, time as dtime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import Engine, create_engine, delete, insert, select
+
+from app.core.security import hash_password
+from app.db.migrations import upgrade
+from app.db.models import Task, User
+from bench.common import PASSWORD
+
+EMAIL_DOMAIN = "bench.example.com"
+BATCH_SIZE = 10_000
+COLORS = (None, None, "#6f42c1", "#dc3545", "#198754")
+
+
+def bench_engine(db_url: Optional[str]) -> Engine:
+    """Engine for `db_url`, or the application's engine (with its schema mapping) when not given"""
+    if db_url is None:
+        from app.db.session import engine
+
+        return engine
+    connect_args = {"check_same_thread": False} if db_url.startswith("sqlite") else {}
+    return create_engine(db_url, connect_args=connect_args)
+
+
+def seed_emails(users: int) -> List[str]:
+    return [f"seed-{i}@{EMAIL_DOMAIN}" for i in range(users)]
+
+
+def seed(engine: Engine, users: int, tasks: int, days: int = 365, seed_value: int = 42) -> List[str]:
+    """
+    Replace previously seeded benchmark data with `users` users and `tasks` tasks spread evenly
+    between them over `days` days centred on today; return the users' emails
+    """
+    rnd = random.Random(seed_value)
+    emails = seed_emails(users)
+    first_day = date.today() - timedelta(days=days // 2)
+    password_hash = hash_password(PASSWORD)
+
+    upgrade(engine)
+    with engine.begin() as conn:
+        old_ids = select(User.id).where(User.email.like(f"%@{EMAIL_DOMAIN}"))
+        conn.execute(delete(Task).where(Task.user_id.in_(old_ids)))
+        conn.execute(delete(User).where(User.email.like(f"%@{EMAIL_DOMAIN}")))
+        conn.execute(
+            insert(User),
+            [
+                {"email": email, "first_name": "Bench", "last_name": f"User{i}", "password_hash": password_hash}
+                for i, email in enumerate(emails)
+            ],
+        )
+        user_ids = conn.scalars(select(User.id).where(User.email.like(f"%@{EMAIL_DOMAIN}"))).all()
+
+    batch = []
+    with engine.begin() as conn:
+        for i in range(tasks):
+            batch.append(
+                {
+                    "user_id": user_ids[i % len(user_ids)],
+                    "title": f"Task {i}",
+                    "description": "seeded",
+                    "day": first_day + timedelta(days=rnd.randrange(days)),
+                    "at_time": None if rnd.random() < 0.3 else dtime(rnd.randrange(7, 22), rnd.choice((0, 15, 30, 45))),
+                    "color": rnd.choice(COLORS),
+                    "completed": rnd.random() < 0.4,
+                }
+            )
+            if len(batch) == BATCH_SIZE:
+                conn.execute(insert(Task), batch)
+                batch = []
+        if batch:
+            conn.execute(insert(Task), batch)
+    return emails
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db-url", default=None, help="SQLAlchemy URL, defaults to the configured database")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--tasks", type=int, default=10_000)
+    parser.add_argument("--days", type=int, default=365)
+    args = parser.parse_args()
+
+    engine = bench_engine(args.db_url)
+    started = time.perf_counter()
+    seed(engine, args.users, args.tasks, args.days)
+    print(f"seeded {args.users} users and {args.tasks} tasks in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
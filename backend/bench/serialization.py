@@ -0,0 +1,79 @@
+"""Micro-benchmark of task list serialization: ORM objects + `TaskOut` models vs plain rows + `TypeAdapter`
+
+    python -m bench.serialization --tasks 2000 --repeat 50
+
+Both paths read the same rows of one user from an in-memory SQLite database; the script
+checks they produce identical JSON and prints the timings per response.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import time
+from datetime import date, time as dtime, timedelta
+from typing import Callable, List
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+from app.api.routes.tasks import encode_task_rows, list_tasks_stmt, task_rows_stmt
+from app.db.models import Task, User
+from app.db.session import Base
+from app.schemas.task import TaskOut
+
+_model_list_adapter = TypeAdapter(List[TaskOut])
+
+
+def orm_path(db: Session) -> bytes:
+    """What `response_model=List[TaskOut]` costs: full entities, one validated model per task"""
+    tasks = db.scalars(list_tasks_stmt(1)).all()
+    return _model_list_adapter.dump_json([TaskOut.model_validate(task) for task in tasks])
+
+
+def rows_path(db: Session) -> bytes:
+    return encode_task_rows(db.execute(task_rows_stmt(list_tasks_stmt(1))).all())
+
+
+def _time(fn: Callable[[Session], bytes], db: Session, repeat: int) -> List[float]:
+    samples = []
+    for _ in range(repeat):
+        db.expunge_all()
+        started = time.perf_counter()
+        fn(db)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{"id": 1, "email": "s@example.com", "first_name": "S", "last_name": "S", "password_hash": "x"}])
+        conn.execute(
+            insert(Task),
+            [
+                {"user_id": 1, "title": f"Task {i}", "description": "x" * 40, "day": date(2025, 1, 1) + timedelta(days=i % 365),
+                 "at_time": dtime(i % 24, 0) if i % 3 else None, "color": "#6f42c1" if i % 2 else None, "completed": bool(i % 5)}
+                for i in range(args.tasks)
+            ],
+        )
+
+    with Session(engine) as db:
+        assert orm_path(db) == rows_path(db), "serialization paths differ"
+        results = {}
+        for name, fn in (("orm_models", orm_path), ("rows_type_adapter", rows_path)):
+            samples = _time(fn, db, args.repeat)
+            results[name] = {"median_ms": round(statistics.median(samples) * 1000, 2), "min_ms": round(min(samples) * 1000, 2)}
+    results["speedup"] = round(results["orm_models"]["median_ms"] / results["rows_type_adapter"]["median_ms"], 2)
+    print(json.dumps({"tasks": args.tasks, "repeat": args.repeat, **results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
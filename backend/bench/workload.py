@@ -0,0 +1,263 @@
+"""Scripted mixed workload against seeded data, in-process or against a running server
+
+In-process (ASGI transport, no network or server) on a SQLite file:
+
+    python -m bench.workload --in-process --db-url sqlite:///bench.db --users 100 --tasks 10000 -c 20 -d 20
+
+Against a local uvicorn, seeding the database the server uses (the configured one by default):
+
+    uvicorn app.main:app --port 8000
+    python -m bench.workload --url http://localhost:8000 --users 1000 --tasks 1000000 -c 200 -d 60 -o after.json
+
+Every virtual user logs in as one of the seeded users and loops over a weighted mix of
+month views, day views, toggles, bulk edits and re-logins. The JSON report holds throughput
+and p50/p95/p99 per endpoint next to the run parameters and git commit; compare two reports
+with `python -m bench.compare before.json after.json`.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+import httpx
+from sqlalchemy import Engine
+from sqlalchemy.orm import sessionmaker
+
+from bench.common import PASSWORD, summarize
+from bench.seed import bench_engine, seed, seed_emails
+
+DEFAULT_MIX = {"login": 2, "month": 35, "day": 40, "toggle": 15, "bulk": 8}
+BULK_SIZE = 10
+
+ENDPOINTS = {
+    "login": "POST /api/auth/login",
+    "month": "GET /api/tasks?month",
+    "day": "GET /api/tasks?day",
+    "toggle": "PUT /api/tasks/{id}",
+    "bulk": "POST /api/tasks/bulk",
+}
+
+
+class Recorder:
+    """Latencies and error counts per endpoint"""
+
+    def __init__(self) -> None:
+        self.latencies: Dict[str, List[float]] = {op: [] for op in ENDPOINTS}
+        self.errors: Dict[str, int] = {op: 0 for op in ENDPOINTS}
+
+    def record(self, op: str, started: float, ok: bool) -> None:
+        if ok:
+            self.latencies[op].append(time.perf_counter() - started)
+        else:
+            self.errors[op] += 1
+
+    def report(self, elapsed: float) -> dict:
+        endpoints = {
+            ENDPOINTS[op]: summarize(self.latencies[op], elapsed, self.errors[op])
+            for op in ENDPOINTS
+            if self.latencies[op] or self.errors[op]
+        }
+        everything = [latency for values in self.latencies.values() for latency in values]
+        return {"total": summarize(everything, elapsed, sum(self.errors.values())), "endpoints": endpoints}
+
+
+class VirtualUser:
+    """One client session working on the tasks of a seeded user"""
+
+    def __init__(self, client: httpx.AsyncClient, email: str, rnd: random.Random, days: int, recorder: Recorder) -> None:
+        self.client = client
+        self.email = email
+        self.rnd = rnd
+        self.recorder = recorder
+        self.first_day = date.today() - timedelta(days=days // 2)
+        self.days = days
+        self.headers: Dict[str, str] = {}
+        self.known: Dict[int, bool] = {}  # task id -> completed, from the last day view
+
+    def _random_day(self) -> date:
+        return self.first_day + timedelta(days=self.rnd.randrange(self.days))
+
+    async def login(self) -> None:
+        # the hashing pool answers 503 when saturated, keep trying like a real client would
+        while True:
+            started = time.perf_counter()
+            r = await self.client.post("/api/auth/login", json={"email": self.email, "password": PASSWORD})
+            self.recorder.record("login", started, r.status_code == 200)
+            if r.status_code == 200:
+                self.headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+                return
+            await asyncio.sleep(self.rnd.uniform(0.05, 0.5))
+
+    async def month(self) -> None:
+        started = time.perf_counter()
+        r = await self.client.get("/api/tasks", params={"month": self._random_day().strftime("%Y-%m")}, headers=self.headers)
+        self.recorder.record("month", started, r.status_code == 200)
+
+    async def day(self) -> None:
+        started = time.perf_counter()
+        r = await self.client.get("/api/tasks", params={"day": str(self._random_day())}, headers=self.headers)
+        self.recorder.record("day", started, r.status_code == 200)
+        if r.status_code == 200 and r.json():
+            self.known = {task["id"]: task["completed"] for task in r.json()}
+
+    async def toggle(self) -> None:
+        if not self.known:
+            return await self.day()
+        task_id = self.rnd.choice(list(self.known))
+        started = time.perf_counter()
+        r = await self.client.put(f"/api/tasks/{task_id}", json={"completed": not self.known[task_id]}, headers=self.headers)
+        self.recorder.record("toggle", started, r.status_code == 200)
+        if r.status_code == 200:
+            self.known[task_id] = r.json()["completed"]
+
+    async def bulk(self) -> None:
+        if not self.known:
+            return await self.day()
+        ids = self.rnd.sample(list(self.known), min(BULK_SIZE, len(self.known)))
+        payload = {"update": [{"id": task_id, "completed": not self.known[task_id]} for task_id in ids]}
+        started = time.perf_counter()
+        r = await self.client.post("/api/tasks/bulk", json=payload, headers=self.headers)
+        self.recorder.record("bulk", started, r.status_code == 200)
+        if r.status_code == 200:
+            for result in r.json()["results"]:
+                if result["task"]:
+                    self.known[result["id"]] = result["task"]["completed"]
+
+
+async def run_workload(
+    client: httpx.AsyncClient,
+    emails: List[str],
+    concurrency: int,
+    duration: float,
+    mix: Dict[str, int],
+    days: int,
+    seed_value: int = 1,
+) -> dict:
+    """Run `concurrency` virtual users for `duration` seconds and return the report"""
+    recorder = Recorder()
+    users = [
+        VirtualUser(client, emails[i % len(emails)], random.Random(seed_value + i), days, recorder)
+        for i in range(concurrency)
+    ]
+    ops = [op for op in mix if mix[op] > 0]
+    weights = [mix[op] for op in ops]
+    started = time.perf_counter()
+    deadline = started + duration
+
+    async def session(user: VirtualUser) -> None:
+        await user.login()
+        while time.perf_counter() < deadline:
+            op = user.rnd.choices(ops, weights)[0]
+            try:
+                await getattr(user, op)()
+            except httpx.HTTPError:
+                recorder.record(op, 0.0, False)
+
+    await asyncio.gather(*(session(user) for user in users))
+    return recorder.report(time.perf_counter() - started)
+
+
+def in_process_client(engine: Engine) -> httpx.AsyncClient:
+    """Client calling the ASGI app directly, with `get_db` bound to `engine`"""
+    from app.db.session import get_db
+    from app.main import app
+
+    SessionLocal = sessionmaker(bind=engine, autoflush=False)
+
+    def override_get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=120.0)
+
+
+def parse_mix(raw: Optional[str]) -> Dict[str, int]:
+    """`month=40,day=40` -> weights; unknown operations are rejected"""
+    if not raw:
+        return dict(DEFAULT_MIX)
+    mix = {op: 0 for op in DEFAULT_MIX}
+    for part in raw.split(","):
+        op, _, weight = part.partition("=")
+        if op.strip() not in mix:
+            raise SystemExit(f"unknown operation {op!r}, expected one of {', '.join(mix)}")
+        mix[op.strip()] = int(weight)
+    return mix
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--url", default="http://localhost:8000", help="base URL of a running server")
+    target.add_argument("--in-process", action="store_true", help="call the app through ASGI in this process")
+    parser.add_argument("--db-url", default=None, help="database to seed (and serve in-process), defaults to the configured one")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--tasks", type=int, default=10_000)
+    parser.add_argument("--days", type=int, default=365, help="seeded tasks are spread over this many days around today")
+    parser.add_argument("--no-seed", action="store_true", help="reuse data seeded by a previous run with the same --users")
+    parser.add_argument("-c", "--concurrency", type=int, default=20)
+    parser.add_argument("-d", "--duration", type=float, default=20.0)
+    parser.add_argument("--mix", default=None, help="operation weights, e.g. login=2,month=35,day=40,toggle=15,bulk=8")
+    parser.add_argument("-o", "--output", default=None, help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    engine = bench_engine(args.db_url)
+    mix = parse_mix(args.mix)
+    if args.no_seed:
+        emails = seed_emails(args.users)
+    else:
+        seeded = time.perf_counter()
+        emails = seed(engine, args.users, args.tasks, args.days)
+        print(f"seeded {args.users} users / {args.tasks} tasks in {time.perf_counter() - seeded:.1f}s", file=sys.stderr)
+
+    if args.in_process:
+        client = in_process_client(engine)
+    else:
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        client = httpx.AsyncClient(base_url=args.url, limits=limits, timeout=120.0)
+    started_at = datetime.now(tz=timezone.utc).isoformat()
+    async with client:
+        report = await run_workload(client, emails, args.concurrency, args.duration, mix, args.days)
+
+    result = {
+        "meta": {
+            "commit": git_commit(),
+            "started_at": started_at,
+            "target": "in-process" if args.in_process else args.url,
+            "db": engine.dialect.name,
+            "users": args.users,
+            "tasks": args.tasks,
+            "days": args.days,
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "mix": mix,
+        },
+        **report,
+    }
+    text = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -4,14 +4,22 @@ const api = axios.create({
     baseURL: import.meta.env.VITE_API_URL,
 })
 
+// koniec okna read-your-writes po zapisie (sekundy unix); odsyłany, by odczyty na każdym workerze omijały repliki
+let primaryUntil = 0
+
 api.interceptors.request.use((config) => {
     const token = localStorage.getItem('access_token')
     if (token) config.headers.Authorization = `Bearer ${token}`
+    if (primaryUntil > Date.now() / 1000) config.headers['X-Primary-Until'] = String(primaryUntil)
     return config
 })
 
 api.interceptors.response.use(
-    (res) => res,
+    (res) => {
+        const until = Number(res.headers['x-primary-until'])
+        if (until > primaryUntil) primaryUntil = until
+        return res
+    },
     (err) => {
         if (err?.response?.status === 401) {
             localStorage.removeItem('access_token')
@@ -0,0 +1,76 @@
+import { useEffect, useRef, useState } from 'react'
+
+const apiBase = (import.meta.env.VITE_API_URL || window.location.origin).replace(/\/+$/, '')
+const wsBase = apiBase.replace(/^http(s?):/, 'ws$1:')
+
+// ta sama kolejność co w API: dzień, godzina (puste na końcu), id
+const compareTasks = (a, b) =>
+    a.day.localeCompare(b.day) ||
+    (a.at_time === b.at_time ? 0 : a.at_time == null ? 1 : b.at_time == null ? -1 : a.at_time.localeCompare(b.at_time)) ||
+    a.id - b.id
+
+// nakłada zmiany z /ws/tasks na listę; `belongs` mówi czy zadanie należy do wyświetlanego widoku
+export function applyTaskChanges(tasks, changes, belongs) {
+    const byId = new Map(tasks.map(t => [t.id, t]))
+    for (const c of changes) {
+        if (c.op === 'delete') byId.delete(c.id)
+        else if (belongs(c.task)) byId.set(c.task.id, c.task)
+        else byId.delete(c.task.id)
+    }
+    return [...byId.values()].sort(compareTasks)
+}
+
+// subskrypcja zmian zadań; zwraca true gdy połączenie działa i listy są aktualizowane na bieżąco
+// `onReminder` (opcjonalnie) dostaje przypomnienia o zadaniach z godziną
+export function useTaskEvents(onChanges, onResync, onReminder) {
+    const [live, setLive] = useState(false)
+    const handlers = useRef({ onChanges, onResync, onReminder })
+    handlers.current = { onChanges, onResync, onReminder }
+
+    useEffect(() => {
+        let ws = null
+        let timer = null
+        let closed = false
+        let version = null
+
+        const connect = () => {
+            const token = localStorage.getItem('access_token')
+            if (!token) return
+            ws = new WebSocket(`${wsBase}/ws/tasks?token=${encodeURIComponent(token)}`)
+
+            ws.onmessage = (e) => {
+                const msg = JSON.parse(e.data)
+                if (msg.reminder) {
+                    // przypomnienia nie mają wersji i nie zmieniają list
+                    handlers.current.onReminder?.(msg.reminder)
+                    return
+                }
+                if (msg.resync || version === null || msg.version !== version + 1) {
+                    // powitanie albo pominięte zmiany: pobierz listy od nowa
+                    version = msg.version ?? null
+                    setLive(version !== null)
+                    handlers.current.onResync()
+                    return
+                }
+                version = msg.version
+                handlers.current.onChanges(msg.changes)
+            }
+
+            ws.onclose = () => {
+                setLive(false)
+                version = null
+                if (!closed) timer = setTimeout(connect, 2000)
+            }
+        }
+
+        connect()
+
+        return () => {
+            closed = true
+            if (timer) clearTimeout(timer)
+            if (ws) ws.close(1000, 'component unmount')
+        }
+    }, [])
+
+    return live
+}
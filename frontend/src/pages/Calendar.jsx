@@ -4,6 +4,7 @@ import { addMonths, subMonths, format, isToday as dfIsToday } from 'date-fns'
 import { pl } from 'date-fns/locale'
 import { monthMatrix, isSameMonth, formatDate } from '../utils/date.js'
 import api from '../api/axios'
+import { applyTaskChanges, useTaskEvents } from '../api/taskEvents.js'
 import TaskItem from '../components/TaskItem.jsx'
 
 const isValidHHMM = (val) => /^([01]\d|2[0-3]):([0-5]\d)$/.test(val || '')
@@ -11,6 +12,7 @@ const isValidHHMM = (val) => /^([01]\d|2[0-3]):([0-5]\d)$/.test(val || '')
 export default function CalendarPage() {
     const [current, setCurrent] = useState(new Date())
     const [selectedDay, setSelectedDay] = useState(null)
+    const [summary, setSummary] = useState({})
     const [tasks, setTasks] = useState([])
     const [show, setShow] = useState(false)
     const [edit, setEdit] = useState(null)
@@ -26,16 +28,35 @@ export default function CalendarPage() {
 
     const weeks = useMemo(() => monthMatrix(current), [current])
     const title = format(current, 'LLLL yyyy', { locale: pl })
-    const monthParam = format(current, 'yyyy-MM')
+    const rangeStart = formatDate(weeks[0][0])
+    const rangeEnd = formatDate(weeks[weeks.length - 1][6])
 
-    const load = async () => {
-        const { data } = await api.get('/api/tasks', { params: { month: monthParam } })
+    // siatka potrzebuje tylko liczników dni, pełne zadania pobieramy dla wybranego dnia
+    const loadSummary = async () => {
+        const { data } = await api.get('/api/tasks/summary', { params: { start: rangeStart, end: rangeEnd } })
+        setSummary(Object.fromEntries(data.map(s => [s.day, s])))
+    }
+    const loadDay = async () => {
+        if (!selectedDay) return setTasks([])
+        const { data } = await api.get('/api/tasks', { params: { day: selectedDay } })
         setTasks(data)
     }
-    useEffect(() => { load() }, [monthParam])
+    const load = () => Promise.all([loadSummary(), loadDay()])
+    useEffect(() => { loadSummary() }, [rangeStart, rangeEnd])
+    useEffect(() => { loadDay() }, [selectedDay])
+
+    // zmiany przychodzą przez websocket: lista dnia jest aktualizowana lokalnie, liczniki pobierane od nowa
+    const live = useTaskEvents(
+        (changes) => {
+            setTasks(ts => applyTaskChanges(ts, changes, t => t.day === selectedDay))
+            loadSummary()
+        },
+        load,
+    )
+    const refresh = () => { if (!live) load() }
 
     const dayTasks = (dStr) => tasks.filter(t => t.day === dStr)
-    const countTasks = (d) => dayTasks(formatDate(d)).length
+    const countTasks = (d) => summary[formatDate(d)]?.total || 0
 
     const openDay = (d) => setSelectedDay(formatDate(d))
 
@@ -101,11 +122,11 @@ export default function CalendarPage() {
 
         setShow(false)
         resetErrors()
-        load()
+        refresh()
     }
 
-    const onToggle = async (t) => { await api.put(`/api/tasks/${t.id}`, { completed: !t.completed }); load() }
-    const onDelete = async (id) => { await api.delete(`/api/tasks/${id}`); load() }
+    const onToggle = async (t) => { await api.put(`/api/tasks/${t.id}`, { completed: !t.completed }); refresh() }
+    const onDelete = async (id) => { await api.delete(`/api/tasks/${id}`); refresh() }
 
     return (
         <>
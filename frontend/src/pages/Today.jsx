@@ -1,7 +1,8 @@
 import React, { useEffect, useState } from 'react'
-import { Button, Form, Modal } from 'react-bootstrap'
+import { Button, Form, Modal, Toast, ToastContainer } from 'react-bootstrap'
 import { useAuth } from '../contexts/AuthContext.jsx'
 import api from '../api/axios'
+import { applyTaskChanges, useTaskEvents } from '../api/taskEvents.js'
 import TaskItem from '../components/TaskItem.jsx'
 import { formatDate } from '../utils/date.js'
 
@@ -13,6 +14,7 @@ export default function Today() {
     const [show, setShow] = useState(false)
     const [edit, setEdit] = useState(null)
     const [errors, setErrors] = useState({})
+    const [reminders, setReminders] = useState([])
     const [form, setForm] = useState({
         title: '',
         description: '',
@@ -30,8 +32,17 @@ export default function Today() {
     }
     useEffect(() => { load() }, [])
 
-    const onToggle = async (t) => { await api.put(`/api/tasks/${t.id}`, { completed: !t.completed }); load() }
-    const onDelete = async (id) => { await api.delete(`/api/tasks/${id}`); load() }
+    // zmiany (także z innych kart) przychodzą przez websocket, bez niego pobieramy listę ponownie
+    const live = useTaskEvents(
+        (changes) => setTasks(ts => applyTaskChanges(ts, changes, t => t.day === today)),
+        load,
+        (reminder) => setReminders(rs => [...rs.filter(r => r.task_id !== reminder.task_id), reminder]),
+    )
+    const dismissReminder = (taskId) => setReminders(rs => rs.filter(r => r.task_id !== taskId))
+    const refresh = () => { if (!live) load() }
+
+    const onToggle = async (t) => { await api.put(`/api/tasks/${t.id}`, { completed: !t.completed }); refresh() }
+    const onDelete = async (id) => { await api.delete(`/api/tasks/${id}`); refresh() }
 
     const resetErrors = () => setErrors({})
 
@@ -88,7 +99,7 @@ export default function Today() {
 
         setShow(false)
         resetErrors()
-        load()
+        refresh()
     }
 
     return (
@@ -107,6 +118,18 @@ export default function Today() {
                 ))}
             </div>
 
+            <ToastContainer position="top-end" className="p-3">
+                {reminders.map(r => (
+                    <Toast key={r.task_id} onClose={() => dismissReminder(r.task_id)}>
+                        <Toast.Header>
+                            <strong className="me-auto">Przypomnienie</strong>
+                            <small>{r.at_time.slice(0, 5)}</small>
+                        </Toast.Header>
+                        <Toast.Body>{r.title}</Toast.Body>
+                    </Toast>
+                ))}
+            </ToastContainer>
+
             <Modal show={show} onHide={() => { setShow(false); resetErrors() }}>
                 <Modal.Header closeButton>
                     <Modal.Title>{edit ? 'Edytuj zadanie' : 'Nowe zadanie'}</Modal.Title>